@@ -59,7 +59,9 @@
 #define PAGE_SIZE (4*1024)
 #define BLOCK_SIZE (4*1024)
 
-int  mem_fd;
+int  mem_fd = -1;
+// number of setup_io calls without restore_io, the memory is mapped once
+static int io_users = 0;
 char *clk_mem_orig, *clk_mem, *clk_map;
 char *gpio_mem_orig, *gpio_mem, *gpio_map;
 char *pwm_mem_orig, *pwm_mem, *pwm_map;
@@ -100,7 +102,7 @@ volatile unsigned *uart;
 #define UART0_BAUD_LO *(uart+10)
 
 
-void setup_io();
+int setup_io();
 void restore_io();
 
 //
@@ -135,14 +137,28 @@ void long_wait(int v)
 // It it also the part of the code which makes that
 // you have to use 'sudo' to run this program.
 //
-void setup_io()
+//
+// Returns 0 if it is ok or -1 if the memory cannot be mapped.
+// It does not exit so it can be used from a shared library.
+// On error everything mapped or allocated so far is released.
+// Each successful call has to be matched by restore_io.
+//
+static void unmap_io();
+
+int setup_io()
 {  unsigned long extra;
 
+   if (io_users > 0) {
+      // already mapped by another user
+      io_users++;
+      return 0;
+   }
+
    /* open /dev/mem */
    if ((mem_fd = open("/dev/mem", O_RDWR|O_SYNC) ) < 0) {
       printf("Can't open /dev/mem\n");
       printf("Did you forgot to use 'sudo .. ?'\n");
-      exit (-1);
+      return -1;
    }
 
    /*
@@ -150,7 +166,7 @@ void setup_io()
     */
    if ((clk_mem_orig = malloc(BLOCK_SIZE + (PAGE_SIZE-1))) == NULL) {
       printf("allocation error \n");
-      exit (-1);
+      goto fail;
    }
    extra = (unsigned long)clk_mem_orig % PAGE_SIZE;
    if (extra)
@@ -169,7 +185,8 @@ void setup_io()
 
    if ((long)clk_map < 0) {
       printf("clk mmap error %d\n", (int)clk_map);
-      exit (-1);
+      clk_map = NULL;
+      goto fail;
    }
    clk = (volatile unsigned *)clk_map;
 
@@ -179,7 +196,7 @@ void setup_io()
     */
    if ((gpio_mem_orig = malloc(BLOCK_SIZE + (PAGE_SIZE-1))) == NULL) {
       printf("allocation error \n");
-      exit (-1);
+      goto fail;
    }
    extra = (unsigned long)gpio_mem_orig % PAGE_SIZE;
    if (extra)
@@ -198,7 +215,8 @@ void setup_io()
 
    if ((long)gpio_map < 0) {
       printf("gpio mmap error %d\n", (int)gpio_map);
-      exit (-1);
+      gpio_map = NULL;
+      goto fail;
    }
    gpio = (volatile unsigned *)gpio_map;
 
@@ -207,7 +225,7 @@ void setup_io()
     */
    if ((pwm_mem_orig = malloc(BLOCK_SIZE + (PAGE_SIZE-1))) == NULL) {
       printf("allocation error \n");
-      exit (-1);
+      goto fail;
    }
    extra = (unsigned long)pwm_mem_orig % PAGE_SIZE;
    if (extra)
@@ -226,7 +244,8 @@ void setup_io()
 
    if ((long)pwm_map < 0) {
       printf("pwm mmap error %d\n", (int)pwm_map);
-      exit (-1);
+      pwm_map = NULL;
+      goto fail;
    }
    pwm = (volatile unsigned *)pwm_map;
 
@@ -235,7 +254,7 @@ void setup_io()
     */
    if ((spi0_mem_orig = malloc(BLOCK_SIZE + (PAGE_SIZE-1))) == NULL) {
       printf("allocation error \n");
-      exit (-1);
+      goto fail;
    }
    extra = (unsigned long)spi0_mem_orig % PAGE_SIZE;
    if (extra)
@@ -254,7 +273,8 @@ void setup_io()
 
    if ((long)spi0_map < 0) {
       printf("spi0 mmap error %d\n", (int)spi0_map);
-      exit (-1);
+      spi0_map = NULL;
+      goto fail;
    }
    spi0 = (volatile unsigned *)spi0_map;
 
@@ -263,7 +283,7 @@ void setup_io()
     */
    if ((uart_mem_orig = malloc(BLOCK_SIZE + (PAGE_SIZE-1))) == NULL) {
       printf("allocation error \n");
-      exit (-1);
+      goto fail;
    }
    extra = (unsigned long)uart_mem_orig % PAGE_SIZE;
    if (extra)
@@ -282,29 +302,51 @@ void setup_io()
 
    if ((long)uart_map < 0) {
       printf("uart mmap error %d\n", (int)uart_map);
-      exit (-1);
+      uart_map = NULL;
+      goto fail;
    }
    uart = (volatile unsigned *)uart_map;
+   io_users = 1;
+   return 0;
 
+fail:
+   unmap_io();
+   return -1;
 } // setup_io
 
 //
-// Undo what we did above
+// Release whatever setup_io mapped, allocated and opened
 //
-void restore_io()
+static void unmap_io()
 {
-  munmap(uart_map,BLOCK_SIZE);
-  munmap(spi0_map,BLOCK_SIZE);
-  munmap(pwm_map,BLOCK_SIZE);
-  munmap(gpio_map,BLOCK_SIZE);
-  munmap(clk_map,BLOCK_SIZE);
+  if (uart_map) munmap(uart_map,BLOCK_SIZE);
+  if (spi0_map) munmap(spi0_map,BLOCK_SIZE);
+  if (pwm_map) munmap(pwm_map,BLOCK_SIZE);
+  if (gpio_map) munmap(gpio_map,BLOCK_SIZE);
+  if (clk_map) munmap(clk_map,BLOCK_SIZE);
+  uart_map = spi0_map = pwm_map = gpio_map = clk_map = NULL;
   // free memory
   free(uart_mem_orig);
   free(spi0_mem_orig);
   free(pwm_mem_orig);
   free(gpio_mem_orig);
   free(clk_mem_orig);
-  close(mem_fd);
+  uart_mem_orig = spi0_mem_orig = pwm_mem_orig = NULL;
+  gpio_mem_orig = clk_mem_orig = NULL;
+  if (mem_fd >= 0) close(mem_fd);
+  mem_fd = -1;
+} // unmap_io
+
+//
+// Undo what we did above when the last user is done
+//
+void restore_io()
+{
+  if (io_users == 0)
+    return;
+  if (--io_users > 0)
+    return;
+  unmap_io();
 } // restore_io
 
 // simple routine to convert the last several bits of an integer to a string 
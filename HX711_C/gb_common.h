@@ -37,7 +37,7 @@ extern volatile unsigned *uart;
 void short_wait();
 void long_wait(int v);
 
-void setup_io();
+int setup_io();
 void restore_io();
 void make_binary_string(int, int, char *);
 int pi_revision();
@@ -2,7 +2,11 @@
 
 int setupGPIO(HX711 *hx)
 {
-  setup_io();
+  if (setup_io())
+  {
+    printf("\n!!! Failed to map GPIO memory\n");
+    return 1;
+  }
   INP_GPIO(hx->data_pin);
   INP_GPIO(hx->clock_pin);
   OUT_GPIO(hx->clock_pin);
@@ -10,6 +14,7 @@ int setupGPIO(HX711 *hx)
   if (err)
   {
     printf("\n!!! Failed to set pin %d\n", hx->clock_pin);
+    restore_io();
     return 1;
   }
   return 0;
@@ -70,12 +75,12 @@ void setGain(HX711 *hx)
   for (int i = 0; i < x; ++i)
   {
     setPinState(hx->clock_pin, true);
-    for (int i = 0; i < 4; ++i)
+    for (volatile int i = 0; i < 4; ++i)
     {
       continue;
     }
     setPinState(hx->clock_pin, false);
-    for (int i = 0; i < 4; ++i)
+    for (volatile int i = 0; i < 4; ++i)
     {
       continue;
     }
@@ -90,7 +95,7 @@ int getRawData(HX711 *hx)
   {
     usleep(10000);
   };
-  for (int i = 0; i < 4; ++i)
+  for (volatile int i = 0; i < 4; ++i)
   {
     continue;
   }
@@ -98,12 +103,12 @@ int getRawData(HX711 *hx)
   for (int i = 0; i < 24; ++i)
   {
     setPinState(hx->clock_pin, true);
-    for (int i = 0; i < 4; ++i)
+    for (volatile int i = 0; i < 4; ++i)
     {
       continue;
     }
     setPinState(hx->clock_pin, false);
-    for (int i = 0; i < 2; ++i)
+    for (volatile int i = 0; i < 2; ++i)
     {
       continue;
     }
@@ -37,7 +37,12 @@ int main(int argc, char **argv)
     printf("\n!!! Failed to init HX711 struct !!!\n");
   }
 
-  setupGPIO(&hx);
+  err = setupGPIO(&hx);
+  if (err)
+  {
+    printf("\n!!! Failed to set up GPIO !!!\n");
+    return 1;
+  }
 
   reset(&hx);
   if (!samples)
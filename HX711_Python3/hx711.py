@@ -3,115 +3,4941 @@ This file holds HX711 class
 """
 #!/usr/bin/env python3
 
+import asyncio
+import bisect
+import csv
+import ctypes
+import heapq
+import json
+import math
+import mmap
+import multiprocessing
+import os
+import queue
+import random
 import statistics as stat
+import struct
+import threading
 import time
+import traceback
+from array import array
+from collections import deque
 
-import RPi.GPIO as GPIO
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, it is used by NumpyFilterEngine
+    np = None
+
+try:
+    import RPi.GPIO as GPIO
+except ImportError:  # RPi.GPIO is not available on other machines
+    GPIO = None
+
+
+class GPIOBackend:
+    """
+    GPIOBackend is the interface which HX711 uses for access to GPIO pins.
+    Pins are numbered the same way as the backend numbers them.
+    """
+
+    # True if falling edges are detected by interrupts and kept until
+    # they are waited for. HX711 waits for data ready on the edge then.
+    edge_events = False
+
+    def setup_output(self, pin):
+        """
+        setup_output sets the pin as output with low level.
+
+        Args:
+            pin(int): pin number
+        """
+        raise NotImplementedError
+
+    def setup_input(self, pin):
+        """
+        setup_input sets the pin as input.
+
+        Args:
+            pin(int): pin number
+        """
+        raise NotImplementedError
+
+    def set_clock(self, pin, state):
+        """
+        set_clock sets the level of output pin.
+
+        Args:
+            pin(int): pin number
+            state(bool): True for high level, False for low level
+        """
+        raise NotImplementedError
+
+    def read_data(self, pin):
+        """
+        read_data reads the level of input pin.
+
+        Args:
+            pin(int): pin number
+
+        Returns: int 1 for high level, 0 for low level
+        """
+        raise NotImplementedError
+
+    def read_lines(self, pins):
+        """
+        read_lines reads the levels of several input pins.
+
+        Args:
+            pins([int]): pin numbers
+
+        Returns: [int] levels in the same order as pins
+        """
+        return [self.read_data(pin) for pin in pins]
+
+    def wait_for_edge(self, pin, timeout):
+        """
+        wait_for_edge waits for the falling edge on input pin.
+        An edge which came after clear_edges is not lost, if it came
+        before the wait it returns at once.
+
+        Args:
+            pin(int): pin number
+            timeout(float): max time to wait in seconds
+
+        Returns: bool True if the edge was detected, False if it timed out.
+        """
+        raise NotImplementedError
+
+    def clear_edges(self, pin):
+        """
+        clear_edges forgets the falling edges on input pin which were
+        detected so far, for example while the bits were clocked out.
+
+        Args:
+            pin(int): pin number
+        """
+        pass
+
+    def cleanup(self):
+        """
+        cleanup releases the pins used by the backend.
+        """
+        pass
+
+    def measure_toggle_latency(self, pin, toggles=1000):
+        """
+        measure_toggle_latency measures how long it takes to set the output
+        pin high and low again. The pin must be set up as output.
+        It has to stay well under 60 us otherwise hx711 powers down.
+
+        Args:
+            pin(int): pin number of output pin
+            toggles(int): Number of high and low pulses for the measurement.
+
+        Returns: float average time of one pulse in seconds
+        """
+        set_clock = self.set_clock
+        start_counter = time.perf_counter()
+        for _ in range(toggles):
+            set_clock(pin, True)
+            set_clock(pin, False)
+        end_counter = time.perf_counter()
+        return (end_counter - start_counter) / toggles
+
+
+class RPiGPIOBackend(GPIOBackend):
+    """
+    RPiGPIOBackend accesses pins through RPi.GPIO library.
+    It uses the pin numbering set by GPIO.setmode().
+    Falling edges are detected by GPIO.add_event_detect, the callback
+    sets an event which stays set until the edge is waited for.
+    """
+
+    def __init__(self):
+        """
+        Init a new instance of RPiGPIOBackend
+
+        Raises:
+            ImportError: if RPi.GPIO is not installed
+        """
+        if GPIO is None:
+            raise ImportError('RPiGPIOBackend requires RPi.GPIO library.')
+        # stand-ins of RPi.GPIO like hx711_emulator may not detect edges
+        self.edge_events = hasattr(GPIO, 'add_event_detect')
+        self._pins = []
+        self._edges = {}  # pin: threading.Event set on falling edge
+
+    def setup_output(self, pin):
+        GPIO.setup(pin, GPIO.OUT, initial=GPIO.LOW)
+        self._pins.append(pin)
+
+    def setup_input(self, pin):
+        GPIO.setup(pin, GPIO.IN)
+        self._pins.append(pin)
+
+    def set_clock(self, pin, state):
+        GPIO.output(pin, state)
+
+    def read_data(self, pin):
+        return GPIO.input(pin)
+
+    def wait_for_edge(self, pin, timeout):
+        edge = self._edge(pin)
+        if edge.wait(timeout):
+            edge.clear()
+            return True
+        return False
+
+    def clear_edges(self, pin):
+        self._edge(pin).clear()
+
+    def cleanup(self):
+        for pin in self._edges:
+            GPIO.remove_event_detect(pin)
+        self._edges = {}
+        if self._pins:
+            GPIO.cleanup(self._pins)
+            self._pins = []
+
+    def _edge(self, pin):
+        """
+        _edge returns the event of falling edges on the pin. The edge
+        detection is added when it is used for the first time.
+        """
+        edge = self._edges.get(pin)
+        if edge is None:
+            edge = threading.Event()
+            GPIO.add_event_detect(pin,
+                                  GPIO.FALLING,
+                                  callback=lambda channel: edge.set())
+            self._edges[pin] = edge
+        return edge
+
+
+class GpiodBackend(GPIOBackend):
+    """
+    GpiodBackend accesses pins through the Linux GPIO character device
+    with libgpiod python bindings (python3-libgpiod, API version 1).
+    Pin numbers are line offsets of the chip, on Raspberry Pi it is
+    the same as BCM numbering. Falling edges of input lines are queued
+    by the kernel until they are read.
+    """
+
+    edge_events = True
+
+    def __init__(self, chip='gpiochip0', consumer='hx711'):
+        """
+        Init a new instance of GpiodBackend
+
+        Args:
+            chip(str): Optional, by default 'gpiochip0'. Name or path of gpio chip.
+            consumer(str): Optional, by default 'hx711'. Label of requested lines.
+
+        Raises:
+            ImportError: if gpiod is not installed
+        """
+        import gpiod
+        self._gpiod = gpiod
+        self._chip = gpiod.Chip(chip)
+        self._consumer = consumer
+        self._lines = {}
+        self._bulks = {}  # (pins): LineBulk used by read_lines
+
+    def setup_output(self, pin):
+        line = self._chip.get_line(pin)
+        line.request(consumer=self._consumer,
+                     type=self._gpiod.LINE_REQ_DIR_OUT,
+                     default_vals=[0])
+        self._lines[pin] = line
+
+    def setup_input(self, pin):
+        # line requested for falling edge events can be read as input as well
+        line = self._chip.get_line(pin)
+        line.request(consumer=self._consumer,
+                     type=self._gpiod.LINE_REQ_EV_FALLING_EDGE)
+        self._lines[pin] = line
+        self._bulks = {}
+
+    def set_clock(self, pin, state):
+        self._lines[pin].set_value(1 if state else 0)
+
+    def read_data(self, pin):
+        return self._lines[pin].get_value()
+
+    def read_lines(self, pins):
+        # all lines are read by one call of the bindings
+        key = tuple(pins)
+        bulk = self._bulks.get(key)
+        if bulk is None:
+            bulk = self._gpiod.LineBulk([self._lines[pin] for pin in key])
+            self._bulks[key] = bulk
+        return bulk.get_values()
+
+    def wait_for_edge(self, pin, timeout):
+        line = self._lines[pin]
+        seconds = int(timeout)
+        if line.event_wait(sec=seconds,
+                           nsec=int((timeout - seconds) * 1000000000)):
+            line.event_read()  # remove the event from the queue
+            return True
+        return False
+
+    def clear_edges(self, pin):
+        # each clocked out bit can queue a falling edge
+        line = self._lines[pin]
+        while line.event_wait(sec=0, nsec=0):
+            line.event_read_multiple()
+
+    def cleanup(self):
+        for line in self._lines.values():
+            line.release()
+        self._lines = {}
+        self._bulks = {}
+
+
+class GPIOMemBackend(GPIOBackend):
+    """
+    GPIOMemBackend accesses pins directly through GPIO registers
+    which are memory mapped from /dev/gpiomem the same way
+    as gb_common.c does it in HX711_C. Pin numbers are BCM numbers.
+    It cannot wait for edge by interrupt so wait_for_edge polls.
+    """
+
+    _BLOCK_SIZE = 4 * 1024
+    _GPSET0 = 7  # word offset of the register which sets pins 0..31 high
+    _GPCLR0 = 10  # word offset of the register which sets pins 0..31 low
+    _GPLEV0 = 13  # word offset of the register with levels of pins 0..31
+
+    def __init__(self, path='/dev/gpiomem'):
+        """
+        Init a new instance of GPIOMemBackend
+
+        Args:
+            path(str): Optional, by default '/dev/gpiomem'. File which
+                is memory mapped. A regular file of at least 4 kB
+                can be used instead for testing.
+
+        Raises:
+            OSError: if the file cannot be opened or mapped
+        """
+        self._fd = os.open(path, os.O_RDWR | os.O_SYNC)
+        try:
+            self._mem = mmap.mmap(self._fd, self._BLOCK_SIZE,
+                                  mmap.MAP_SHARED,
+                                  mmap.PROT_READ | mmap.PROT_WRITE)
+        except (OSError, ValueError):
+            os.close(self._fd)
+            raise
+        self._regs = memoryview(self._mem).cast('I')
+        self._pins = {}  # pin: (bank, bit mask)
+
+    def setup_output(self, pin):
+        self.setup_input(pin)  # function select has to be cleared first
+        index = pin // 10
+        self._regs[index] |= 1 << ((pin % 10) * 3)
+        self.set_clock(pin, False)
+
+    def setup_input(self, pin):
+        if not 0 <= pin <= 53:
+            raise ValueError('GPIOMemBackend supports pins 0..53. '
+                             'Received: {}'.format(pin))
+        index = pin // 10
+        self._regs[index] &= ~(7 << ((pin % 10) * 3)) & 0xffffffff
+        self._pins[pin] = (pin // 32, 1 << (pin % 32))
+
+    def set_clock(self, pin, state):
+        bank, mask = self._pins[pin]
+        if state:
+            self._regs[self._GPSET0 + bank] = mask
+        else:
+            self._regs[self._GPCLR0 + bank] = mask
+
+    def read_data(self, pin):
+        bank, mask = self._pins[pin]
+        return 1 if self._regs[self._GPLEV0 + bank] & mask else 0
+
+    def read_lines(self, pins):
+        # pins 0..31 are read from one register at once
+        levels = self._regs[self._GPLEV0]
+        pin_map = self._pins
+        result = []
+        for pin in pins:
+            bank, mask = pin_map[pin]
+            if bank:
+                result.append(self.read_data(pin))
+            else:
+                result.append(1 if levels & mask else 0)
+        return result
+
+    def wait_for_edge(self, pin, timeout):
+        if self.read_data(pin) == 0:
+            return True  # it went low before the wait
+        deadline = time.perf_counter() + timeout
+        while self.read_data(pin):
+            if time.perf_counter() >= deadline:
+                return False
+            time.sleep(0.0002)
+        return True
+
+    def cleanup(self):
+        if self._regs is not None:
+            self._regs.release()
+            self._regs = None
+            self._mem.close()
+            os.close(self._fd)
+
+
+class FakeGPIOBackend(GPIOBackend):
+    """
+    FakeGPIOBackend is an in-process stand-in for GPIO with simulated
+    hx711 chips. It is meant for development and testing without
+    Raspberry Pi. Each chip has its own DOUT pin and chips can share
+    the PD_SCK pin. Conversions run continuously at the data rate.
+    The number of pulses after 24 bits selects channel and gain of
+    the next conversion (25 A 128, 26 B, 27 A 64). PD_SCK high for
+    60 us or more powers the chips down, after that they start again
+    with channel A gain 128.
+    """
+
+    def __init__(self, simulate_power_down=True):
+        """
+        Init a new instance of FakeGPIOBackend
+
+        Args:
+            simulate_power_down(bool): Optional, by default True. If False
+                the chips never power down, so a busy machine which delays
+                a clock pulse does not change the data. HX711 still
+                measures the pulses and counts timing violations.
+        """
+        self._simulate_power_down = simulate_power_down
+        self._outputs = {}  # pin: level
+        self._high_since = {}  # pd_sck pin: time of the rising edge
+        self._chips = {}  # dout pin: chip state
+        self._clock_chips = {}  # pd_sck pin: [chip state]
+        self._slow_pulses = {}  # pd_sck pin: [count, duration]
+
+    def add_chip(self,
+                 dout_pin,
+                 pd_sck_pin,
+                 source=None,
+                 data_rate=80,
+                 settling_conversions=1):
+        """
+        add_chip connects a simulated hx711 to the pins.
+
+        Args:
+            dout_pin(int): pin where the Data pin of simulated hx711 is connected.
+            pd_sck_pin(int): pin where the Clock pin of simulated hx711 is connected.
+            source(function): Optional, it takes channel and gain_A and
+                returns int the next value of conversion. By default
+                it returns 100000 with gaussian noise.
+            data_rate(int): Optional, by default 80. Conversions per second.
+            settling_conversions(int): Optional, by default 1. Conversion
+                periods until the first data is ready after the start
+                or power down.
+
+        Returns: dict state of the simulated chip. Key power_downs
+            is the number of times the chip was powered down.
+        """
+        if source is None:
+            source = _fake_source
+        period = 1.0 / data_rate
+        chip = {
+            'source': source,
+            'period': period,
+            'settling': settling_conversions * period,
+            'pd_sck': pd_sck_pin,
+            'pulses': 25,  # clock pulses since the data was ready
+            'clocked_at': 0.0,  # time of the last rising edge
+            'channel': 'A',
+            'gain_A': 128,
+            'value': 0,
+            'next_ready': time.perf_counter() + settling_conversions * period,
+            'reset': False,  # powered down, it starts again with A 128
+            'power_downs': 0,
+        }
+        self._chips[dout_pin] = chip
+        self._clock_chips.setdefault(pd_sck_pin, []).append(chip)
+        return chip
+
+    def setup_output(self, pin):
+        self._outputs[pin] = False
+
+    def setup_input(self, pin):
+        pass
+
+    def inject_slow_pulses(self, pd_sck_pin, count=1, duration=0.0001):
+        """
+        inject_slow_pulses makes the next clock pulses stay high for
+        the duration. If it is 60 us or more the simulated chips
+        power down and after the pulse they start again with channel A
+        and gain 128 like the real hx711.
+
+        Args:
+            pd_sck_pin(int): pin where the Clock pin of simulated hx711 is connected.
+            count(int): Optional, by default 1. Number of slow pulses.
+            duration(float): Optional, by default 0.0001 s. How long
+                the clock stays high.
+        """
+        self._slow_pulses[pd_sck_pin] = [count, duration]
+
+    def set_clock(self, pin, state):
+        state = bool(state)
+        if state == self._outputs.get(pin, False):
+            return
+        self._outputs[pin] = state
+        if state:
+            now = self._high_since[pin] = time.perf_counter()
+            for chip in self._clock_chips.get(pin, ()):
+                chip['pulses'] += 1
+                chip['clocked_at'] = now
+            slow = self._slow_pulses.get(pin)
+            if slow and slow[0] > 0:
+                # the clock stays high, the falling edge checks the time
+                slow[0] -= 1
+                end = time.perf_counter() + slow[1]
+                while time.perf_counter() < end:
+                    pass
+            return
+        now = time.perf_counter()
+        high_since = self._high_since.pop(pin, None)
+        if (self._simulate_power_down and high_since is not None and
+                now - high_since >= 0.00006):
+            # it was powered down and the falling edge resets the chips
+            for chip in self._clock_chips.get(pin, ()):
+                chip['reset'] = True
+                chip['pulses'] = 25
+                chip['next_ready'] = now + chip['settling']
+                chip['power_downs'] += 1
+
+    def read_data(self, pin):
+        chip = self._chips.get(pin)
+        if chip is None:
+            return 1
+        high_since = self._high_since.get(chip['pd_sck'])
+        if (self._simulate_power_down and high_since is not None and
+                time.perf_counter() - high_since >= 0.00006):
+            return 1  # powered down
+        self._update_chip(chip)
+        pulses = chip['pulses']
+        if pulses == 0:
+            return 0  # data is ready
+        elif pulses <= 24:
+            # bits are shifted out MSB first on each rising edge
+            return (chip['value'] >> (24 - pulses)) & 1
+        else:
+            return 1  # data was read, wait for the next conversion
+
+    def wait_for_edge(self, pin, timeout):
+        if self.read_data(pin) == 0:
+            return True  # it went low before the wait
+        delay = self._chips[pin]['next_ready'] - time.perf_counter()
+        if delay > timeout:
+            time.sleep(timeout)
+            return False
+        if delay > 0:
+            time.sleep(delay)
+        return True
+
+    def _update_chip(self, chip):
+        """
+        _update_chip finishes the conversion of simulated chip when
+        it is time. Conversions run continuously at the data rate.
+        """
+        now = time.perf_counter()
+        if now < chip['next_ready']:
+            return
+        pulses = chip['pulses']
+        if 0 < pulses <= 24 and now - chip['clocked_at'] < 2 * chip['period']:
+            # the frame is being clocked out, a delayed clock pulse does not
+            # mix two conversions. It is loaded when the frame is finished
+            # or when the frame was left unfinished for two periods.
+            return
+        if chip['reset']:
+            chip['reset'] = False
+            chip['channel'] = 'A'
+            chip['gain_A'] = 128
+        elif pulses > 24:
+            # the last frame was finished by gain pulses. 25 for A 128,
+            # 26 for B and 27 for A 64
+            if pulses == 26:
+                chip['channel'] = 'B'
+            else:
+                chip['channel'] = 'A'
+                chip['gain_A'] = 128 if pulses == 25 else 64
+        value = int(chip['source'](chip['channel'], chip['gain_A']))
+        value = max(-0x800000, min(0x7fffff, value))  # saturate like hx711
+        chip['value'] = value & 0xffffff
+        chip['pulses'] = 0
+        missed = (now - chip['next_ready']) // chip['period']
+        chip['next_ready'] += (missed + 1) * chip['period']
+
+
+def _fake_source(channel, gain_A):
+    """
+    _fake_source is the default source of data for FakeGPIOBackend.
+    """
+    return int(random.gauss(100000, 20))
+
+
+class ReplayGPIOBackend(GPIOBackend):
+    """
+    ReplayGPIOBackend replays recorded raw readings as if they came
+    from hx711, so the recorded data goes through the unchanged
+    HX711 conversion, offset, scale ratio and filters.
+    Each channel and gain has its own queue of readings and hx711
+    selects them by the gain pulses as usual. The readings are
+    ready as fast as possible or at the recorded time divided by speed.
+    When the readings of the selected channel and gain run out,
+    the next reading raises EOFError instead of waiting for timeout.
+    PD_SCK high for 60 us or more drops the frame being read and
+    the next reading is channel A gain 128 like after power down.
+    A frame which is not clocked out to the end is replaced by
+    the next reading of the same channel and gain.
+    """
+
+    # gain pulses which select A 128, A 64 and B by mode index
+    _MODE_PULSES = (25, 27, 26)
+
+    def __init__(self, recording, speed=None):
+        """
+        Init a new instance of ReplayGPIOBackend
+
+        Args:
+            recording(iterable): tuples (timestamp, channel, gain_A, raw)
+                sorted by timestamp. timestamp(float) in seconds,
+                channel ('A' || 'B'), gain_A (128 || 64) is ignored for
+                channel B and raw(int) is data from hx711 or False
+                for invalid reading.
+            speed(float): Optional, by default None which replays as fast
+                as possible. Otherwise speed multiplier of recorded time,
+                1.0 is real time.
+
+        Raises:
+            ValueError: if speed is not bigger than 0 or channel is not 'A' or 'B'
+        """
+        if speed is not None and not speed > 0:
+            raise ValueError('Parameter "speed" has to be bigger than 0. '
+                             'Received: {}'.format(speed))
+        self._speed = speed
+        self._queues = {0: deque(), 1: deque(), 2: deque()}
+        self._first_time = None
+        for timestamp, channel, gain_A, raw in recording:
+            mode = HX711._mode_index(channel.capitalize(), int(gain_A or 0))
+            if mode < 0:
+                raise ValueError('Recorded channel has to be "A" or "B" '
+                                 'and gain 128 or 64. Received: {}, {}'.format(
+                                     channel, gain_A))
+            if self._first_time is None:
+                self._first_time = float(timestamp)
+            self._queues[mode].append((float(timestamp), raw))
+        self._start_time = None
+        self._outputs = {}
+        self._clock = None
+        self._clock_high_since = None
+        self._dout = None
+        self._pulses = 25
+        self._read_pulses = 25  # pulses when DOUT was read last time
+        self._mode = 0  # mode of the reading being clocked out
+        self._value = 0
+        self._ready_at = 0.0
+        self.replayed = 0
+
+    @classmethod
+    def from_csv(cls, path, speed=None):
+        """
+        from_csv loads recording from csv file with rows
+        timestamp,channel,gain_A,raw. Empty raw is invalid reading.
+
+        Args:
+            path(str): path of the csv file
+            speed(float): Optional, see __init__
+
+        Returns: ReplayGPIOBackend
+        """
+        with open(path, newline='') as csv_file:
+            recording = [(row[0], row[1], row[2], int(row[3]) if row[3] else False)
+                         for row in csv.reader(csv_file)
+                         if row and not row[0].startswith('#')]
+        return cls(recording, speed)
+
+    def start(self):
+        """
+        start starts the replay. Until then every conversion is 0 and it
+        is ready at once, so HX711 can be created and the channel selected
+        without using up the recorded readings.
+        """
+        self._start_time = time.perf_counter()
+
+    @property
+    def finished(self):
+        """
+        finished is True when all readings of the channel and gain
+        being converted were replayed.
+        """
+        return (self._start_time is not None and self._pulses > 24 and
+                not self._queues[self._next_mode()])
+
+    def remaining(self, channel='A', gain_A=128):
+        """
+        remaining returns the number of readings not yet replayed.
+
+        Args:
+            channel(str): Optional, by default 'A'. ('A' || 'B')
+            gain_A(int): Optional, by default 128. (128 || 64)
+
+        Returns: int number of readings
+        """
+        return len(self._queues.get(self._mode_index(channel, gain_A), ()))
+
+    def setup_output(self, pin):
+        self._clock = pin
+        self._outputs[pin] = False
+
+    def setup_input(self, pin):
+        self._dout = pin
+
+    def set_clock(self, pin, state):
+        if pin == self._clock:
+            if state and not self._outputs.get(pin):
+                self._pulses += 1
+                self._clock_high_since = time.perf_counter()
+            elif not state and self._clock_high_since is not None:
+                if time.perf_counter() - self._clock_high_since >= 0.00006:
+                    # hx711 was powered down and wakes up with A 128
+                    self._pulses = 25
+                self._clock_high_since = None
+        self._outputs[pin] = bool(state)
+
+    def read_data(self, pin):
+        if pin != self._dout:
+            return 1
+        pulses = self._pulses
+        if 0 < pulses <= 24 and pulses == self._read_pulses:
+            # DOUT is polled again without clock pulse so HX711 gave up
+            # the frame, the chip keeps the channel and gain
+            self._pulses = pulses = self._MODE_PULSES[self._mode]
+        self._read_pulses = pulses
+        if pulses > 24:
+            self._next_conversion()
+            pulses = self._pulses
+            if pulses > 24:
+                raise EOFError('Replay of recorded readings is finished.')
+        if pulses == 0:
+            return 0 if time.perf_counter() >= self._ready_at else 1
+        # bits are shifted out MSB first on each rising edge
+        return (self._value >> (24 - pulses)) & 1
+
+    def wait_for_edge(self, pin, timeout):
+        if self.read_data(pin) == 0:
+            return True  # it went low before the wait
+        delay = self._ready_at - time.perf_counter()
+        if delay > timeout:
+            time.sleep(timeout)
+            return False
+        if delay > 0:
+            time.sleep(delay)
+        return True
+
+    @staticmethod
+    def _mode_index(channel, gain_A):
+        return HX711._mode_index(channel.capitalize(), gain_A)
+
+    def _next_mode(self):
+        """
+        _next_mode returns mode selected by the gain pulses.
+        25 for A 128, 26 for B and 27 for A 64
+        """
+        if self._pulses == 26:
+            return 2
+        elif self._pulses >= 27:
+            return 1
+        return 0
+
+    def _next_conversion(self):
+        """
+        _next_conversion loads the next recorded reading of
+        channel and gain selected by the gain pulses.
+        """
+        mode = self._next_mode()
+        if self._start_time is None:
+            raw = 0
+            self._ready_at = 0.0
+        else:
+            pending = self._queues[mode]
+            if not pending:
+                return
+            timestamp, raw = pending.popleft()
+            if self._speed is None:
+                self._ready_at = 0.0
+            else:
+                self._ready_at = self._start_time + (
+                    timestamp - self._first_time) / self._speed
+            self.replayed += 1
+        if raw is False or raw is None:
+            raw = 0x7fffff  # hx711 treats it as invalid
+        self._mode = mode
+        self._value = int(raw) & 0xffffff
+        self._pulses = 0
+
+
+class NumpyFilterEngine:
+    """
+    NumpyFilterEngine does the same filtering as outliers_filter and
+    the mean of filtered data with NumPy. Invalid values are masked,
+    outliers are rejected by the distance from the median compared
+    to the standard deviation of distances. It can filter many windows
+    (for example readings of many chips) in one call.
+    """
+
+    def __init__(self, stdev_thresh=1.0):
+        """
+        Init a new instance of NumpyFilterEngine
+
+        Args:
+            stdev_thresh(float): Optional, by default 1.0. Readings further
+                from the median than stdev_thresh standard deviations
+                are rejected.
+
+        Raises:
+            ImportError: if numpy is not installed
+        """
+        if np is None:
+            raise ImportError('NumpyFilterEngine requires numpy library.')
+        self._stdev_thresh = stdev_thresh
+
+    def get_config(self):
+        """
+        get_config returns arguments of __init__ so the same
+        engine can be created again.
+
+        Returns: dict keyword arguments
+        """
+        return {'stdev_thresh': self._stdev_thresh}
+
+    def filter(self, data_list):
+        """
+        filter returns filtered data the same as outliers_filter.
+        It can be used as data filter of HX711.
+
+        Args:
+            data_list([int]): readings. It can contain Bool False that is removed.
+
+        Returns: numpy.ndarray filtered data. Excluding outliers.
+        """
+        data = np.asarray(data_list, dtype=np.int32)
+        # -1 indicates no signal. False and True are equal to 0 and 1
+        data = data[(data != -1) & (data != 0) & (data != 1)]
+        if data.size < 2:
+            return data
+        median = np.median(data)
+        dists_from_median = np.abs(data - median)
+        stdev = dists_from_median.std(ddof=1)
+        if not stdev:
+            # stdev is 0. Therefore return just the median
+            return np.array([median])
+        return data[dists_from_median / stdev < self._stdev_thresh]
+
+    def mean(self, data_list, metrics=None, mode=-1):
+        """
+        mean returns mean value of filtered data.
+
+        Args:
+            data_list([int]): readings. It can contain Bool False.
+            metrics(HX711Metrics): Optional, the number of readings and
+                how many of them were kept is counted in it.
+            mode(int): Optional, index of channel and gain for metrics
+                from HX711._mode_index.
+
+        Returns: (bool || float) False if there is no valid data.
+        """
+        filtered_data = self.filter(data_list)
+        if metrics is not None:
+            metrics.observe_filter(mode, len(data_list), filtered_data.size)
+        if not filtered_data.size:
+            return False
+        return float(filtered_data.mean())
+
+    def batch_mean(self, windows, metrics=None, mode=-1):
+        """
+        batch_mean filters each row of windows and returns its mean.
+
+        Args:
+            windows(2D array like): one row of readings for each window
+                or device. It can contain False.
+            metrics(HX711Metrics): Optional, the number of readings and
+                how many of them were kept is counted in it.
+            mode(int): Optional, index of channel and gain for metrics
+                from HX711._mode_index.
+
+        Returns: numpy.ndarray float64 mean for each row. NaN if the row
+            has no valid data.
+        """
+        data = np.asarray(windows, dtype=np.int32)
+        if data.ndim != 2:
+            raise ValueError('Parameter "windows" has to be 2 dimensional. '
+                             'Received shape: {}'.format(data.shape))
+        valid = (data != -1) & (data != 0) & (data != 1)
+        values = np.where(valid, data, np.nan)
+        counts = valid.sum(axis=1)
+        result = np.full(data.shape[0], np.nan)
+        rows = counts > 0
+        if not rows.any():
+            if metrics is not None:
+                metrics.observe_filter(mode, data.size, 0)
+            return result
+        values = values[rows]
+        counts = counts[rows]
+        median = np.nanmedian(values, axis=1)
+        dists_from_median = np.abs(values - median[:, None])
+        with np.errstate(invalid='ignore', divide='ignore'):
+            # sample standard deviation of distances, NaN if only one reading
+            dists_mean = np.nansum(dists_from_median, axis=1) / counts
+            stdev = np.sqrt(
+                np.nansum((dists_from_median - dists_mean[:, None])**2, axis=1)
+                / (counts - 1))
+            keep = dists_from_median / stdev[:, None] < self._stdev_thresh
+            kept = keep.sum(axis=1)
+            means = np.where(keep, values, 0.0).sum(axis=1) / kept
+        # stdev is 0 or there is only one reading. Therefore use the median
+        single = ~(stdev > 0)
+        means[single] = median[single]
+        means[~single & (kept == 0)] = np.nan
+        result[rows] = means
+        if metrics is not None:
+            # like filter, only the median is kept when stdev is 0
+            metrics.observe_filter(mode, data.size,
+                                   int(np.where(single, 1, kept).sum()))
+        return result
+
+
+class StreamFilter:
+    """
+    StreamFilter is the interface of stateful filters which take one
+    reading at a time and return the filtered value immediately.
+    """
+
+    def update(self, sample):
+        """
+        update adds new reading to the filter.
+
+        Args:
+            sample(int || float): new reading
+
+        Returns: float filtered value
+        """
+        raise NotImplementedError
+
+    def reset(self):
+        """
+        reset forgets all readings.
+        """
+        raise NotImplementedError
+
+    def get_config(self):
+        """
+        get_config returns arguments of __init__ so the same
+        filter can be created again.
+
+        Returns: dict keyword arguments
+        """
+        raise NotImplementedError
+
+
+class RunningMedianFilter(StreamFilter):
+    """
+    RunningMedianFilter returns median of the last window readings.
+    It keeps two heaps with lazy deletion so update costs O(log n).
+    """
+
+    def __init__(self, window=15):
+        """
+        Init a new instance of RunningMedianFilter
+
+        Args:
+            window(int): Optional, by default 15. Number of readings.
+
+        Raises:
+            ValueError: if window is less than 1
+        """
+        if not isinstance(window, int) or window < 1:
+            raise ValueError('Parameter "window" has to be int bigger than 0. '
+                             'Received: {}'.format(window))
+        self._window = window
+        self.reset()
+
+    def get_config(self):
+        return {'window': self._window}
+
+    def reset(self):
+        self._low = []  # max heap of the lower half as (-value, index)
+        self._high = []  # min heap of the upper half as (value, index)
+        self._low_size = 0  # number of valid entries in _low
+        self._high_size = 0  # number of valid entries in _high
+        self._side = {}  # index: True if it is in _low
+        self._removed = set()  # indexes which left the window
+        self._indexes = deque()
+        self._index = 0
+
+    def update(self, sample):
+        index = self._index
+        self._index += 1
+        if not self._low_size or sample <= -self._low[0][0]:
+            heapq.heappush(self._low, (-sample, index))
+            self._side[index] = True
+            self._low_size += 1
+        else:
+            heapq.heappush(self._high, (sample, index))
+            self._side[index] = False
+            self._high_size += 1
+        self._indexes.append(index)
+        if len(self._indexes) > self._window:
+            old_index = self._indexes.popleft()
+            self._removed.add(old_index)
+            if self._side.pop(old_index):
+                self._low_size -= 1
+            else:
+                self._high_size -= 1
+        self._rebalance()
+        if len(self._low) + len(self._high) > 2 * self._window + 16:
+            self._compact()
+        return self.median()
+
+    def median(self):
+        """
+        median returns the median of the readings in the window.
+
+        Returns: float median. 0.0 if there are no readings.
+        """
+        if not self._low_size:
+            return 0.0
+        if self._low_size > self._high_size:
+            return float(-self._low[0][0])
+        return (-self._low[0][0] + self._high[0][0]) / 2
+
+    def _prune(self, heap):
+        """
+        _prune removes the entries which left the window from top of heap.
+        """
+        while heap and heap[0][1] in self._removed:
+            self._removed.discard(heapq.heappop(heap)[1])
+
+    def _compact(self):
+        """
+        _compact removes all entries which left the window from the heaps
+        so they do not grow. Amortized it costs O(1) per update.
+        """
+        removed = self._removed
+        self._low = [entry for entry in self._low if entry[1] not in removed]
+        self._high = [entry for entry in self._high if entry[1] not in removed]
+        heapq.heapify(self._low)
+        heapq.heapify(self._high)
+        self._removed = set()
+
+    def _rebalance(self):
+        """
+        _rebalance keeps the lower half equal or one entry bigger
+        than the upper half.
+        """
+        self._prune(self._low)
+        self._prune(self._high)
+        while self._low_size > self._high_size + 1:
+            value, index = heapq.heappop(self._low)
+            heapq.heappush(self._high, (-value, index))
+            self._side[index] = False
+            self._low_size -= 1
+            self._high_size += 1
+            self._prune(self._low)
+        while self._high_size > self._low_size:
+            value, index = heapq.heappop(self._high)
+            heapq.heappush(self._low, (-value, index))
+            self._side[index] = True
+            self._high_size -= 1
+            self._low_size += 1
+            self._prune(self._high)
+
+
+class HampelFilter(StreamFilter):
+    """
+    HampelFilter replaces outliers by the running median. A reading is
+    an outlier when its distance from the median is bigger than n_sigmas
+    times the scaled median absolute deviation (MAD). MAD is the running
+    median of distances of readings from the median at the time they
+    came, therefore update costs O(log n).
+    """
+
+    def __init__(self, window=15, n_sigmas=3.0):
+        """
+        Init a new instance of HampelFilter
+
+        Args:
+            window(int): Optional, by default 15. Number of readings.
+            n_sigmas(float): Optional, by default 3.0. Threshold
+                in standard deviations.
+        """
+        self._median = RunningMedianFilter(window)
+        self._mad = RunningMedianFilter(window)
+        self._n_sigmas = n_sigmas
+
+    def get_config(self):
+        return {'window': self._median._window, 'n_sigmas': self._n_sigmas}
+
+    def reset(self):
+        self._median.reset()
+        self._mad.reset()
+
+    def update(self, sample):
+        median = self._median.update(sample)
+        distance = abs(sample - median)
+        # 1.4826 scales MAD to standard deviation of normal distribution
+        sigma = 1.4826 * self._mad.update(distance)
+        if sigma and distance > self._n_sigmas * sigma:
+            return median
+        return float(sample)
+
+
+class EMAFilter(StreamFilter):
+    """
+    EMAFilter is exponential moving average. Update costs O(1).
+    """
+
+    def __init__(self, alpha=0.2):
+        """
+        Init a new instance of EMAFilter
+
+        Args:
+            alpha(float): Optional, by default 0.2. Weight of the new
+                reading. Options 0 < alpha <= 1
+
+        Raises:
+            ValueError: if alpha is not in range (0, 1]
+        """
+        if not 0 < alpha <= 1:
+            raise ValueError('Parameter "alpha" has to be in range (0, 1]. '
+                             'Received: {}'.format(alpha))
+        self._alpha = alpha
+        self.reset()
+
+    def get_config(self):
+        return {'alpha': self._alpha}
+
+    def reset(self):
+        self._value = None
+
+    def update(self, sample):
+        if self._value is None:
+            self._value = float(sample)
+        else:
+            self._value += self._alpha * (sample - self._value)
+        return self._value
+
+
+class KalmanFilter(StreamFilter):
+    """
+    KalmanFilter is one dimensional Kalman filter for a load which is
+    constant except for random changes. Update costs O(1).
+    """
+
+    def __init__(self, process_variance=1.0, measurement_variance=100.0):
+        """
+        Init a new instance of KalmanFilter
+
+        Args:
+            process_variance(float): Optional, by default 1.0. How much
+                the load changes between readings (variance in raw units).
+            measurement_variance(float): Optional, by default 100.0.
+                Noise of hx711 readings (variance in raw units).
+        """
+        self._process_variance = process_variance
+        self._measurement_variance = measurement_variance
+        self.reset()
+
+    def get_config(self):
+        return {
+            'process_variance': self._process_variance,
+            'measurement_variance': self._measurement_variance,
+        }
+
+    def reset(self):
+        self._estimate = None
+        self._error_variance = 0.0
+
+    def update(self, sample):
+        if self._estimate is None:
+            self._estimate = float(sample)
+            self._error_variance = self._measurement_variance
+            return self._estimate
+        # predict
+        self._error_variance += self._process_variance
+        # correct
+        gain = self._error_variance / (self._error_variance +
+                                       self._measurement_variance)
+        self._estimate += gain * (sample - self._estimate)
+        self._error_variance *= 1 - gain
+        return self._estimate
+
+
+class Calibration:
+    """
+    Calibration converts data (raw data minus offset) to weight by
+    a function fitted from readings of several known weights.
+    Kinds are 'linear' (least squares line), 'poly' (polynomial)
+    and 'piecewise' (line segments between the points, the end
+    segments are extended). Segment slopes and intercepts are
+    precomputed, so convert maps whole NumPy arrays without
+    Python loops.
+    """
+
+    KINDS = ('linear', 'poly', 'piecewise')
+
+    def __init__(self, kind, coefficients, breakpoints=(), center=0.0,
+                 scale=1.0):
+        """
+        Init a new instance of Calibration. Use Calibration.fit to create
+        it from known weights.
+
+        Args:
+            kind(str): ('linear' || 'poly' || 'piecewise')
+            coefficients([float]): for linear and poly coefficients of
+                polynomial in (data - center) / scale, the highest power
+                first. For piecewise pairs (slope, intercept) of segments.
+            breakpoints([float]): Optional, for piecewise sorted data values
+                where the segments start, the first one is not used.
+            center(float): Optional, by default 0.0.
+            scale(float): Optional, by default 1.0.
+
+        Raises:
+            ValueError: if kind is unknown or coefficients do not match
+        """
+        if kind not in self.KINDS:
+            raise ValueError('Parameter "kind" has to be one of {}. '
+                             'Received: {}'.format(self.KINDS, kind))
+        coefficients = [
+            tuple(float(value) for value in coefficient)
+            if kind == 'piecewise' else float(coefficient)
+            for coefficient in coefficients
+        ]
+        if not coefficients or (kind == 'piecewise' and
+                                len(coefficients) != len(breakpoints)):
+            raise ValueError('Coefficients do not match the breakpoints. '
+                             'Received: {}, {}'.format(coefficients,
+                                                       breakpoints))
+        self._kind = kind
+        self._coefficients = coefficients
+        self._breakpoints = [float(value) for value in breakpoints]
+        self._center = float(center)
+        self._scale = float(scale)
+        self._tables = None  # numpy arrays for convert, created lazily
+
+    @classmethod
+    def fit(cls, data, weights, kind='linear', degree=2):
+        """
+        fit creates calibration from readings of known weights.
+
+        Args:
+            data([float]): data (raw data minus offset) for each weight,
+                for example from get_data_mean
+            weights([float]): known weights in any units
+            kind(str): Optional, by default 'linear'.
+                ('linear' || 'poly' || 'piecewise')
+            degree(int): Optional, by default 2. Degree of polynomial
+                for kind 'poly'.
+
+        Raises:
+            ValueError: if there are not enough points or data repeat
+            ImportError: if kind is 'poly' and numpy is not installed
+
+        Returns: Calibration
+        """
+        points = sorted(zip((float(value) for value in data),
+                            (float(weight) for weight in weights)))
+        needed = degree + 1 if kind == 'poly' else 2
+        if len(points) < needed or len(set(x for x, _ in points)) != len(points):
+            raise ValueError('Calibration "{}" needs at least {} points with '
+                             'different data. Received: {}'.format(
+                                 kind, needed, points))
+        xs = [x for x, _ in points]
+        ys = [y for _, y in points]
+        if kind == 'piecewise':
+            segments = []
+            for i in range(len(points) - 1):
+                slope = (ys[i + 1] - ys[i]) / (xs[i + 1] - xs[i])
+                segments.append((slope, ys[i] - slope * xs[i]))
+            return cls(kind, segments, xs[:-1])
+        # polynomial is fitted in normalized data for numerical stability
+        center = stat.mean(xs)
+        scale = max(abs(x - center) for x in xs)
+        normalized = [(x - center) / scale for x in xs]
+        if kind == 'linear':
+            mean_y = stat.mean(ys)
+            slope = (sum(x * (y - mean_y) for x, y in zip(normalized, ys)) /
+                     sum(x * x for x in normalized))
+            return cls(kind, [slope, mean_y], center=center, scale=scale)
+        if kind == 'poly':
+            if np is None:
+                raise ImportError('Calibration "poly" requires numpy library.')
+            coefficients = np.polyfit(normalized, ys, degree)
+            return cls(kind, coefficients.tolist(), center=center, scale=scale)
+        raise ValueError('Parameter "kind" has to be one of {}. '
+                         'Received: {}'.format(cls.KINDS, kind))
+
+    def convert(self, data, offset=0):
+        """
+        convert maps data to weight.
+
+        Args:
+            data(int || float || array like): data (raw data minus offset)
+                or numpy array, list or buffer of them
+            offset(int || float): Optional, by default 0. It is subtracted
+                from data first, pass the offset to convert raw data.
+
+        Returns: (float || numpy.ndarray) weight. For array like data
+            numpy.ndarray float64 or list if numpy is not installed.
+        """
+        if isinstance(data, (int, float)):
+            return self._convert_value(data - offset)
+        if np is None:
+            return [self._convert_value(value - offset) for value in data]
+        tables = self._tables
+        if tables is None:
+            tables = self._tables = (np.array(self._coefficients),
+                                     np.array(self._breakpoints))
+        values = np.asarray(data, dtype=np.float64)
+        if offset:
+            values = values - offset
+        if self._kind == 'piecewise':
+            segments = np.searchsorted(tables[1][1:], values, side='right')
+            return tables[0][segments, 0] * values + tables[0][segments, 1]
+        return np.polyval(tables[0], (values - self._center) / self._scale)
+
+    def to_dict(self):
+        """
+        to_dict returns calibration as dict which can be saved as JSON.
+
+        Returns: dict with kind, coefficients, breakpoints, center and scale
+        """
+        return {
+            'kind': self._kind,
+            'coefficients': [
+                list(coefficient) if self._kind == 'piecewise' else coefficient
+                for coefficient in self._coefficients
+            ],
+            'breakpoints': self._breakpoints,
+            'center': self._center,
+            'scale': self._scale,
+        }
+
+    @classmethod
+    def from_dict(cls, calibration):
+        """
+        from_dict creates calibration from to_dict.
+
+        Returns: Calibration
+        """
+        return cls(**calibration)
+
+    def _convert_value(self, value):
+        """
+        _convert_value maps one value to weight.
+        """
+        if self._kind == 'piecewise':
+            slope, intercept = self._coefficients[max(
+                0, bisect.bisect_right(self._breakpoints, value) - 1)]
+            return slope * value + intercept
+        value = (value - self._center) / self._scale
+        result = 0.0
+        for coefficient in self._coefficients:
+            result = result * value + coefficient
+        return result
+
+
+class StabilityDetector:
+    """
+    StabilityDetector tells when the load on the scale settled.
+    It keeps a sliding window of the last weights. The window is steady
+    when the standard deviation of the weights and their drift over
+    the window (least squares slope times window duration) are both
+    within tolerance. The weight is stable when the window stays
+    steady for hold_time seconds. HX711 updates it with every
+    conversion of its channel and gain.
+    """
+
+    def __init__(self, tolerance, hold_time=0.5, window=10):
+        """
+        Init a new instance of StabilityDetector
+
+        Args:
+            tolerance(float): allowed standard deviation and drift
+                of the window in weight units
+            hold_time(float): Optional, by default 0.5 s. How long
+                the window has to be steady.
+            window(int): Optional, by default 10. Number of weights
+                in the sliding window.
+
+        Raises:
+            ValueError: if tolerance is not bigger than 0, hold_time is
+                negative or window is not int bigger than 1
+        """
+        if not tolerance > 0:
+            raise ValueError('Parameter "tolerance" has to be bigger than 0. '
+                             'Received: {}'.format(tolerance))
+        if not hold_time >= 0:
+            raise ValueError('Parameter "hold_time" has to be 0 or bigger. '
+                             'Received: {}'.format(hold_time))
+        if not isinstance(window, int) or window < 2:
+            raise ValueError('Parameter "window" has to be int bigger than 1. '
+                             'Received: {}'.format(window))
+        self.tolerance = tolerance
+        self.hold_time = hold_time
+        self.window = window
+        self.reset()
+
+    def reset(self):
+        """
+        reset forgets the weights, the weight is not stable until
+        the window is full again.
+        """
+        self._weights = deque(maxlen=self.window)
+        self._times = deque(maxlen=self.window)
+        self._steady_since = None
+        self.stable = False
+        self.weight = False  # mean of the window, False until it is full
+
+    def update(self, weight, timestamp=None):
+        """
+        update adds the weight of one conversion to the window.
+
+        Args:
+            weight(float): weight of the conversion
+            timestamp(float): Optional, by default time.perf_counter().
+                Time of the conversion in seconds.
+
+        Returns: bool True if the weight is stable
+        """
+        if timestamp is None:
+            timestamp = time.perf_counter()
+        weights = self._weights
+        times = self._times
+        weights.append(weight)
+        times.append(timestamp)
+        count = len(weights)
+        if count < self.window:
+            return False
+        mean = sum(weights) / count
+        mean_time = sum(times) / count
+        variance = 0.0
+        covariance = 0.0
+        time_variance = 0.0
+        for value, value_time in zip(weights, times):
+            deviation = value - mean
+            time_deviation = value_time - mean_time
+            variance += deviation * deviation
+            covariance += deviation * time_deviation
+            time_variance += time_deviation * time_deviation
+        drift = 0.0
+        if time_variance:
+            drift = abs(covariance / time_variance * (times[-1] - times[0]))
+        self.weight = mean
+        tolerance = self.tolerance
+        if variance / (count - 1) <= tolerance * tolerance and drift <= tolerance:
+            if self._steady_since is None:
+                self._steady_since = timestamp
+            self.stable = timestamp - self._steady_since >= self.hold_time
+        else:
+            self._steady_since = None
+            self.stable = False
+        return self.stable
+
+
+class RecoveryPolicy:
+    """
+    RecoveryPolicy decides what HX711 does when a clock pulse takes
+    60 us or more and hx711 may have entered power down mode.
+    After such pulse the next conversions are discarded because
+    hx711 woke up with channel A gain 128 and they are not settled.
+    A frame broken by the slow pulse is read again up to max_retries
+    times, so one bad frame costs at most
+    (max_retries + 1) * (wakeup_discard + 1) conversions.
+    It counts violations, retries, discarded and failed readings.
+    """
+
+    def __init__(self, max_retries=2, wakeup_discard=2):
+        """
+        Init a new instance of RecoveryPolicy
+
+        Args:
+            max_retries(int): Optional, by default 2. How many times
+                a broken frame is read again in one reading.
+            wakeup_discard(int): Optional, by default 2. Number of
+                conversions discarded after each timing violation.
+                With 0 the first conversion after wake up is channel A
+                gain 128 whatever channel is selected.
+
+        Raises:
+            ValueError: if max_retries or wakeup_discard is not int 0 or bigger
+        """
+        if not isinstance(max_retries, int) or max_retries < 0:
+            raise ValueError('Parameter "max_retries" has to be int 0 or '
+                             'bigger. Received: {}'.format(max_retries))
+        if not isinstance(wakeup_discard, int) or wakeup_discard < 0:
+            raise ValueError('Parameter "wakeup_discard" has to be int 0 or '
+                             'bigger. Received: {}'.format(wakeup_discard))
+        self.max_retries = max_retries
+        self.wakeup_discard = wakeup_discard
+        self.reset_stats()
+
+    def reset_stats(self):
+        """
+        reset_stats sets all counters to 0.
+        """
+        self.violations = 0  # clock pulses of 60 us or more
+        self.retries = 0  # broken frames read again
+        self.discarded = 0  # conversions discarded after wake up
+        self.failures = 0  # readings which ran out of retries
+
+    def get_stats(self):
+        """
+        get_stats returns the counters.
+
+        Returns: dict with keys violations, retries, discarded and failures
+        """
+        return {
+            'violations': self.violations,
+            'retries': self.retries,
+            'discarded': self.discarded,
+            'failures': self.failures,
+        }
+
+
+class HX711Metrics:
+    """
+    HX711Metrics keeps counters and histograms of one HX711 for each
+    channel and gain. An update is a few additions and one bisect,
+    therefore it is always on. It can be read by stats() or rendered
+    in Prometheus text format by render_metrics_text().
+    """
+
+    MODES = ('A_128', 'A_64', 'B')  # in order of HX711._mode_index
+    # upper bounds of histogram buckets in seconds
+    WAIT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                    0.25, 0.5)
+    FRAME_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025,
+                     0.005, 0.01)
+
+    def __init__(self):
+        """
+        Init a new instance of HX711Metrics
+        """
+        self.reset()
+
+    def reset(self):
+        """
+        reset sets all counters and histograms to 0.
+        """
+        self._modes = [{
+            'conversions': 0,
+            'invalid': 0,
+            'timing_violations': 0,
+            'ready_timeouts': 0,
+            'filter_readings': 0,
+            'filter_rejected': 0,
+            'wait_buckets': [0] * (len(self.WAIT_BUCKETS) + 1),
+            'wait_sum': 0.0,
+            'frame_buckets': [0] * (len(self.FRAME_BUCKETS) + 1),
+            'frame_sum': 0.0,
+            'last_time': 0.0,
+            'interval': 0.0,  # moving average of time between conversions
+        } for _ in self.MODES]
+
+    def observe_frame(self, mode, wait_time, frame_time, invalid, violation,
+                      now):
+        """
+        observe_frame records one frame read from hx711.
+
+        Args:
+            mode(int): index of channel and gain from HX711._mode_index
+            wait_time(float): seconds waited for data ready
+            frame_time(float): seconds of clocking out the frame
+            invalid(bool): True if the data was 0x7fffff or 0x800000
+            violation(bool): True if a clock pulse took 60 us or more
+            now(float): time.perf_counter() at the end of the frame
+        """
+        if mode < 0:
+            return
+        metrics = self._modes[mode]
+        metrics['conversions'] += 1
+        if invalid:
+            metrics['invalid'] += 1
+        if violation:
+            metrics['timing_violations'] += 1
+        metrics['wait_buckets'][bisect.bisect_left(self.WAIT_BUCKETS,
+                                                   wait_time)] += 1
+        metrics['wait_sum'] += wait_time
+        metrics['frame_buckets'][bisect.bisect_left(self.FRAME_BUCKETS,
+                                                    frame_time)] += 1
+        metrics['frame_sum'] += frame_time
+        interval = now - metrics['last_time']
+        metrics['last_time'] = now
+        if interval < 1.0:  # longer gap means the reading was paused
+            if metrics['interval']:
+                metrics['interval'] += 0.1 * (interval - metrics['interval'])
+            else:
+                metrics['interval'] = interval
+
+    def observe_timeout(self, mode):
+        """
+        observe_timeout records that data was not ready in time.
+
+        Args:
+            mode(int): index of channel and gain from HX711._mode_index
+        """
+        if mode >= 0:
+            self._modes[mode]['ready_timeouts'] += 1
+
+    def observe_filter(self, mode, readings, kept):
+        """
+        observe_filter records how many readings the data filter kept.
+
+        Args:
+            mode(int): index of channel and gain from HX711._mode_index
+            readings(int): number of readings passed to the filter
+            kept(int): number of readings returned by the filter
+        """
+        if mode >= 0:
+            self._modes[mode]['filter_readings'] += readings
+            self._modes[mode]['filter_rejected'] += readings - kept
+
+    def stats(self):
+        """
+        stats returns the counters and histograms for each channel and gain.
+
+        Returns: dict {'A_128': dict, 'A_64': dict, 'B': dict} with
+            conversions, invalid, timing_violations, ready_timeouts,
+            filter_readings, filter_rejected, filter_rejection_ratio,
+            effective_sps and histograms wait_time and frame_time as dict
+            with count, sum and buckets {upper bound: cumulative count}.
+        """
+        stats = {}
+        for name, metrics in zip(self.MODES, self._modes):
+            mode_stats = {
+                key: metrics[key]
+                for key in ('conversions', 'invalid', 'timing_violations',
+                            'ready_timeouts', 'filter_readings',
+                            'filter_rejected')
+            }
+            mode_stats['filter_rejection_ratio'] = (
+                metrics['filter_rejected'] / metrics['filter_readings']
+                if metrics['filter_readings'] else 0.0)
+            mode_stats['effective_sps'] = (1.0 / metrics['interval']
+                                           if metrics['interval'] else 0.0)
+            mode_stats['wait_time'] = self._histogram(
+                self.WAIT_BUCKETS, metrics['wait_buckets'],
+                metrics['wait_sum'])
+            mode_stats['frame_time'] = self._histogram(
+                self.FRAME_BUCKETS, metrics['frame_buckets'],
+                metrics['frame_sum'])
+            stats[name] = mode_stats
+        return stats
+
+    @staticmethod
+    def _histogram(bounds, counts, total):
+        """
+        _histogram converts bucket counts to cumulative counts.
+        """
+        buckets = {}
+        cumulative = 0
+        for bound, count in zip(bounds + (float('inf'),), counts):
+            cumulative += count
+            buckets[bound] = cumulative
+        return {'count': cumulative, 'sum': total, 'buckets': buckets}
+
+
+def render_metrics_text(scales, prefix='hx711'):
+    """
+    render_metrics_text renders metrics of several HX711 in Prometheus
+    text format. It can be written to a file for node_exporter
+    textfile collector, see write_metrics_textfile.
+
+    Args:
+        scales(dict): {name: HX711, HX711Array or HX711Metrics}, the name
+            is used as label scale
+        prefix(str): Optional, by default 'hx711'. Prefix of metric names.
+
+    Returns: str metrics in Prometheus text format
+    """
+    stats = {}
+    for name, scale in scales.items():
+        if isinstance(scale, (HX711, HX711Array)):
+            scale = scale.get_metrics()
+        stats[name] = scale.stats()
+    families = (
+        ('conversions_total', 'counter', 'Conversions read from hx711.'),
+        ('invalid_total', 'counter',
+         'Conversions with invalid value 0x7fffff or 0x800000.'),
+        ('timing_violations_total', 'counter',
+         'Frames with a clock pulse of 60 us or more.'),
+        ('ready_timeouts_total', 'counter', 'Data was not ready in time.'),
+        ('filter_readings_total', 'counter',
+         'Readings passed to the data filter.'),
+        ('filter_rejected_total', 'counter',
+         'Readings rejected by the data filter.'),
+        ('effective_sps', 'gauge', 'Conversions per second.'),
+    )
+    lines = []
+    for family, metric_type, help_text in families:
+        name = '{}_{}'.format(prefix, family)
+        lines.append('# HELP {} {}'.format(name, help_text))
+        lines.append('# TYPE {} {}'.format(name, metric_type))
+        key = family[:-len('_total')] if metric_type == 'counter' else family
+        for scale, modes in stats.items():
+            for mode, mode_stats in modes.items():
+                lines.append('{}{{{}}} {}'.format(
+                    name, _metric_labels(scale, mode), mode_stats[key]))
+    histograms = (
+        ('data_ready_wait_seconds', 'wait_time',
+         'Time waited for data ready.'),
+        ('frame_duration_seconds', 'frame_time',
+         'Time of clocking out one frame.'),
+    )
+    for family, key, help_text in histograms:
+        name = '{}_{}'.format(prefix, family)
+        lines.append('# HELP {} {}'.format(name, help_text))
+        lines.append('# TYPE {} histogram'.format(name))
+        for scale, modes in stats.items():
+            for mode, mode_stats in modes.items():
+                labels = _metric_labels(scale, mode)
+                histogram = mode_stats[key]
+                for bound, count in histogram['buckets'].items():
+                    lines.append('{}_bucket{{{},le="{}"}} {}'.format(
+                        name, labels,
+                        '+Inf' if bound == float('inf') else repr(bound),
+                        count))
+                lines.append('{}_sum{{{}}} {}'.format(
+                    name, labels, repr(histogram['sum'])))
+                lines.append('{}_count{{{}}} {}'.format(
+                    name, labels, histogram['count']))
+    return '\n'.join(lines) + '\n'
+
+
+def write_metrics_textfile(path, scales, prefix='hx711'):
+    """
+    write_metrics_textfile writes metrics rendered by render_metrics_text
+    to the file. It writes a temporary file and renames it, so the
+    collector never reads a half written file.
+
+    Args:
+        path(str): path of the file, it should end with .prom
+        scales(dict): {name: HX711, HX711Array or HX711Metrics}
+        prefix(str): Optional, by default 'hx711'. Prefix of metric names.
+    """
+    _write_file_atomic(path, render_metrics_text(scales, prefix))
+
+
+def _write_file_atomic(path, text):
+    """
+    _write_file_atomic writes text to a temporary file in the same
+    directory, syncs it to disk and renames it to path. Readers see
+    either the old or the new file, never a half written one.
+    """
+    temp_path = '{}.{}.tmp'.format(path, os.getpid())
+    try:
+        with open(temp_path, 'w') as temp_file:
+            temp_file.write(text)
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def _metric_labels(scale, mode):
+    """
+    _metric_labels returns labels of scale and mode for metrics text.
+    """
+    channel, _, gain = mode.partition('_')
+    scale = str(scale).replace('\\', '\\\\').replace('"', '\\"')
+    return 'scale="{}",channel="{}",gain="{}"'.format(
+        scale, channel, gain or '32')
+
+
+class SampleRecorder:
+    """
+    SampleRecorder appends every reading of HX711 to segment files
+    in a directory as fixed width binary records: int64 timestamp in ns,
+    int32 raw data, byte with channel and gain (HX711._mode_index) and
+    byte with flags. Timestamps of one recorder never decrease even if
+    the system clock is set back, so segments stay sorted by time.
+    It keeps a pyramid of min, max and mean of valid
+    readings for buckets of 1 s up to 1 day, so a long time range can be
+    read by SampleLog without reading every sample.
+    record only appends to a buffer in memory. A writer thread writes
+    and syncs the records to disk in batches, so disk latency does not
+    delay the reading and a crash loses at most the last batch.
+    Use one recorder for one HX711.
+    """
+
+    RECORD = struct.Struct('<qiBBxx')  # 16 bytes, 2 bytes padding
+    PYRAMID = struct.Struct('<qBxxxIddd')  # start, mode, count, min, max, sum
+    LEVELS = (1, 10, 60, 600, 3600, 86400)  # seconds of pyramid buckets
+    FLAG_INVALID = 1  # False was read
+    FLAG_TIMING_VIOLATION = 2  # clock pulse of 60 us or more
+    FLAG_DISCARDED = 4  # discarded after wake up from power down
+
+    def __init__(self,
+                 directory,
+                 segment_records=1000000,
+                 sync_records=1000,
+                 sync_interval=1.0):
+        """
+        Init a new instance of SampleRecorder
+
+        Args:
+            directory(str): directory for segment and pyramid files.
+                It is created if it does not exist.
+            segment_records(int): Optional, by default 1000000.
+                Records in one segment file.
+            sync_records(int): Optional, by default 1000. Records
+                written and synced to disk together.
+            sync_interval(float): Optional, by default 1.0. Max seconds
+                between writes to disk.
+
+        Raises:
+            ValueError: if segment_records or sync_records is not int
+                bigger than 0
+        """
+        for name, value in (('segment_records', segment_records),
+                            ('sync_records', sync_records)):
+            if not isinstance(value, int) or value < 1:
+                raise ValueError('Parameter "{}" has to be int bigger than 0. '
+                                 'Received: {}'.format(name, value))
+        os.makedirs(directory, exist_ok=True)
+        self._directory = directory
+        self._segment_records = segment_records
+        self._sync_records = sync_records
+        self._sync_interval = sync_interval
+        self._lock = threading.Lock()  # buffers and pyramid buckets
+        self._file_lock = threading.Lock()  # files, held while writing
+        self._buffer = bytearray()
+        self._pending = 0  # records in the buffer
+        self._closed = False
+        # timestamps follow the monotonic clock from the time of start
+        self._clock_offset = time.time_ns() - time.monotonic_ns()
+        self._last_timestamp = 0
+        self._segment_file = None
+        self._segment_count = 0  # records in the current segment
+        # a new segment is started so the old ones are never modified
+        indexes = [int(name[8:-4]) for name in os.listdir(directory)
+                   if name.startswith('samples-') and name.endswith('.bin')]
+        self._segment_index = max(indexes, default=0)
+        self._pyramid_files = [
+            open(os.path.join(directory, 'pyramid-{}s.bin'.format(level)), 'ab')
+            for level in self.LEVELS
+        ]
+        self._pyramid_buffers = [bytearray() for _ in self.LEVELS]
+        # open bucket [start ns, count, min, max, sum] for each level and mode
+        self._buckets = [[None, None, None] for _ in self.LEVELS]
+        self._open_segment()
+        self._wakeup = threading.Event()
+        self._writer_thread = threading.Thread(target=self._writer_loop,
+                                               name='hx711-recorder',
+                                               daemon=True)
+        self._writer_thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def record(self, mode, raw, flags=0, timestamp=None):
+        """
+        record appends one reading.
+
+        Args:
+            mode(int): channel and gain from HX711._mode_index
+            raw(int || bool): raw data or False if reading was not ok
+            flags(int): Optional, by default 0. FLAG_* values
+            timestamp(int): Optional, by default now. Nanoseconds since
+                epoch. If it is lower than the previous one, the previous
+                one is recorded.
+        """
+        if timestamp is None:
+            timestamp = self._clock_offset + time.monotonic_ns()
+        if raw is False:
+            raw = 0
+            flags |= self.FLAG_INVALID
+        with self._lock:
+            if self._closed:
+                raise ValueError('SampleRecorder is closed.')
+            # samples and pyramid buckets are looked up by sorted time
+            if timestamp < self._last_timestamp:
+                timestamp = self._last_timestamp
+            else:
+                self._last_timestamp = timestamp
+            self._buffer += self.RECORD.pack(timestamp, int(raw), mode & 0xff,
+                                             flags)
+            self._pending += 1
+            if not flags and mode >= 0:
+                self._add_to_pyramid(0, mode, timestamp, raw, raw, raw, 1)
+            if self._pending == self._sync_records:
+                self._wakeup.set()  # the writer thread writes the batch
+
+    def sync(self):
+        """
+        sync writes buffered records to disk.
+        """
+        with self._file_lock:
+            if self._segment_file is not None:
+                self._sync()
+
+    def close(self):
+        """
+        close stops the writer thread, writes the open pyramid buckets
+        and buffered records to disk and closes the files.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            for level in range(len(self.LEVELS)):
+                for mode in range(3):
+                    if self._buckets[level][mode] is not None:
+                        self._close_bucket(level, mode)
+        self._wakeup.set()
+        self._writer_thread.join()
+        with self._file_lock:
+            self._sync()
+            self._segment_file.close()
+            self._segment_file = None
+            for pyramid_file in self._pyramid_files:
+                pyramid_file.close()
+
+    def _writer_loop(self):
+        """
+        _writer_loop writes the buffered records when a batch is full
+        or at least every sync_interval until the recorder is closed.
+        """
+        while not self._closed:
+            self._wakeup.wait(self._sync_interval)
+            self._wakeup.clear()
+            with self._file_lock:
+                if self._segment_file is not None:
+                    self._sync()
+
+    def _open_segment(self):
+        """
+        _open_segment closes the current segment file and opens a new one.
+        """
+        if self._segment_file is not None:
+            self._segment_file.close()
+        self._segment_index += 1
+        self._segment_file = open(
+            os.path.join(self._directory,
+                         'samples-{:06d}.bin'.format(self._segment_index)),
+            'ab')
+        self._segment_count = 0
+
+    def _sync(self):
+        """
+        _sync writes the buffers to the files and syncs them to disk.
+        The buffers are swapped for empty ones first, so record is
+        blocked only for the swap and not by the disk. It is called
+        with _file_lock held. A new segment is opened when the current
+        one is full.
+        """
+        with self._lock:
+            buffer = self._buffer
+            self._buffer = bytearray()
+            self._pending = 0
+            pyramid_buffers = self._pyramid_buffers
+            self._pyramid_buffers = [bytearray() for _ in self.LEVELS]
+        files = set()
+        view = memoryview(buffer)
+        size = self.RECORD.size
+        while view:
+            # split the records at the end of the segment
+            count = min(len(view) // size,
+                        self._segment_records - self._segment_count)
+            self._segment_file.write(view[:count * size])
+            files.add(self._segment_file)
+            view = view[count * size:]
+            self._segment_count += count
+            if self._segment_count >= self._segment_records:
+                self._segment_file.flush()
+                os.fsync(self._segment_file.fileno())
+                files.discard(self._segment_file)
+                self._open_segment()
+        view.release()
+        for pyramid_file, pyramid_buffer in zip(self._pyramid_files,
+                                                pyramid_buffers):
+            if pyramid_buffer:
+                pyramid_file.write(pyramid_buffer)
+                files.add(pyramid_file)
+        for output_file in files:
+            output_file.flush()
+            os.fsync(output_file.fileno())
+
+    def _add_to_pyramid(self, level, mode, timestamp, minimum, maximum, total,
+                        count):
+        """
+        _add_to_pyramid adds readings to the bucket of the level.
+        The bucket of the lower level is added when it is closed.
+        """
+        bucket_ns = self.LEVELS[level] * 1000000000
+        start = timestamp - timestamp % bucket_ns
+        bucket = self._buckets[level][mode]
+        if bucket is not None and bucket[0] != start:
+            self._close_bucket(level, mode)
+            bucket = None
+        if bucket is None:
+            self._buckets[level][mode] = [start, count, minimum, maximum, total]
+        else:
+            bucket[1] += count
+            if minimum < bucket[2]:
+                bucket[2] = minimum
+            if maximum > bucket[3]:
+                bucket[3] = maximum
+            bucket[4] += total
+
+    def _close_bucket(self, level, mode):
+        """
+        _close_bucket writes the bucket to the pyramid buffer
+        and adds it to the higher level.
+        """
+        start, count, minimum, maximum, total = self._buckets[level][mode]
+        self._buckets[level][mode] = None
+        self._pyramid_buffers[level] += self.PYRAMID.pack(
+            start, mode, count, minimum, maximum, total)
+        if level + 1 < len(self.LEVELS):
+            self._add_to_pyramid(level + 1, mode, start, minimum, maximum,
+                                 total, count)
+
+
+class SampleLog:
+    """
+    SampleLog reads files written by SampleRecorder. Segments and
+    pyramid are memory mapped as numpy arrays without copying.
+    """
+
+    def __init__(self, directory):
+        """
+        Init a new instance of SampleLog
+
+        Args:
+            directory(str): directory of SampleRecorder
+
+        Raises:
+            ImportError: if numpy is not installed
+        """
+        # numpy is imported when the log is read, not when hx711 is imported
+        try:
+            import numpy as np
+        except ImportError:
+            raise ImportError('SampleLog requires numpy library.')
+        self._directory = directory
+        self.record_dtype = np.dtype({
+            'names': ['timestamp', 'raw', 'mode', 'flags'],
+            'formats': ['<i8', '<i4', 'u1', 'u1'],
+            'offsets': [0, 8, 12, 13],
+            'itemsize': SampleRecorder.RECORD.size,
+        })
+        self.pyramid_dtype = np.dtype({
+            'names': ['timestamp', 'mode', 'count', 'min', 'max', 'sum'],
+            'formats': ['<i8', 'u1', '<u4', '<f8', '<f8', '<f8'],
+            'offsets': [0, 8, 12, 16, 24, 32],
+            'itemsize': SampleRecorder.PYRAMID.size,
+        })
+
+    def segments(self):
+        """
+        segments returns paths of segment files, the oldest first.
+
+        Returns: [str] paths
+        """
+        return sorted(
+            os.path.join(self._directory, name)
+            for name in os.listdir(self._directory)
+            if name.startswith('samples-') and name.endswith('.bin'))
+
+    def read_segment(self, path):
+        """
+        read_segment maps the segment file to numpy array.
+
+        Args:
+            path(str): path of segment file
+
+        Returns: numpy.ndarray records with fields timestamp, raw,
+            mode and flags
+        """
+        return self._map(path, self.record_dtype)
+
+    def samples(self, start=None, end=None):
+        """
+        samples returns the records with timestamp in range [start, end).
+        Segments out of the range are not read. Records of each segment
+        are sorted by time. Segments of recorders which ran one after
+        another can overlap if the system clock was set back between them.
+
+        Args:
+            start(int): Optional, nanoseconds since epoch.
+            end(int): Optional, nanoseconds since epoch.
+
+        Returns: [numpy.ndarray] views of records for each segment
+        """
+        import numpy as np
+        views = []
+        for path in self.segments():
+            records = self.read_segment(path)
+            if not records.size:
+                continue
+            timestamps = records['timestamp']
+            if ((start is not None and timestamps[-1] < start) or
+                    (end is not None and timestamps[0] >= end)):
+                continue
+            first = 0 if start is None else np.searchsorted(timestamps, start)
+            last = records.size if end is None else np.searchsorted(
+                timestamps, end)
+            views.append(records[first:last])
+        return views
+
+    def pyramid(self, seconds):
+        """
+        pyramid maps the pyramid level to numpy array.
+
+        Args:
+            seconds(int): bucket length, one of SampleRecorder.LEVELS
+
+        Returns: numpy.ndarray buckets with fields timestamp, mode,
+            count, min, max and sum
+        """
+        return self._map(
+            os.path.join(self._directory, 'pyramid-{}s.bin'.format(seconds)),
+            self.pyramid_dtype)
+
+    def query(self, start, end, points=1000, channel='A', gain_A=128):
+        """
+        query returns min, max and mean of valid readings in buckets
+        which overlap range [start, end) from the finest pyramid level
+        which has at most points buckets in the range.
+
+        Args:
+            start(int): nanoseconds since epoch.
+            end(int): nanoseconds since epoch.
+            points(int): Optional, by default 1000. Max number of buckets.
+            channel(str): Optional, by default 'A'. ('A' || 'B')
+            gain_A(int): Optional, by default 128. (128 || 64)
+
+        Returns: (int, numpy.ndarray) bucket length in seconds and
+            buckets with fields timestamp, count, min, max, mean
+            sorted by timestamp
+        """
+        import numpy as np
+        span = (end - start) / 1000000000
+        seconds = SampleRecorder.LEVELS[-1]
+        for level in SampleRecorder.LEVELS:
+            if span / level <= points:
+                seconds = level
+                break
+        buckets = self.pyramid(seconds)
+        # buckets which overlap the range
+        buckets = buckets[(buckets['mode'] == HX711._mode_index(
+            channel.capitalize(), gain_A)) &
+                          (buckets['timestamp'] > start - seconds * 1000000000) &
+                          (buckets['timestamp'] < end)]
+        buckets = buckets[np.argsort(buckets['timestamp'], kind='stable')]
+        result = np.empty(buckets.size,
+                          dtype=[('timestamp', '<i8'), ('count', '<u4'),
+                                 ('min', '<f8'), ('max', '<f8'),
+                                 ('mean', '<f8')])
+        for name in ('timestamp', 'count', 'min', 'max'):
+            result[name] = buckets[name]
+        result['mean'] = buckets['sum'] / buckets['count']
+        return seconds, result
+
+    @staticmethod
+    def _map(path, dtype):
+        """
+        _map maps whole records of the file to numpy array.
+        """
+        import numpy as np
+        if not os.path.exists(path):
+            return np.empty(0, dtype=dtype)
+        count = os.path.getsize(path) // dtype.itemsize
+        if not count:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode='r', shape=(count,))
+
+
+class CalibrationStore:
+    """
+    CalibrationStore keeps states of many HX711 from export_state in one
+    JSON file. Devices are keyed by pin pair 'dout_pin:pd_sck_pin'.
+    The file is replaced atomically, so it is never half written
+    after power failure.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path):
+        """
+        Init a new instance of CalibrationStore
+
+        Args:
+            path(str): path of the JSON file
+        """
+        self._path = path
+
+    def load(self):
+        """
+        load reads states of all devices from the file.
+
+        Raises:
+            ValueError: if the file has unknown version
+
+        Returns: dict {'dout_pin:pd_sck_pin': state}. Empty if the file
+            does not exist.
+        """
+        if not os.path.exists(self._path):
+            return {}
+        with open(self._path) as store_file:
+            store = json.load(store_file)
+        if store.get('version') != self.VERSION:
+            raise ValueError('Unknown version of calibration store. '
+                             'Received: {}'.format(store.get('version')))
+        return store['devices']
+
+    def get_state(self, dout_pin, pd_sck_pin):
+        """
+        get_state returns the state of the device.
+
+        Args:
+            dout_pin(int): pin where the Data pin of HX711 is connected.
+            pd_sck_pin(int): pin where the Clock pin of HX711 is connected.
+
+        Returns: (dict || None) the state or None if it is not stored
+        """
+        return self.load().get(self._key(dout_pin, pd_sck_pin))
+
+    def save(self, *scales):
+        """
+        save stores the state of scales. States of other devices
+        in the file are kept.
+
+        Args:
+            scales(HX711): one or more instances of HX711
+        """
+        devices = self.load()
+        for hx in scales:
+            state = hx.export_state()
+            devices[self._key(state['dout_pin'], state['pd_sck_pin'])] = state
+        _write_file_atomic(
+            self._path,
+            json.dumps({
+                'version': self.VERSION,
+                'devices': devices
+            }, indent=1, sort_keys=True))
+
+    def create(self, dout_pin, pd_sck_pin, gpio_backend=None, **kwargs):
+        """
+        create returns new HX711. If its state is stored it is a warm start
+        without taring and waiting for settling, see HX711 argument state.
+        The keyword arguments are passed to HX711 in both cases.
+
+        Args:
+            dout_pin(int): pin where the Data pin of HX711 is connected.
+            pd_sck_pin(int): pin where the Clock pin of HX711 is connected.
+            gpio_backend(GPIOBackend): Optional, by default RPiGPIOBackend.
+            kwargs: Optional, other arguments of HX711 for example data_rate.
+
+        Returns: HX711
+        """
+        return HX711(dout_pin, pd_sck_pin, gpio_backend=gpio_backend,
+                     state=self.get_state(dout_pin, pd_sck_pin), **kwargs)
+
+    @staticmethod
+    def _key(dout_pin, pd_sck_pin):
+        return '{}:{}'.format(dout_pin, pd_sck_pin)
+
+
+class _NativeHX711(ctypes.Structure):
+    """
+    _NativeHX711 mirrors the HX711 struct from HX711_C/hx711.h
+    """
+    _fields_ = [
+        ('clock_pin', ctypes.c_ubyte),
+        ('data_pin', ctypes.c_ubyte),
+        ('gain_channel_A', ctypes.c_ubyte),
+        ('current_channel', ctypes.c_char),
+        ('wanted_channel', ctypes.c_char),
+        ('offset_A_128', ctypes.c_int),
+        ('offset_A_64', ctypes.c_int),
+        ('offset_B', ctypes.c_int),
+        ('scale_ratio_A_128', ctypes.c_double),
+        ('scale_ratio_A_64', ctypes.c_double),
+        ('scale_ratio_B', ctypes.c_double),
+        ('filterPtr', ctypes.c_void_p),
+    ]
+
+
+def _t_quantile(confidence, df):
+    """
+    _t_quantile returns the two-sided quantile of Student's
+    t-distribution. It is exact for 1 and 2 degrees of freedom, otherwise
+    Cornish-Fisher expansion of the normal quantile is used.
+
+    Args:
+        confidence(float): probability that the value is in the interval
+        df(int): degrees of freedom
+
+    Returns: float the quantile
+    """
+    if df == 1:
+        return math.tan(math.pi * confidence / 2)
+    elif df == 2:
+        return confidence * math.sqrt(2 / (1 - confidence**2))
+    z = stat.NormalDist().inv_cdf((1 + confidence) / 2)
+    z3 = z**3
+    z5 = z**5
+    return (z + (z3 + z) / (4 * df) + (5 * z5 + 16 * z3 + 3 * z) /
+            (96 * df**2) + (3 * z**7 + 19 * z5 + 17 * z3 - 15 * z) /
+            (384 * df**3))
+
+
+class _ThresholdWatch:
+    """
+    _ThresholdWatch decides when the weight crosses the value.
+    After the crossing the weight has to go back behind the value
+    by hysteresis before the next crossing, so noise around
+    the value does not call back repeatedly.
+    """
+
+    def __init__(self, value, direction, hysteresis, callback):
+        self.value = value
+        self.direction = direction
+        self.hysteresis = hysteresis
+        self.callback = callback
+        # crossing is reported only after the weight was on the other side
+        self._rising_armed = False
+        self._falling_armed = False
+
+    def check(self, weight):
+        """
+        check returns True if the weight crossed the value.
+        """
+        crossed = False
+        if self.direction != 'falling':
+            if self._rising_armed and weight >= self.value:
+                self._rising_armed = False
+                crossed = True
+            elif weight < self.value - self.hysteresis:
+                self._rising_armed = True
+        if self.direction != 'rising':
+            if self._falling_armed and weight <= self.value:
+                self._falling_armed = False
+                crossed = True
+            elif weight > self.value + self.hysteresis:
+                self._falling_armed = True
+        return crossed
+
+
+class _ChangeWatch:
+    """
+    _ChangeWatch decides when the weight changed by delta since
+    the last reported weight. The first weight is the reference.
+    """
+
+    def __init__(self, delta, callback):
+        self.delta = delta
+        self.callback = callback
+        self._reference = None
+
+    def check(self, weight):
+        """
+        check returns True if the weight changed by delta or more.
+        """
+        if self._reference is None:
+            self._reference = weight
+            return False
+        if abs(weight - self._reference) >= self.delta:
+            self._reference = weight
+            return True
+        return False
+
+
+class _ModeConfig:
+    """
+    _ModeConfig holds configuration and state of HX711 for one channel
+    and gain. HX711 keeps one for each mode in a table indexed
+    by _mode_index, so the reading does not compare strings.
+    """
+
+    __slots__ = ('index', 'channel', 'gain_A', 'pulses', 'offset',
+                 'scale_ratio', 'last_raw_data', 'stream_filter',
+                 'calibration', 'stability_detector')
+
+    def __init__(self, index, channel, gain_A, pulses):
+        """
+        Init a new instance of _ModeConfig
+
+        Args:
+            index(int): index of the mode from HX711._mode_index
+            channel(str): ('A' || 'B')
+            gain_A(int): (128 || 64 || 0) 0 for channel B
+            pulses(int): number of pulses after 24 bits which select
+                this channel and gain (1 || 3 || 2)
+        """
+        self.index = index
+        self.channel = channel
+        self.gain_A = gain_A
+        self.pulses = pulses
+        self.offset = 0
+        self.scale_ratio = 1
+        self.last_raw_data = 0
+        self.stream_filter = None
+        self.calibration = None
+        self.stability_detector = None
+
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
 
 
 class HX711:
     """
-    HX711 represents chip for reading load cells.
+    HX711 represents chip for reading load cells.
+    """
+
+    # attributes which are pickled, see __getstate__
+    _PICKLED_SLOTS = ('_dout', '_pd_sck', '_gpio', '_gain_channel_A',
+                      '_wanted_channel', '_current_channel', '_modes',
+                      '_wanted_mode', '_current_mode', '_frame_mode',
+                      '_debug_mode',
+                      '_data_filter', '_filter_engine', '_edge_detection',
+                      '_ready_timeout', '_spin_time', '_conversion_period',
+                      '_conversion_intervals', '_last_ready_time', '_measured_data_rate',
+                      '_last_ready_known',
+                      '_data_rate', '_schedule', '_schedule_index',
+                      '_schedule_restore', '_recovery_policy',
+                      '_discard_conversions', '_metrics')
+    # attributes set by _init_runtime_state which cannot be pickled
+    _RUNTIME_SLOTS = ('_native_lib', '_native_hx', '_read_lock',
+                      '_acquisition_thread', '_acquisition_stop',
+                      '_acquisition_error', '_buffer_lock', '_buffer_data', '_buffer_time',
+                      '_buffer_mode', '_buffer_size', '_buffer_index',
+                      '_buffer_count', '_recorder', '_watches',
+                      '_callback_queue', '_callback_thread', '_pulse_time')
+    __slots__ = _PICKLED_SLOTS + _RUNTIME_SLOTS + ('__weakref__',)
+
+    # Settling time in seconds after channel or gain change for each
+    # data rate from the datasheet, 400 ms at 10 SPS and 50 ms at 80 SPS.
+    # Both are 4 conversions.
+    _SETTLING_TIME = {10: 0.4, 80: 0.05}
+    # hx711 makes at most 80 conversions per second, 12.5 ms apart.
+    # Estimate of the period is never shorter so the wait does not spin.
+    _MIN_CONVERSION_PERIOD = 0.01
+    _STATE_VERSION = 1  # version of export_state
+    # filters which export_state saves by their get_config
+    _STATE_FILTERS = {
+        filter_class.__name__: filter_class
+        for filter_class in (RunningMedianFilter, HampelFilter, EMAFilter,
+                             KalmanFilter, NumpyFilterEngine)
+    }
+
+    def __init__(self,
+                 dout_pin,
+                 pd_sck_pin,
+                 gain_channel_A=128,
+                 select_channel='A',
+                 gpio_backend=None,
+                 data_rate=None,
+                 state=None):
+        """
+        Init a new instance of HX711
+
+        Args:
+            dout_pin(int): Raspberry Pi pin number where the Data pin of HX711 is connected.
+            pd_sck_pin(int): Raspberry Pi pin number where the Clock pin of HX711 is connected.
+            gain_channel_A(int): Optional, by default value 128. Options (128 || 64)
+            select_channel(str): Optional, by default 'A'. Options ('A' || 'B')
+            gpio_backend(GPIOBackend): Optional, by default RPiGPIOBackend.
+                Backend used for access to the pins.
+            data_rate(int): Optional, by default it is not known. Output data
+                rate set by the RATE pin of hx711. Options (10 || 80)
+            state(dict): Optional, state from export_state. It is a warm
+                start, the state replaces gain_channel_A and select_channel
+                and nothing is read. data_rate if it is given replaces
+                the saved data rate. The first reading
+                sends the channel and gain and its data is discarded.
+                Settling is skipped because hx711 is expected to keep
+                the saved channel and gain.
+
+        Raises:
+            TypeError: if pd_sck_pin or dout_pin are not int type
+                or gpio_backend is not GPIOBackend type
+            ValueError: if data_rate is not (10 || 80 || None)
+                or state is not valid
+        """
+        if (isinstance(dout_pin, int)):
+            if (isinstance(pd_sck_pin, int)):
+                self._pd_sck = pd_sck_pin
+                self._dout = dout_pin
+            else:
+                raise TypeError('pd_sck_pin must be type int. '
+                                'Received pd_sck_pin: {}'.format(pd_sck_pin))
+        else:
+            raise TypeError('dout_pin must be type int. '
+                            'Received dout_pin: {}'.format(dout_pin))
+
+        self._gain_channel_A = 0
+        self._wanted_channel = ''
+        self._current_channel = ''
+        # offset, scale ratio, last raw data and filters of each channel
+        # and gain. A 128 is selected by 1 pulse, A 64 by 3 and B by 2.
+        self._modes = (_ModeConfig(0, 'A', 128, 1), _ModeConfig(1, 'A', 64, 3),
+                       _ModeConfig(2, 'B', 0, 2))
+        self._wanted_mode = self._modes[2]
+        self._current_mode = self._modes[2]
+        self._frame_mode = self._modes[2]  # mode of the last frame read
+        self._debug_mode = False
+        self._data_filter = self.outliers_filter  # default it is used outliers_filter
+        self._filter_engine = None
+        self._edge_detection = False
+        self._ready_timeout = 0.5  # max time to wait for data ready
+        self._spin_time = 0.0005  # busy wait before the expected conversion
+        self._conversion_period = 0.0  # median of recent times between conversions
+        self._conversion_intervals = deque(maxlen=9)
+        self._last_ready_time = 0.0
+        self._last_ready_known = False  # the end of conversion was seen
+        self._measured_data_rate = 0.0
+        self._data_rate = None
+        self._schedule = []  # [(channel, gain_A)] interleaved modes
+        self._schedule_index = 0
+        self._schedule_restore = None
+        self._recovery_policy = RecoveryPolicy()
+        self._discard_conversions = 0  # left to discard after wake up
+        self._metrics = HX711Metrics()
+        self._init_runtime_state()
+        if data_rate is not None:
+            self.set_data_rate(data_rate)
+
+        if gpio_backend is None:
+            gpio_backend = RPiGPIOBackend()
+        elif not isinstance(gpio_backend, GPIOBackend):
+            raise TypeError('gpio_backend must be type GPIOBackend. '
+                            'Received gpio_backend: {}'.format(gpio_backend))
+        self._gpio = gpio_backend
+        self._edge_detection = gpio_backend.edge_events
+        self._gpio.setup_output(self._pd_sck)  # pin _pd_sck is output only
+        self._gpio.setup_input(self._dout)  # pin _dout is input only
+        if state is not None:
+            self.load_state(state, settle=False)
+            if data_rate is not None:
+                # the RATE pin could be changed since the state was saved
+                self.set_data_rate(data_rate)
+            return
+        # no channel is selected yet so only the gain is stored
+        self.set_gain_A(gain_channel_A, skip_if_active=True)
+        self.select_channel(select_channel)
+
+    def select_channel(self, channel, skip_if_active=False):
+        """
+        select_channel method evaluates if the desired channel
+        is valid and then sets the _wanted_channel variable.
+        Then it discards the conversions until the output settles.
+
+        Args:
+            channel(str): the channel to select. Options ('A' || 'B')
+            skip_if_active(bool): Optional, by default False. If True and
+                the channel is already active, nothing is read.
+        Raises:
+            ValueError: if channel is not 'A' or 'B'
+        """
+        channel = channel.capitalize()
+        if (channel == 'A'):
+            self._wanted_channel = 'A'
+        elif (channel == 'B'):
+            self._wanted_channel = 'B'
+        else:
+            raise ValueError('Parameter "channel" has to be "A" or "B". '
+                             'Received: {}'.format(channel))
+        self._select_mode()
+        if skip_if_active and self._current_channel == channel:
+            return
+        self._settle()
+
+    def set_gain_A(self, gain, skip_if_active=False):
+        """
+        set_gain_A method sets gain for channel A.
+        Then it discards the conversions until the output settles.
+        
+        Args:
+            gain(int): Gain for channel A (128 || 64)
+            skip_if_active(bool): Optional, by default False. If True and
+                the gain is already active or channel A is not selected,
+                nothing is read.
+        
+        Raises:
+            ValueError: if gain is different than 128 or 64
+        """
+        previous_gain = self._gain_channel_A
+        if gain == 128:
+            self._gain_channel_A = gain
+        elif gain == 64:
+            self._gain_channel_A = gain
+        else:
+            raise ValueError('gain has to be 128 or 64. '
+                             'Received: {}'.format(gain))
+        self._select_mode()
+        if skip_if_active and (self._wanted_channel != 'A' or
+                               (gain == previous_gain and
+                                self._current_channel == 'A')):
+            return
+        self._settle()
+
+    def set_data_rate(self, data_rate):
+        """
+        set_data_rate method sets the output data rate of hx711 which is
+        given by the RATE pin. It is used for the number of conversions
+        discarded after channel or gain change.
+
+        Args:
+            data_rate(int): samples per second (10 || 80)
+
+        Raises:
+            ValueError: if data_rate is not 10 or 80
+        """
+        if data_rate not in self._SETTLING_TIME:
+            raise ValueError('Parameter "data_rate" has to be 10 or 80. '
+                             'Received: {}'.format(data_rate))
+        self._data_rate = data_rate
+
+    def get_data_rate(self):
+        """
+        get data rate returns the configured data rate. If it is
+        not configured then the measured one.
+
+        Returns: float samples per second. 0.0 if it is not known.
+        """
+        if self._data_rate is not None:
+            return float(self._data_rate)
+        return self._measured_data_rate
+
+    def export_state(self):
+        """
+        export_state returns calibration and configuration: offsets and
+        scale ratios for each channel and gain, selected channel and gain,
+        data rate, filters and recovery policy. It can be saved as JSON,
+        for example by CalibrationStore, and loaded by load_state.
+        Custom data filter and filters without get_config are left out.
+
+        Returns: dict the state
+        """
+        channel, gain_A = self._wanted_channel, self._gain_channel_A
+        if self._schedule:
+            channel, gain_A = self._schedule_restore
+        if self._data_filter == self.outliers_filter or (
+                self._data_filter is outliers_filter):
+            data_filter = 'outliers_filter'
+        else:
+            data_filter = None
+        filter_engine = None
+        if type(self._filter_engine).__name__ in self._STATE_FILTERS:
+            filter_engine = {
+                'type': type(self._filter_engine).__name__,
+                'config': self._filter_engine.get_config(),
+            }
+        stream_filters = {}
+        for mode in self._modes:
+            if type(mode.stream_filter).__name__ in self._STATE_FILTERS:
+                stream_filters[HX711Metrics.MODES[mode.index]] = {
+                    'type': type(mode.stream_filter).__name__,
+                    'config': mode.stream_filter.get_config(),
+                }
+        return {
+            'version': self._STATE_VERSION,
+            'dout_pin': self._dout,
+            'pd_sck_pin': self._pd_sck,
+            'channel': channel,
+            'gain_A': gain_A,
+            'offsets': {
+                HX711Metrics.MODES[mode.index]: mode.offset
+                for mode in self._modes
+            },
+            'scale_ratios': {
+                HX711Metrics.MODES[mode.index]: mode.scale_ratio
+                for mode in self._modes
+            },
+            'data_rate': self._data_rate,
+            'measured_data_rate': self._measured_data_rate,
+            'conversion_period': self._conversion_period,
+            'data_filter': data_filter,
+            'filter_engine': filter_engine,
+            'stream_filters': stream_filters,
+            'calibrations': {
+                HX711Metrics.MODES[mode.index]: mode.calibration.to_dict()
+                for mode in self._modes
+                if isinstance(mode.calibration, Calibration)
+            },
+            'recovery_policy': {
+                'max_retries': self._recovery_policy.max_retries,
+                'wakeup_discard': self._recovery_policy.wakeup_discard,
+            },
+        }
+
+    def load_state(self, state, settle=True):
+        """
+        load_state sets calibration and configuration from export_state.
+
+        Args:
+            state(dict): the state
+            settle(bool): Optional, by default True. If the channel or gain
+                changes, it is sent to hx711 and the output settles.
+                If False, the next reading sends it and its data is discarded.
+
+        Raises:
+            ValueError: if state has unknown version or invalid values
+        """
+        if not isinstance(state, dict) or state.get(
+                'version') != self._STATE_VERSION:
+            raise ValueError('Unknown version of state. Received: {}'.format(
+                state.get('version') if isinstance(state, dict) else state))
+        channel = state['channel']
+        gain_A = state['gain_A']
+        if channel not in ('A', 'B'):
+            raise ValueError('Parameter "channel" has to be "A" or "B". '
+                             'Received: {}'.format(channel))
+        if gain_A not in (128, 64):
+            raise ValueError('gain has to be 128 or 64. '
+                             'Received: {}'.format(gain_A))
+        if state['data_rate'] is not None:
+            self.set_data_rate(state['data_rate'])
+        filters = {}
+        for mode, config in state['stream_filters'].items():
+            filters[HX711Metrics.MODES.index(mode)] = self._STATE_FILTERS[
+                config['type']](**config['config'])
+        filter_engine = state['filter_engine']
+        if filter_engine is not None:
+            filter_engine = self._STATE_FILTERS[filter_engine['type']](
+                **filter_engine['config'])
+        calibrations = {
+            HX711Metrics.MODES.index(mode): Calibration.from_dict(calibration)
+            for mode, calibration in state.get('calibrations', {}).items()
+        }
+        recovery_policy = RecoveryPolicy(**state['recovery_policy'])
+        with self._read_lock:
+            for mode in self._modes:
+                name = HX711Metrics.MODES[mode.index]
+                mode.offset = state['offsets'][name]
+                mode.scale_ratio = state['scale_ratios'][name]
+                mode.stream_filter = filters.get(mode.index)
+                mode.calibration = calibrations.get(mode.index)
+            self._measured_data_rate = state['measured_data_rate']
+            self._conversion_period = state['conversion_period']
+            if state['data_filter'] == 'outliers_filter':
+                self._data_filter = self.outliers_filter
+            self._filter_engine = filter_engine
+            self._recovery_policy = recovery_policy
+            if settle:
+                self.set_gain_A(gain_A, skip_if_active=True)
+                self.select_channel(channel, skip_if_active=True)
+            else:
+                self._gain_channel_A = gain_A
+                self._wanted_channel = channel
+                # hx711 is expected to keep the channel and gain but
+                # the conversion in progress can be of other ones
+                self._current_channel = channel
+                self._select_mode()
+                self._discard_conversions = max(self._discard_conversions, 1)
+
+    def set_schedule(self, A_128=0, A_64=0, B=0):
+        """
+        set_schedule method sets how often each channel and gain is sampled.
+        The gain pulses after each frame select the channel and gain of
+        the next conversion, so the modes are interleaved frame by frame
+        in the given ratio without waiting for them to settle.
+        For example A_128=7, B=1 reads channel B once per 8 conversions.
+        Each sample is kept for its own channel and gain, use
+        stream_channels() or start_acquisition() with get_buffered_data().
+        Means like get_weight_mean() leave out the readings of the other
+        channels and gains than the current one.
+        Without arguments the schedule is turned off and the channel
+        and gain selected before are used again.
+
+        Args:
+            A_128(int): Optional, conversions of channel A gain 128 per cycle.
+            A_64(int): Optional, conversions of channel A gain 64 per cycle.
+            B(int): Optional, conversions of channel B per cycle.
+
+        Raises:
+            ValueError: if ratios are not int 0 or bigger
+        """
+        ratios = tuple(zip(self._modes, (A_128, A_64, B)))
+        for mode, ratio in ratios:
+            if not isinstance(ratio, int) or ratio < 0:
+                raise ValueError('Ratio of channel {} has to be int 0 or '
+                                 'bigger. Received: {}'.format(
+                                     mode.channel, ratio))
+        ratios = [(mode, ratio) for mode, ratio in ratios if ratio]
+        # smooth weighted round robin spreads each mode evenly over the cycle
+        total = sum(ratio for _, ratio in ratios)
+        weights = [0] * len(ratios)
+        schedule = []
+        for _ in range(total):
+            for i, (_, ratio) in enumerate(ratios):
+                weights[i] += ratio
+            best = weights.index(max(weights))
+            weights[best] -= total
+            schedule.append(ratios[best][0])
+        with self._read_lock:
+            if schedule and not self._schedule:
+                self._schedule_restore = (self._wanted_channel,
+                                          self._gain_channel_A)
+            elif not schedule and self._schedule:
+                self._wanted_channel, self._gain_channel_A = (
+                    self._schedule_restore)
+                self._select_mode()
+            self._schedule = schedule
+            self._schedule_index = 0
+
+    def get_schedule(self):
+        """
+        get_schedule returns one cycle of the interleaved channels and gains.
+
+        Returns: [(str, int)] list of channel and gain for each conversion.
+            Gain is 0 for channel B. Empty list if schedule is off.
+        """
+        return [(mode.channel, mode.gain_A) for mode in self._schedule]
+
+    def _next_scheduled(self):
+        """
+        _next_scheduled sets the wanted channel and gain for the next
+        conversion from the schedule. It is called from _read_frame
+        before the gain pulses are sent.
+        """
+        mode = self._schedule[self._schedule_index]
+        self._schedule_index = (self._schedule_index + 1) % len(self._schedule)
+        self._wanted_mode = mode
+        self._wanted_channel = mode.channel
+        if mode.gain_A:
+            self._gain_channel_A = mode.gain_A
+
+    def _select_mode(self):
+        """
+        _select_mode chooses the records of the wanted and the current
+        channel and gain from the table. It is called when the channel
+        or gain changes. Unknown channel (-1) is channel B like before.
+        """
+        self._wanted_mode = self._modes[self._mode_index(
+            self._wanted_channel, self._gain_channel_A)]
+        self._current_mode = self._modes[self._mode_index(
+            self._current_channel, self._gain_channel_A)]
+
+    def _mode_config(self, channel, gain_A):
+        """
+        _mode_config returns the record of specific channel and gain.
+
+        Args:
+            channel(str): ('A' || 'B' || '') '' is the current channel and gain
+            gain_A(int): (128 || 64) it is not needed for channel B
+
+        Raises:
+            ValueError: if channel is not ('A' || 'B' || '') or
+                gain_A is not (128 || 64) for channel A
+
+        Returns: _ModeConfig
+        """
+        channel = channel.capitalize()
+        if channel == '':
+            return self._current_mode
+        index = self._mode_index(channel, gain_A)
+        if index < 0:
+            raise ValueError(
+                'Parameter "channel" has to be "A" or "B". '
+                'Received: {} \nParameter "gain_A" has to be 128 or 64. Received {}'
+                .format(channel, gain_A))
+        return self._modes[index]
+
+    def _settle(self):
+        """
+        _settle sends the wanted channel and gain to hx711 and discards
+        the conversions until the output settles after the change.
+        """
+        data_rate = self.get_data_rate()
+        if not data_rate and self._conversion_period:
+            # estimated from the times of recent conversions
+            data_rate = 1.0 / self._conversion_period
+        # Hold the read lock so the acquisition thread does not buffer garbage.
+        with self._read_lock:
+            # the first reading sends the pulses for the new channel and gain
+            # the data before is garbage and cannot be used.
+            for _ in range(1 + self._settling_conversions(data_rate)):
+                self._read()
+
+    @classmethod
+    def _settling_conversions(cls, data_rate):
+        """
+        _settling_conversions returns the number of conversions discarded
+        after channel or gain change. It is the settling time of the closest
+        data rate from the table divided by the conversion period.
+
+        Args:
+            data_rate(float): samples per second. 0.0 if it is not known,
+                then the most conversions are discarded.
+
+        Returns: int number of conversions
+        """
+        if not data_rate:
+            return max(
+                int(math.ceil(settling_time * rate - 1e-9))
+                for rate, settling_time in cls._SETTLING_TIME.items())
+        closest = min(cls._SETTLING_TIME,
+                      key=lambda rate: abs(rate - data_rate))
+        return int(math.ceil(cls._SETTLING_TIME[closest] * data_rate - 1e-9))
+
+    def zero(self, readings=30):
+        """
+        zero is a method which sets the current data as
+        an offset for particulart channel. It can be used for
+        subtracting the weight of the packaging. Also known as tare.
+
+        Args:
+            readings(int): Number of readings for mean. Allowed values 1..99
+
+        Raises:
+            ValueError: if readings are not in range 1..99
+
+        Returns: True if error occured.
+        """
+        if readings > 0 and readings < 100:
+            mode = self._current_mode
+            result = self.get_raw_data_mean(readings)
+            if result != False:
+                if self._current_channel:
+                    mode.offset = result
+                    return False
+                else:
+                    if self._debug_mode:
+                        print('Cannot zero() channel and gain mismatch.\n'
+                              'current channel: {}\n'
+                              'gain A: {}\n'.format(self._current_channel,
+                                                    self._gain_channel_A))
+                    return True
+            else:
+                if self._debug_mode:
+                    print('From method "zero()".\n'
+                          'get_raw_data_mean(readings) returned False.\n')
+                return True
+        else:
+            raise ValueError('Parameter "readings" '
+                             'can be in range 1 up to 99. '
+                             'Received: {}'.format(readings))
+
+    def set_offset(self, offset, channel='', gain_A=0):
+        """
+        set offset method sets desired offset for specific
+        channel and gain. Optional, by default it sets offset for current
+        channel and gain.
+        
+        Args:
+            offset(int): specific offset for channel
+            channel(str): Optional, by default it is the current channel.
+                Or use these options ('A' || 'B')
+        
+        Raises:
+            ValueError: if channel is not ('A' || 'B' || '')
+            TypeError: if offset is not int type
+        """
+        if isinstance(offset, int):
+            self._mode_config(channel, gain_A).offset = offset
+        else:
+            raise TypeError('Parameter "offset" has to be integer. '
+                            'Received: ' + str(offset) + '\n')
+
+    def set_scale_ratio(self, scale_ratio, channel='', gain_A=0):
+        """
+        set_scale_ratio method sets the ratio for calculating
+        weight in desired units. In order to find this ratio for
+        example to grams or kg. You must have known weight.
+
+        Args:
+            scale_ratio(float): number > 0.0 that is used for
+                conversion to weight units
+            channel(str): Optional, by default it is the current channel.
+                Or use these options ('a'|| 'A' || 'b' || 'B')
+            gain_A(int): Optional, by default it is the current channel.
+                Or use these options (128 || 64)
+        Raises:
+            ValueError: if channel is not ('A' || 'B' || '')
+            TypeError: if offset is not int type
+        """
+        if isinstance(gain_A, int):
+            self._mode_config(channel, gain_A).scale_ratio = scale_ratio
+        else:
+            raise TypeError('Parameter "gain_A" has to be integer. '
+                            'Received: ' + str(gain_A) + '\n')
+
+    def set_data_filter(self, data_filter):
+        """
+        set_data_filter method sets data filter that is passed as an argument.
+
+        Args:
+            data_filter(data_filter): Data filter that takes list of int numbers and
+                returns a list of filtered int numbers.
+        
+        Raises:
+            TypeError: if filter is not a function.
+        """
+        if callable(data_filter):
+            self._data_filter = data_filter
+        else:
+            raise TypeError('Parameter "data_filter" must be a function. '
+                            'Received: {}'.format(data_filter))
+
+    def set_stream_filter(self, stream_filter, channel='', gain_A=0):
+        """
+        set_stream_filter method sets stateful filter for specific channel
+        and gain, for example RunningMedianFilter or KalmanFilter.
+        Each conversion read by stream() is passed to the filter
+        and the filtered value is yielded immediately.
+        By default it sets the filter for current channel and gain.
+
+        Args:
+            stream_filter(StreamFilter): filter with method update.
+                None removes the filter.
+            channel(str): Optional, by default it is the current channel.
+                Or use these options ('A' || 'B')
+            gain_A(int): Optional, by default it is the current gain.
+                Or use these options (128 || 64)
+
+        Raises:
+            ValueError: if channel is not ('A' || 'B' || '')
+            TypeError: if stream_filter does not have method update.
+        """
+        mode = self._mode_config(channel, gain_A)
+        if stream_filter is None or callable(
+                getattr(stream_filter, 'update', None)):
+            mode.stream_filter = stream_filter
+        else:
+            raise TypeError('Parameter "stream_filter" must have method '
+                            'update. Received: {}'.format(stream_filter))
+
+    def set_calibration(self, calibration, channel='', gain_A=0):
+        """
+        set_calibration method sets multi-point calibration for specific
+        channel and gain. It is used instead of the scale ratio.
+        The offset is still subtracted first, so zero() keeps working.
+        By default it sets the calibration for current channel and gain.
+
+        Args:
+            calibration(Calibration): calibration with method convert.
+                None removes it and the scale ratio is used again.
+            channel(str): Optional, by default it is the current channel.
+                Or use these options ('A' || 'B')
+            gain_A(int): Optional, by default it is the current gain.
+                Or use these options (128 || 64)
+
+        Raises:
+            ValueError: if channel is not ('A' || 'B' || '')
+            TypeError: if calibration does not have method convert.
+        """
+        mode = self._mode_config(channel, gain_A)
+        if calibration is None or callable(
+                getattr(calibration, 'convert', None)):
+            mode.calibration = calibration
+        else:
+            raise TypeError('Parameter "calibration" must have method '
+                            'convert. Received: {}'.format(calibration))
+
+    def get_calibration(self, channel='', gain_A=0):
+        """
+        get calibration returns the calibration for specific
+        channel and gain. By default for the current one.
+
+        Returns: (Calibration || None) the calibration or None if it is not set
+        """
+        return self._mode_config(channel, gain_A).calibration
+
+    def set_stability_detector(self, stability_detector, channel='', gain_A=0):
+        """
+        set_stability_detector method sets detector of settled weight
+        for specific channel and gain. Every valid conversion of them
+        updates it, see is_stable and wait_stable.
+        By default it sets the detector for current channel and gain.
+
+        Args:
+            stability_detector(StabilityDetector): detector with method
+                update. None removes it.
+            channel(str): Optional, by default it is the current channel.
+                Or use these options ('A' || 'B')
+            gain_A(int): Optional, by default it is the current gain.
+                Or use these options (128 || 64)
+
+        Raises:
+            ValueError: if channel is not ('A' || 'B' || '')
+            TypeError: if stability_detector does not have method update.
+        """
+        mode = self._mode_config(channel, gain_A)
+        if stability_detector is None or callable(
+                getattr(stability_detector, 'update', None)):
+            mode.stability_detector = stability_detector
+        else:
+            raise TypeError('Parameter "stability_detector" must have method '
+                            'update. Received: {}'.format(stability_detector))
+
+    def get_stability_detector(self, channel='', gain_A=0):
+        """
+        get stability detector returns the detector for specific
+        channel and gain. By default for the current one.
+
+        Returns: (StabilityDetector || None) the detector or None if it is not set
+        """
+        return self._mode_config(channel, gain_A).stability_detector
+
+    def on_threshold(self, value, direction, hysteresis, callback, channel='',
+                     gain_A=0):
+        """
+        on_threshold method registers callback which is called when
+        the weight of a conversion crosses the value. The weight has to
+        be on the other side of the value by more than hysteresis first,
+        so the weight at the time of registration is not reported
+        and the noise around the value is reported only once.
+        Conversions are read by start_acquisition() or stream().
+        Callbacks are called with the weight from a separate thread
+        one by one, so a slow callback does not delay the reading.
+        By default it is for the current channel and gain.
+
+        Args:
+            value(float): the threshold in weight units
+            direction(str): ('rising' || 'falling' || 'both')
+            hysteresis(float): 0 or bigger in weight units
+            callback(function): it takes the weight as float
+            channel(str): Optional, by default it is the current channel.
+                Or use these options ('A' || 'B')
+            gain_A(int): Optional, by default it is the current gain.
+                Or use these options (128 || 64)
+
+        Raises:
+            ValueError: if direction or channel is not valid
+                or hysteresis is negative
+            TypeError: if callback is not a function
+
+        Returns: object handle for remove_callback
+        """
+        if direction not in ('rising', 'falling', 'both'):
+            raise ValueError('Parameter "direction" has to be "rising", '
+                             '"falling" or "both". Received: {}'.format(
+                                 direction))
+        if not hysteresis >= 0:
+            raise ValueError('Parameter "hysteresis" has to be 0 or bigger. '
+                             'Received: {}'.format(hysteresis))
+        return self._add_watch(
+            _ThresholdWatch(value, direction, hysteresis, callback), channel,
+            gain_A)
+
+    def on_change(self, delta, callback, channel='', gain_A=0):
+        """
+        on_change method registers callback which is called when
+        the weight of a conversion differs from the last reported weight
+        by delta or more. The first conversion is the reference and
+        it is not reported. Callbacks are called like by on_threshold.
+        By default it is for the current channel and gain.
+
+        Args:
+            delta(float): bigger than 0 in weight units
+            callback(function): it takes the weight as float
+            channel(str): Optional, by default it is the current channel.
+                Or use these options ('A' || 'B')
+            gain_A(int): Optional, by default it is the current gain.
+                Or use these options (128 || 64)
+
+        Raises:
+            ValueError: if delta is not bigger than 0 or channel is not valid
+            TypeError: if callback is not a function
+
+        Returns: object handle for remove_callback
+        """
+        if not delta > 0:
+            raise ValueError('Parameter "delta" has to be bigger than 0. '
+                             'Received: {}'.format(delta))
+        return self._add_watch(_ChangeWatch(delta, callback), channel, gain_A)
+
+    def remove_callback(self, handle):
+        """
+        remove_callback method removes callback registered by on_threshold
+        or on_change. Callbacks already waiting in the queue are still called.
+        When the last callback is removed the callback thread stops.
+
+        Args:
+            handle(object): handle returned by on_threshold or on_change
+        """
+        with self._read_lock:
+            for mode, watches in list(self._watches.items()):
+                if handle in watches:
+                    watches = tuple(
+                        watch for watch in watches if watch is not handle)
+                    if watches:
+                        self._watches[mode] = watches
+                    else:
+                        del self._watches[mode]
+            last = not self._watches
+        if last:
+            self._stop_callbacks()
+
+    def _add_watch(self, watch, channel, gain_A):
+        """
+        _add_watch adds watch for channel and gain and starts the thread
+        which calls the callbacks.
+
+        Returns: the watch
+        """
+        if not callable(watch.callback):
+            raise TypeError('Parameter "callback" must be a function. '
+                            'Received: {}'.format(watch.callback))
+        mode = self._mode_config(channel, gain_A)
+        with self._read_lock:
+            # new tuple so the reading never sees it half updated
+            self._watches[mode.index] = self._watches.get(mode.index,
+                                                          ()) + (watch,)
+            self._start_callbacks()
+        return watch
+
+    def _start_callbacks(self):
+        """
+        _start_callbacks starts the thread which calls the callbacks
+        if it is not running. The read lock has to be held.
+        Each thread has its own queue, so the stop sentinel of the old
+        thread cannot be taken by the new one.
+        """
+        if self._callback_thread is None:
+            self._callback_queue = queue.SimpleQueue()
+            self._callback_thread = threading.Thread(
+                target=self._callback_loop,
+                args=(self._callback_queue,),
+                name='hx711-callbacks',
+                daemon=True)
+            self._callback_thread.start()
+
+    def _stop_callbacks(self):
+        """
+        _stop_callbacks stops the callback thread after it called
+        the callbacks already queued and waits for it. Called from
+        a callback it does not wait for its own thread.
+        """
+        with self._read_lock:
+            thread = self._callback_thread
+            if thread is None:
+                return
+            self._callback_thread = None
+            self._callback_queue.put((None, None))  # stop sentinel
+        if thread is not threading.current_thread():
+            thread.join()
+
+    def _callback_loop(self, callback_queue):
+        """
+        _callback_loop runs in the callback thread. It calls
+        the callbacks queued by the reading until it gets
+        the stop sentinel.
+
+        Args:
+            callback_queue(queue.SimpleQueue): (callback, weight) to call
+        """
+        while True:
+            callback, weight = callback_queue.get()
+            if callback is None:
+                break
+            try:
+                callback(weight)
+            except Exception:
+                # the thread has to keep running for the other callbacks
+                traceback.print_exc()
+
+    @property
+    def is_stable(self):
+        """
+        is_stable is True if the weight of the current channel and gain
+        is stable according to its stability detector. Nothing is read,
+        it is updated by the readings. False if there is no detector.
+        """
+        stability_detector = self._current_mode.stability_detector
+        return stability_detector is not None and stability_detector.stable
+
+    def get_stream_filter(self, channel='', gain_A=0):
+        """
+        get stream filter returns the stream filter for specific
+        channel and gain. By default for the current one.
+
+        Returns: (StreamFilter || None) the filter or None if it is not set
+        """
+        return self._mode_config(channel, gain_A).stream_filter
+
+    def set_filter_engine(self, filter_engine):
+        """
+        set_filter_engine method sets engine which filters the readings
+        and calculates the mean in one step, for example NumpyFilterEngine.
+        When it is set it is used instead of the data filter.
+
+        Args:
+            filter_engine(NumpyFilterEngine): engine with method mean.
+                None turns it off and the data filter is used again.
+
+        Raises:
+            TypeError: if filter_engine does not have method mean.
+        """
+        if filter_engine is None or callable(
+                getattr(filter_engine, 'mean', None)):
+            self._filter_engine = filter_engine
+        else:
+            raise TypeError('Parameter "filter_engine" must have method mean. '
+                            'Received: {}'.format(filter_engine))
+
+    def set_recovery_policy(self, recovery_policy):
+        """
+        set_recovery_policy method sets how timing violations are handled.
+
+        Args:
+            recovery_policy(RecoveryPolicy): the policy with its counters
+
+        Raises:
+            TypeError: if recovery_policy is not RecoveryPolicy type
+        """
+        if not isinstance(recovery_policy, RecoveryPolicy):
+            raise TypeError('Parameter "recovery_policy" must be type '
+                            'RecoveryPolicy. Received: {}'.format(
+                                recovery_policy))
+        self._recovery_policy = recovery_policy
+
+    def get_recovery_policy(self):
+        """
+        get recovery policy returns the policy with counters of
+        timing violations, retries and discarded conversions.
+
+        Returns: RecoveryPolicy
+        """
+        return self._recovery_policy
+
+    def set_recorder(self, recorder):
+        """
+        set_recorder method sets recorder which gets every frame read
+        from hx711, for example SampleRecorder.
+
+        Args:
+            recorder(SampleRecorder): recorder with method record.
+                None turns the recording off.
+
+        Raises:
+            TypeError: if recorder does not have method record.
+        """
+        if recorder is None or callable(getattr(recorder, 'record', None)):
+            self._recorder = recorder
+        else:
+            raise TypeError('Parameter "recorder" must have method record. '
+                            'Received: {}'.format(recorder))
+
+    def get_metrics(self):
+        """
+        get metrics returns the counters and histograms of this instance.
+
+        Returns: HX711Metrics
+        """
+        return self._metrics
+
+    def stats(self):
+        """
+        stats returns the counters and histograms for each channel and gain,
+        see HX711Metrics.stats.
+
+        Returns: dict {'A_128': dict, 'A_64': dict, 'B': dict}
+        """
+        return self._metrics.stats()
+
+    def set_debug_mode(self, flag=False):
+        """
+        set_debug_mode method is for turning on and off
+        debug mode.
+        
+        Args:
+            flag(bool): True turns on the debug mode. False turns it off.
+        
+        Raises:
+            ValueError: if fag is not bool type
+        """
+        if flag == False:
+            self._debug_mode = False
+            print('Debug mode DISABLED')
+            return
+        elif flag == True:
+            self._debug_mode = True
+            print('Debug mode ENABLED')
+            return
+        else:
+            raise ValueError('Parameter "flag" can be only BOOL value. '
+                             'Received: {}'.format(flag))
+
+    def get_gpio_backend(self):
+        """
+        get gpio backend.
+
+        Returns: self._gpio
+        """
+        return self._gpio
+
+    def set_edge_detection(self, flag=False):
+        """
+        set_edge_detection method turns on and off waiting for data ready
+        on the falling edge of the DOUT pin (wait_for_edge of GPIO backend).
+        When it is off the method spins shortly before the expected end
+        of conversion and polls in short intervals. By default it is on
+        if the GPIO backend detects edges by interrupts (edge_events).
+
+        Args:
+            flag(bool): True turns on the edge detection. False turns it off.
+
+        Raises:
+            ValueError: if flag is not bool type
+        """
+        if flag == False:
+            self._edge_detection = False
+        elif flag == True:
+            self._edge_detection = True
+        else:
+            raise ValueError('Parameter "flag" can be only BOOL value. '
+                             'Received: {}'.format(flag))
+
+    def measure_data_rate(self, readings=20):
+        """
+        measure_data_rate reads data back to back and measures how many
+        conversions per second hx711 delivers. 10 or 80 SPS depending on
+        the RATE pin of hx711.
+
+        Args:
+            readings(int): Number of conversions for the measurement.
+
+        Raises:
+            ValueError: if readings is less than 2
+
+        Returns: float measured samples per second. 0.0 if hx711 is not ready.
+        """
+        if not isinstance(readings, int) or readings < 2:
+            raise ValueError('Parameter "readings" has to be int bigger than 1. '
+                             'Received: {}'.format(readings))
+        with self._read_lock:
+            # the first reading synchronises with the conversions
+            if self._read() is False:
+                return 0.0
+            start_counter = time.perf_counter()
+            # invalid reading also takes one conversion so it is counted
+            for _ in range(readings):
+                self._read()
+            end_counter = time.perf_counter()
+        self._measured_data_rate = readings / (end_counter - start_counter)
+        return self._measured_data_rate
+
+    def set_native_backend(self, library_path='libhx711.so'):
+        """
+        set_native_backend method loads the shared library built from
+        HX711_C (make libhx711.so) and uses it for reading the frames.
+        The 24 bits and the gain pulses are clocked by getRawData in C
+        through direct register access, therefore the pulses stay
+        well under 60 us. The C code maps /dev/mem so it requires root.
+        Waiting for data ready and validation of data stay in Python.
+
+        Args:
+            library_path(str): path to libhx711.so. If None then the native
+                backend is turned off, its GPIO memory is released
+                and GPIO is used again.
+
+        Raises:
+            OSError: if the library cannot be loaded or it cannot
+                map the GPIO memory
+            ValueError: if the pins are not supported by the native code
+        """
+        with self._read_lock:
+            if self._native_lib is not None:
+                # unmaps the memory when no other HX711 uses it
+                self._native_lib.cleanGPIO(ctypes.byref(self._native_hx))
+                self._native_lib = None
+                self._native_hx = None
+        if library_path is None:
+            return
+        lib = ctypes.CDLL(library_path)
+        lib.initHX711.argtypes = [
+            ctypes.POINTER(_NativeHX711), ctypes.c_ubyte, ctypes.c_ubyte
+        ]
+        lib.initHX711.restype = ctypes.c_int
+        lib.setupGPIO.argtypes = [ctypes.POINTER(_NativeHX711)]
+        lib.setupGPIO.restype = ctypes.c_int
+        lib.getRawData.argtypes = [ctypes.POINTER(_NativeHX711)]
+        lib.getRawData.restype = ctypes.c_int
+        lib.cleanGPIO.argtypes = [ctypes.POINTER(_NativeHX711)]
+        lib.cleanGPIO.restype = None
+        native_hx = _NativeHX711()
+        if lib.initHX711(ctypes.byref(native_hx), self._pd_sck, self._dout):
+            raise ValueError('Native backend supports pins 0..31. '
+                             'Received dout_pin: {}, pd_sck_pin: {}'.format(
+                                 self._dout, self._pd_sck))
+        with self._read_lock:
+            if lib.setupGPIO(ctypes.byref(native_hx)):
+                raise OSError('Native backend failed to set up GPIO.')
+            self._native_lib = lib
+            self._native_hx = native_hx
+
+    def _native_read(self):
+        """
+        _native_read reads one frame by getRawData from the native library.
+        It passes the wanted channel and gain for the next reading.
+
+        Returns: int 24 bits of data as received from hx711
+        """
+        native_hx = self._native_hx
+        native_hx.wanted_channel = self._wanted_channel.encode('ascii') or b'B'
+        native_hx.gain_channel_A = self._gain_channel_A
+        # getRawData returns sign extended int so keep only 24 bits
+        return self._native_lib.getRawData(ctypes.byref(native_hx)) & 0xffffff
+
+    def _wait_ready(self):
+        """
+        _wait_ready method waits until hx711 has data ready for reading.
+        It waits on the falling edge of DOUT if edge detection is on.
+        Otherwise it sleeps until shortly before the expected
+        end of conversion and then spins.
+
+        Returns: bool True if data is ready, False if it timed out.
+        """
+        edge_detection = self._edge_detection
+        if edge_detection:
+            # edges of the bits of the last frame are old. An edge after
+            # this is kept by the backend, so it is not lost if it comes
+            # between the check of DOUT and the wait.
+            self._gpio.clear_edges(self._dout)
+        if self._ready():
+            return True
+        now = time.perf_counter()
+        deadline = now + self._ready_timeout
+        if edge_detection:
+            while True:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    if not self._ready():
+                        return False
+                    break
+                # an edge of the previous frame can come late so check DOUT
+                if (self._gpio.wait_for_edge(self._dout, remaining) and
+                        self._ready()):
+                    break
+        else:
+            period = self._conversion_period
+            if period and self._last_ready_known:
+                # sleep until shortly before the next expected conversion
+                periods = (now - self._last_ready_time) // period + 1
+                delay = min(self._last_ready_time + periods * period,
+                            deadline) - self._spin_time - now
+                if delay > 0:
+                    time.sleep(delay)
+                    if self._ready():
+                        # it got ready during the sleep so the end of
+                        # conversion was not seen. The next wait does not
+                        # sleep, so a late wake up is not repeated.
+                        self._last_ready_known = False
+                        if time.perf_counter() < now + delay + self._spin_time:
+                            # it woke up on time so the period may be too
+                            # long. The longest interval is forgotten, so
+                            # a wrong estimate does not stay.
+                            self._forget_longest_interval()
+                        return True
+            spin_end = time.perf_counter() + 2 * self._spin_time
+            while not self._ready():
+                now = time.perf_counter()
+                if now >= deadline:
+                    return False
+                if now > spin_end:
+                    time.sleep(self._spin_time)
+        # we have seen the end of conversion so remember when it was
+        now = time.perf_counter()
+        interval = now - self._last_ready_time
+        if self._last_ready_known and interval < self._ready_timeout:
+            # median of the last intervals so one early or late edge
+            # does not move the estimate. A multiple of the period
+            # still predicts a conversion.
+            intervals = self._conversion_intervals
+            intervals.append(interval)
+            self._conversion_period = max(
+                sorted(intervals)[len(intervals) // 2],
+                self._MIN_CONVERSION_PERIOD)
+        self._last_ready_time = now
+        self._last_ready_known = True
+        return True
+
+    def _forget_longest_interval(self):
+        """
+        _forget_longest_interval removes the longest of the recent
+        intervals between conversions and estimates the period again.
+        The period is not known when no interval is left.
+        """
+        intervals = self._conversion_intervals
+        if intervals:
+            intervals.remove(max(intervals))
+        if intervals:
+            self._conversion_period = max(
+                sorted(intervals)[len(intervals) // 2],
+                self._MIN_CONVERSION_PERIOD)
+        else:
+            self._conversion_period = 0.0
+
+    def _ready(self):
+        """
+        _ready method check if data is prepared for reading from HX711
+
+        Returns: bool True if ready else False when not ready        
+        """
+        # if DOUT pin is low data is ready for reading
+        if self._gpio.read_data(self._dout) == 0:
+            return True
+        else:
+            return False
+
+    def _set_channel_gain(self, num):
+        """
+        _set_channel_gain is called only from _read_frame_timed method.
+        It finishes the data transmission for HX711 which sets
+        the next required gain and channel.
+
+        Args:
+            num(int): how many ones it sends to HX711
+                options (1 || 2 || 3)
+        """
+        set_clock = self._gpio.set_clock
+        pd_sck = self._pd_sck
+        counter = time.perf_counter
+        for _ in range(num):
+            start_counter = counter()
+            set_clock(pd_sck, True)
+            set_clock(pd_sck, False)
+            elapsed = counter() - start_counter
+            # check if hx 711 did not turn off...
+            if elapsed >= 0.00006:
+                # if pd_sck pin is HIGH for 60 us and more than the HX 711 enters power down mode.
+                if self._debug_mode:
+                    print('Not enough fast while setting gain and channel')
+                    print('Time elapsed: {}'.format(elapsed))
+                # hx711 has turned off. First few readings are inaccurate.
+                # Despite it, this reading was ok and data can be used.
+                self._timing_violation()
+
+    def _timing_violation(self):
+        """
+        _timing_violation counts the violation and schedules the discard
+        of conversions after hx711 wakes up from power down mode.
+        """
+        self._recovery_policy.violations += 1
+        self._discard_conversions = self._recovery_policy.wakeup_discard
+
+    def _abort_frame(self):
+        """
+        _abort_frame powers down hx711 after a timing violation. A late
+        pulse does not always mean that PD_SCK was high for 60 us, so
+        hx711 may still wait for the rest of the frame or it may have
+        started the next one in the middle of the frame. After the power
+        down it starts again with channel A gain 128 in both cases.
+        """
+        self._gpio.set_clock(self._pd_sck, True)
+        time.sleep(0.0001)
+        self._gpio.set_clock(self._pd_sck, False)
+
+    def _read_recovered_frame(self, retries, wait_time=0.0):
+        """
+        _read_recovered_frame reads one frame from hx711 which is ready
+        for reading, applies the recovery policy and records metrics.
+
+        Args:
+            retries(int): retries already done in this reading
+            wait_time(float): seconds waited for data ready
+
+        Returns: (bool, bool || int, int) True if the reading is finished
+            or False if the next conversion has to be read, the result
+            and the retries done.
+        """
+        policy = self._recovery_policy
+        discard = self._discard_conversions > 0
+        if discard:
+            self._discard_conversions -= 1
+        violations = policy.violations
+        # data of the frame belong to the mode set before it
+        record = self._current_mode
+        self._frame_mode = record
+        # nothing was read yet when the current channel is not known
+        mode = record.index if self._current_channel else -1
+        start_counter = time.perf_counter()
+        result = self._read_frame()
+        end_counter = time.perf_counter()
+        violation = policy.violations != violations
+        self._metrics.observe_frame(mode, wait_time,
+                                    end_counter - start_counter,
+                                    result is False and not violation,
+                                    violation, end_counter)
+        if self._recorder is not None:
+            flags = 0
+            if violation:
+                flags |= SampleRecorder.FLAG_TIMING_VIOLATION
+            if discard:
+                flags |= SampleRecorder.FLAG_DISCARDED
+            self._recorder.record(mode, result, flags)
+        if discard:
+            # conversion after wake up is not settled
+            policy.discarded += 1
+        if violation and (result is False or discard):
+            # the frame was broken by slow clock pulse
+            if retries >= policy.max_retries:
+                policy.failures += 1
+                return True, False, retries
+            policy.retries += 1
+            return False, False, retries + 1
+        if discard:
+            return False, result, retries
+        # if there was violation only the gain pulses were slow
+        # and the data is ok
+        if result is not False and (record.stability_detector is not None or
+                                    record.index in self._watches):
+            weight = self._convert_to_weight(result, record)
+            if record.stability_detector is not None:
+                record.stability_detector.update(weight, end_counter)
+            for watch in self._watches.get(record.index, ()):
+                if watch.check(weight):
+                    # callbacks run in their own thread, not during reading.
+                    # It was stopped by power_down or cleanup.
+                    self._start_callbacks()
+                    self._callback_queue.put((watch.callback, weight))
+        return True, result, retries
+
+    def _read(self):
+        """
+        _read method reads bits from hx711, converts to INT
+        and validate the data.
+        
+        Returns: (bool || int) if it returns False then it is false reading.
+            if it returns int then the reading was correct
+        """
+        with self._read_lock:
+            retries = 0
+            while True:
+                self._gpio.set_clock(self._pd_sck, False)  # start by setting the pd_sck to 0
+                start_counter = time.perf_counter()
+                if not self._wait_ready():
+                    self._frame_mode = self._current_mode
+                    self._metrics.observe_timeout(
+                        self._current_mode.index if self._current_channel
+                        else -1)
+                    if self._debug_mode:
+                        print('self._read() not ready after {} s\n'.format(
+                            self._ready_timeout))
+                    return False
+                finished, result, retries = self._read_recovered_frame(
+                    retries, time.perf_counter() - start_counter)
+                if finished:
+                    return result
+
+    def _read_frame(self):
+        """
+        _read_frame method clocks out one frame from hx711 which
+        is ready for reading. It reads 24 bits, sets the next channel
+        and gain, converts the data to INT and validates it.
+
+        Returns: (bool || int) if it returns False then it is false reading.
+            if it returns int then the reading was correct
+        """
+        with self._read_lock:
+            if self._native_hx is not None:
+                if self._schedule:
+                    self._next_scheduled()
+                # the whole frame including the gain pulses is done in C
+                data_in = self._native_read()
+                mode = self._wanted_mode
+                self._current_channel = mode.channel
+                self._current_mode = mode
+            elif not self._pulse_time:
+                # the first frame times each pulse to learn _pulse_time
+                data_in = self._read_frame_timed()
+                if data_in is False:
+                    return False
+            else:
+                # local names are faster than attribute lookups
+                set_clock = self._gpio.set_clock
+                read_data = self._gpio.read_data
+                pd_sck = self._pd_sck
+                dout = self._dout
+                counter = time.perf_counter
+                data_in = 0  # 2's complement data from hx 711
+                frame_start = counter()
+                # read 24 bits, 8 bits unrolled in each of 3 loops.
+                # Shift the bits as they come to data_in variable.
+                for _ in range(3):
+                    set_clock(pd_sck, True)
+                    set_clock(pd_sck, False)
+                    data_in = (data_in << 1) | read_data(dout)
+                    set_clock(pd_sck, True)
+                    set_clock(pd_sck, False)
+                    data_in = (data_in << 1) | read_data(dout)
+                    set_clock(pd_sck, True)
+                    set_clock(pd_sck, False)
+                    data_in = (data_in << 1) | read_data(dout)
+                    set_clock(pd_sck, True)
+                    set_clock(pd_sck, False)
+                    data_in = (data_in << 1) | read_data(dout)
+                    set_clock(pd_sck, True)
+                    set_clock(pd_sck, False)
+                    data_in = (data_in << 1) | read_data(dout)
+                    set_clock(pd_sck, True)
+                    set_clock(pd_sck, False)
+                    data_in = (data_in << 1) | read_data(dout)
+                    set_clock(pd_sck, True)
+                    set_clock(pd_sck, False)
+                    data_in = (data_in << 1) | read_data(dout)
+                    set_clock(pd_sck, True)
+                    set_clock(pd_sck, False)
+                    data_in = (data_in << 1) | read_data(dout)
+                if self._schedule:
+                    self._next_scheduled()
+                mode = self._wanted_mode
+                # send 1 (A 128), 2 (B) or 3 (A 64) ones
+                for _ in range(mode.pulses):
+                    set_clock(pd_sck, True)
+                    set_clock(pd_sck, False)
+                frame_time = counter() - frame_start
+                # the gain pulses were sent so hx711 uses the new channel and gain
+                self._current_channel = mode.channel
+                self._current_mode = mode
+                pulses = 24 + mode.pulses
+                # Each pulse takes at least _pulse_time. If PD_SCK was high
+                # for 60 us or more the frame is longer than this bound.
+                if frame_time >= 0.00006 + (pulses - 1) * self._pulse_time:
+                    # if pd_sck pin is HIGH for 60 us and more than the HX 711 enters power down mode.
+                    if self._debug_mode:
+                        print('Not enough fast while reading frame')
+                        print('Time elapsed: {}'.format(frame_time))
+                    self._timing_violation()
+                    self._abort_frame()
+                    return False
+                if frame_time < pulses * self._pulse_time:
+                    self._pulse_time = frame_time / pulses
+
+            if self._debug_mode:  # print 2's complement value
+                print('Binary value as received: {}'.format(bin(data_in)))
+
+            #check if data is valid
+            if (data_in == 0x7fffff
+                    or  # 0x7fffff is the highest possible value from hx711
+                    data_in == 0x800000
+               ):  # 0x800000 is the lowest possible value from hx711
+                if self._debug_mode:
+                    print('Invalid data detected: {}\n'.format(data_in))
+                return False  # rturn false because the data is invalid
+
+            # calculate int from 2's complement
+            signed_data = 0
+            # 0b1000 0000 0000 0000 0000 0000 check if the sign bit is 1. Negative number.
+            if (data_in & 0x800000):
+                signed_data = -(
+                    (data_in ^ 0xffffff) + 1)  # convert from 2's complement to int
+            else:  # else do not do anything the value is positive number
+                signed_data = data_in
+
+            if self._debug_mode:
+                print('Converted 2\'s complement value: {}'.format(signed_data))
+
+            return signed_data
+
+    def _read_frame_timed(self):
+        """
+        _read_frame_timed clocks out one frame like _read_frame but it
+        times the high phase of each clock pulse. It is used for the first
+        frame and it measures _pulse_time, the shortest time between
+        two clock pulses, which bounds the time of the later frames.
+
+        Returns: (bool || int) False if a data pulse took 60 us or more.
+            Otherwise 24 bits of data as received from hx711
+        """
+        set_clock = self._gpio.set_clock
+        read_data = self._gpio.read_data
+        pd_sck = self._pd_sck
+        dout = self._dout
+        counter = time.perf_counter
+        pulse_time = 1.0
+        last_start = None
+        data_in = 0
+        for _ in range(24):
+            start_counter = counter()
+            # request next bit from hx 711
+            set_clock(pd_sck, True)
+            set_clock(pd_sck, False)
+            # only the high phase is timed, reading of the bit
+            # happens when PD_SCK is low and cannot power it down
+            elapsed = counter() - start_counter
+            if elapsed >= 0.00006:  # check if the hx 711 did not turn off...
+                # if pd_sck pin is HIGH for 60 us and more than the HX 711 enters power down mode.
+                if self._debug_mode:
+                    print('Not enough fast while reading data')
+                    print('Time elapsed: {}'.format(elapsed))
+                self._timing_violation()
+                self._abort_frame()
+                return False
+            data_in = (data_in << 1) | read_data(dout)
+            if last_start is not None:
+                pulse_time = min(pulse_time, start_counter - last_start)
+            last_start = start_counter
+        if self._schedule:
+            self._next_scheduled()
+        mode = self._wanted_mode
+        # send 1 (A 128), 2 (B) or 3 (A 64) ones
+        self._set_channel_gain(mode.pulses)
+        self._current_channel = mode.channel  # set current channel variable
+        self._current_mode = mode
+        self._pulse_time = pulse_time
+        return data_in
+
+    def is_ready(self):
+        """
+        is_ready method checks if hx711 has data prepared for reading.
+        It does not wait, so it can be polled for example
+        from an event loop.
+
+        Returns: bool True if ready else False when not ready
+        """
+        return self._ready()
+
+    def read_channel(self):
+        """
+        read_channel method reads one conversion from hx711. It waits for
+        data ready and handles timing violations by the recovery policy.
+        When schedule is active the channel and gain of the reading
+        can differ from the current ones before the reading.
+
+        Returns: (str, int, bool || int) channel, gain (0 for channel B)
+            and False if the reading is invalid or int raw data
+        """
+        with self._read_lock:
+            result = self._read()
+            mode = self._frame_mode
+        return mode.channel, mode.gain_A, result
+
+    def get_raw_data_mean(self, readings=30):
+        """
+        get_raw_data_mean returns mean value of readings.
+
+        Args:
+            readings(int): Number of readings for mean.
+
+        Returns: (bool || int) if False then reading is invalid.
+            if it returns int then reading is valid
+        """
+        # do backup of current channel befor reading for later use
+        backup_mode = self._current_mode
+        if self._acquiring():
+            # acquisition thread is running so use the buffered data
+            data_list = self._get_buffered_data(readings, backup_mode)[1]
+            if not data_list:
+                return False
+        else:
+            # do required number of readings
+            data_list = list(self._read_mode(readings, backup_mode))
+            if not data_list:
+                return False
+        return self._data_mean(data_list, backup_mode)
+
+    def _read_mode(self, readings, mode):
+        """
+        _read_mode is a generator which reads hx711 and yields
+        the readings of one channel and gain. When schedule is active
+        the other channels and gains are read in between and their
+        readings are left out. It stops when the mode was not read
+        in readings cycles of the schedule.
+
+        Args:
+            readings(int): Number of readings of the mode
+            mode(_ModeConfig): channel and gain to yield
+
+        Yields: (bool || int) reading like _read
+        """
+        reads = readings * max(len(self._schedule), 1)
+        while readings > 0 and reads > 0:
+            reads -= 1
+            with self._read_lock:
+                result = self._read()
+                # discarded frames move the schedule on, so the mode is
+                # taken from the frame which was returned
+                read_mode = self._frame_mode
+            if read_mode is mode or not self._schedule:
+                readings -= 1
+                yield result
+
+    def _data_mean(self, data_list, mode):
+        """
+        _data_mean filters the list of readings by the data filter,
+        calculates the mean value and saves it as the last raw data
+        for specific channel and gain.
+
+        Args:
+            data_list([int]): readings. It can contain Bool False.
+            mode(_ModeConfig): channel and gain of the readings
+
+        Returns: (bool || int) if False then reading is invalid.
+            if it returns int then reading is valid
+        """
+        data_mean = False
+        if len(data_list) > 2 and self._filter_engine is not None:
+            # the engine counts the rejected readings from its mask
+            data_mean = self._filter_engine.mean(data_list, self._metrics,
+                                                 mode.index)
+            if data_mean is False:
+                return False
+        elif len(data_list) > 2 and self._data_filter:
+            filtered_data = self._data_filter(data_list)
+            self._metrics.observe_filter(mode.index, len(data_list),
+                                         len(filtered_data))
+            if not filtered_data:
+                return False
+            if self._debug_mode:
+                print('data_list: {}'.format(data_list))
+                print('filtered_data list: {}'.format(filtered_data))
+                print('data_mean:', stat.mean(filtered_data))
+            data_mean = stat.mean(filtered_data)
+        else:
+            data_mean = stat.mean(data_list)
+        mode.last_raw_data = data_mean
+        return int(data_mean)
+
+    def get_readings_mean(self, data_list, channel='', gain_A=0):
+        """
+        get_readings_mean filters the readings by the data filter or
+        filter engine and returns their mean like get_raw_data_mean.
+        The mean is saved as the last raw data for the channel and gain.
+        It is meant for readings which were read elsewhere,
+        for example by AsyncHX711.
+
+        Args:
+            data_list([int]): readings. It can contain Bool False.
+            channel(str): Optional, by default it is the current channel.
+                Or use these options ('A' || 'B')
+            gain_A(int): Optional, by default it is the current gain.
+                Or use these options (128 || 64)
+
+        Raises:
+            ValueError: if channel is not ('A' || 'B' || '')
+
+        Returns: (bool || int) if False then reading is invalid.
+            if it returns int then reading is valid
+        """
+        data_list = list(data_list)
+        if not data_list:
+            return False
+        return self._data_mean(data_list, self._mode_config(channel, gain_A))
+
+    def get_data_mean(self, readings=30):
+        """
+        get_data_mean returns average value of readings minus
+        offset for the channel which was read.
+
+        Args:
+            readings(int): Number of readings for mean
+
+        Returns: (bool || int) False if reading was not ok.
+            If it returns int then reading was ok
+        """
+        mode = self._current_mode
+        result = self.get_raw_data_mean(readings)
+        if result != False:
+            return result - mode.offset
+        else:
+            return False
+
+    def get_weight_mean(self, readings=30):
+        """
+        get_weight_mean returns average value of readings minus
+        offset divided by scale ratio for a specific channel
+        and gain.
+
+        Args:
+            readings(int): Number of readings for mean
+
+        Returns: (bool || float) False if reading was not ok.
+            If it returns float then reading was ok
+        """
+        mode = self._current_mode
+        result = self.get_raw_data_mean(readings)
+        if result != False:
+            return self._convert_to_weight(result, mode)
+        else:
+            return False
+
+    def get_weight(self, precision, confidence=0.95, max_readings=100):
+        """
+        get_weight reads until the weight is known with the required
+        precision and returns it with its uncertainty. After each reading
+        the confidence interval of the mean is calculated from the running
+        standard error of all valid readings. It stops when half of
+        the interval converted to weight units is not bigger than
+        precision. Quiet scale needs only a few readings, noisy one reads
+        more. At least 5 readings are taken. The weight is the mean
+        filtered like get_weight_mean does it. The interval is not
+        calculated from the filtered readings, because the filter drops
+        the readings far from the median and the interval would be
+        too narrow.
+
+        Args:
+            precision(float): required half width of the confidence
+                interval in weight units
+            confidence(float): Optional, by default 0.95. Probability that
+                the weight is within the uncertainty.
+            max_readings(int): Optional, by default 100. Maximum number of
+                readings. If precision is not reached the weight is
+                returned with bigger uncertainty.
+
+        Raises:
+            ValueError: if precision is not bigger than 0, confidence is
+                not between 0 and 1 or max_readings is less than 2
+
+        Returns: (bool || (float, float, int)) False if there were less than
+            5 valid readings or max_readings. Otherwise weight, its
+            uncertainty in weight units and number of valid readings.
+        """
+        if not precision > 0:
+            raise ValueError('Parameter "precision" has to be bigger than 0. '
+                             'Received: {}'.format(precision))
+        if not 0 < confidence < 1:
+            raise ValueError('Parameter "confidence" has to be between 0 '
+                             'and 1. Received: {}'.format(confidence))
+        if not isinstance(max_readings, int) or max_readings < 2:
+            raise ValueError('Parameter "max_readings" has to be int bigger '
+                             'than 1. Received: {}'.format(max_readings))
+        mode = self._current_mode
+        if self._acquiring():
+            # acquisition thread is running so use the newest buffered data
+            readings = reversed(self._get_buffered_data(max_readings, mode)[1])
+        else:
+            readings = self._read_mode(max_readings, mode)
+        min_readings = min(5, max_readings)
+        data_list = []
+        # running mean and sum of squared deviations (Welford)
+        data_mean = 0.0
+        squares = 0.0
+        half_width = 0.0
+        for data in readings:
+            if data is False:
+                continue
+            data_list.append(data)
+            count = len(data_list)
+            deviation = data - data_mean
+            data_mean += deviation / count
+            squares += deviation * (data - data_mean)
+            if count < min_readings:
+                continue
+            half_width = _t_quantile(confidence, count - 1) * math.sqrt(
+                squares / (count - 1) / count)
+            uncertainty = abs(
+                self._convert_to_weight(data_mean + half_width, mode) -
+                self._convert_to_weight(data_mean, mode))
+            if uncertainty <= precision:
+                break
+        if len(data_list) < min_readings:
+            if self._debug_mode:
+                print('get_weight(): not enough valid readings: {}\n'.format(
+                    data_list))
+            return False
+        if self._data_mean(data_list, mode) is False:
+            # the filter rejected all readings so use all of them
+            mode.last_raw_data = data_mean
+        data_mean = mode.last_raw_data
+        weight = self._convert_to_weight(data_mean, mode)
+        uncertainty = abs(
+            self._convert_to_weight(data_mean + half_width, mode) - weight)
+        result = (weight, uncertainty, len(data_list))
+        if self._debug_mode:
+            print('get_weight(): {} +- {} from {} readings'.format(*result))
+        return result
+
+    def wait_stable(self, timeout=10.0):
+        """
+        wait_stable waits until the weight of the current channel and
+        gain is stable and returns it. It reads new conversions and
+        the detector starts from empty window, because the older
+        readings can be from a different load. If the acquisition thread
+        is running it only waits for the thread to update the detector.
+
+        Args:
+            timeout(float): Optional, by default 10.0 s. Max time to wait.
+
+        Raises:
+            RuntimeError: if stability detector is not set
+
+        Returns: (bool || float) False if the weight was not stable within
+            timeout. If it returns float it is the mean weight
+            of the steady window.
+        """
+        stability_detector = self._current_mode.stability_detector
+        if stability_detector is None:
+            raise RuntimeError('Stability detector is not set, '
+                               'use set_stability_detector().')
+        deadline = time.perf_counter() + timeout
+        # the acquisition thread updates the detector under the read lock
+        with self._read_lock:
+            stability_detector.reset()
+        while not stability_detector.stable:
+            if time.perf_counter() >= deadline:
+                if self._debug_mode:
+                    print('wait_stable(): not stable after {} s\n'.format(
+                        timeout))
+                return False
+            if self._acquiring():
+                time.sleep(self._conversion_period or 0.01)
+            else:
+                self._read()
+        return stability_detector.weight
+
+    def stream(self):
+        """
+        stream is a generator which reads data from hx711 continuously
+        and yields one value per conversion. The value is raw data
+        minus offset divided by scale ratio for the channel and gain
+        which was read. If stream filter is set for the channel and gain
+        the raw data is filtered by it first.
+
+        Yields: (bool || float) False if reading was not ok.
+            If it yields float then reading was ok
+        """
+        for _, _, weight in self.stream_channels():
+            yield weight
+
+    def stream_channels(self):
+        """
+        stream_channels is a generator like stream but it yields also
+        the channel and gain which was read. It is meant for interleaved
+        sampling set by set_schedule, each sample uses the offset,
+        scale ratio and stream filter of its own channel and gain.
+
+        Yields: (str, int, bool || float) channel, gain (0 for channel B)
+            and False if reading was not ok or float weight
+        """
+        while True:
+            with self._read_lock:
+                result = self._read()
+                mode = self._frame_mode
+            if result is False:
+                yield mode.channel, mode.gain_A, False
+                continue
+            if mode.stream_filter is not None:
+                result = mode.stream_filter.update(result)
+            mode.last_raw_data = result
+            yield mode.channel, mode.gain_A, self._convert_to_weight(
+                result, mode)
+
+    def stream_mean(self, window=30):
+        """
+        stream_mean is a generator which reads data from hx711 continuously
+        and keeps a sliding window of the last readings. After every
+        conversion the window is filtered by the data filter and
+        the mean value is converted to weight for the channel and gain
+        which was read. When the channel or gain changes the window
+        starts again from empty.
+
+        Args:
+            window(int): Number of readings in the sliding window.
+
+        Raises:
+            ValueError: if window is less than 1
+
+        Yields: (bool || float) False if there is no valid data in the window.
+            If it yields float then reading was ok
+        """
+        if not isinstance(window, int) or window < 1:
+            raise ValueError('Parameter "window" has to be int bigger than 0. '
+                             'Received: {}'.format(window))
+        data_window = deque(maxlen=window)
+        window_mode = self._current_mode
+        while True:
+            with self._read_lock:
+                result = self._read()
+                mode = self._frame_mode
+            if mode is not window_mode:
+                data_window.clear()
+                window_mode = mode
+            if result is not False:
+                data_window.append(result)
+            if not data_window:
+                yield False
+                continue
+            if len(data_window) > 2 and self._data_filter:
+                filtered_data = self._data_filter(list(data_window))
+                if not filtered_data:
+                    yield False
+                    continue
+                data_mean = stat.mean(filtered_data)
+            else:
+                data_mean = stat.mean(data_window)
+            mode.last_raw_data = data_mean
+            yield self._convert_to_weight(data_mean, mode)
+
+    def _convert_to_weight(self, data, mode):
+        """
+        _convert_to_weight subtracts offset from data and divides it
+        by scale ratio for specific channel and gain. If calibration
+        is set for them, it converts the data instead of scale ratio.
+
+        Args:
+            data(int || float): raw data
+            mode(_ModeConfig): channel and gain of the data
+
+        Returns: float weight
+        """
+        if mode.calibration is not None:
+            return float(mode.calibration.convert(data - mode.offset))
+        return float((data - mode.offset) / mode.scale_ratio)
+
+    def start_acquisition(self, buffer_size=1024):
+        """
+        start_acquisition method starts a background thread which reads
+        data from hx711 continuously and stores it in a ring buffer.
+        While the thread is running get_raw_data_mean, get_data_mean
+        and get_weight_mean compute the mean from the most recent
+        buffered readings of the current channel and gain
+        and they do not touch GPIO.
+
+        Args:
+            buffer_size(int): Number of readings kept in the ring buffer.
+
+        Raises:
+            ValueError: if buffer_size is less than 1
+            RuntimeError: if acquisition is already running
+        """
+        if not isinstance(buffer_size, int) or buffer_size < 1:
+            raise ValueError('Parameter "buffer_size" has to be int '
+                             'bigger than 0. Received: {}'.format(buffer_size))
+        if self._acquisition_thread is not None:
+            raise RuntimeError('Acquisition is already running.')
+        self._buffer_data = array('i', [0]) * buffer_size
+        self._buffer_time = array('d', [0.0]) * buffer_size
+        self._buffer_mode = array('b', [0]) * buffer_size
+        self._buffer_size = buffer_size
+        self._buffer_index = 0
+        self._buffer_count = 0
+        self._acquisition_error = None
+        self._acquisition_stop.clear()
+        self._acquisition_thread = threading.Thread(
+            target=self._acquisition_loop, name='hx711-acquisition', daemon=True)
+        self._acquisition_thread.start()
+
+    def stop_acquisition(self):
+        """
+        stop_acquisition method stops the background acquisition thread.
+        After that the readings are taken directly from hx711 again.
+
+        Raises:
+            Exception: which stopped the acquisition thread if it was
+                not raised yet
+        """
+        thread = self._acquisition_thread
+        if thread is not None:
+            self._acquisition_stop.set()
+            thread.join()
+            self._acquisition_thread = None
+        self._acquiring()
+
+    def get_buffered_data(self, readings=30, channel='', gain_A=0):
+        """
+        get_buffered_data returns the most recent buffered readings
+        for specific channel and gain. The oldest reading is first.
+        By default for the current channel and gain.
+
+        Args:
+            readings(int): Maximum number of readings.
+            channel(str): Optional, by default it is the current channel.
+                Or use these options ('A' || 'B')
+            gain_A(int): Optional, by default it is the current gain.
+                Or use these options (128 || 64)
+
+        Raises:
+            ValueError: if channel is not ('A' || 'B' || '')
+            Exception: which stopped the acquisition thread if it was
+                not raised yet
+
+        Returns: ([float], [int]) list of timestamps from time.perf_counter()
+            and list of raw data. Both are empty if acquisition is not running.
+        """
+        self._acquiring()
+        return self._get_buffered_data(readings,
+                                       self._mode_config(channel, gain_A))
+
+    def _init_runtime_state(self):
+        """
+        _init_runtime_state sets the attributes which cannot be pickled.
+        The background acquisition, the native backend and the callbacks.
+        It is called from __init__ and after unpickling.
+        """
+        self._native_lib = None
+        self._native_hx = None
+        self._read_lock = threading.RLock()
+        self._acquisition_thread = None
+        self._acquisition_stop = threading.Event()
+        self._acquisition_error = None  # exception which stopped the thread
+        self._buffer_lock = threading.Lock()
+        self._buffer_data = None
+        self._buffer_time = None
+        self._buffer_mode = None
+        self._buffer_size = 0
+        self._buffer_index = 0
+        self._buffer_count = 0
+        self._recorder = None
+        self._watches = {}  # mode index: (watch,) checked by each conversion
+        self._callback_queue = None  # queue of the callback thread
+        self._callback_thread = None
+        # shortest time of one clock pulse including the read of DOUT.
+        # It depends on the machine and GPIO backend so it is not pickled.
+        # 0.0 until the first frame is read.
+        self._pulse_time = 0.0
+
+    def _acquisition_loop(self):
+        """
+        _acquisition_loop runs in the acquisition thread. It reads
+        data from hx711 and writes valid readings to the ring buffer.
+        An exception stops the thread, it is kept and raised
+        by the next buffered reading or by stop_acquisition.
+        """
+        try:
+            while not self._acquisition_stop.is_set():
+                with self._read_lock:
+                    result = self._read()
+                    mode = self._frame_mode.index
+                if result is False:
+                    continue
+                timestamp = time.perf_counter()
+                with self._buffer_lock:
+                    index = self._buffer_index
+                    self._buffer_data[index] = result
+                    self._buffer_time[index] = timestamp
+                    self._buffer_mode[index] = mode
+                    self._buffer_index = (index + 1) % self._buffer_size
+                    if self._buffer_count < self._buffer_size:
+                        self._buffer_count += 1
+        except Exception as error:
+            self._acquisition_error = error
+            if self._debug_mode:
+                traceback.print_exc()
+        finally:
+            # the readings are taken directly from hx711 again
+            if self._acquisition_thread is threading.current_thread():
+                self._acquisition_thread = None
+
+    def _acquiring(self):
+        """
+        _acquiring checks if the acquisition thread is running.
+        If the thread was stopped by an exception, the exception
+        is raised once and then the readings are taken directly
+        from hx711.
+
+        Raises:
+            Exception: which stopped the acquisition thread
+
+        Returns: bool True if the acquisition thread is running
+        """
+        error = self._acquisition_error
+        if error is not None:
+            self._acquisition_error = None
+            raise error
+        return self._acquisition_thread is not None
+
+    def _get_buffered_data(self, readings, mode):
+        """
+        _get_buffered_data collects the most recent buffered readings
+        for specific channel and gain.
+
+        Args:
+            readings(int): Maximum number of readings.
+            mode(_ModeConfig): channel and gain of the readings
+
+        Returns: ([float], [int]) timestamps and raw data, the oldest first.
+        """
+        timestamps = []
+        data_list = []
+        if self._buffer_data is None:
+            return timestamps, data_list
+        mode = mode.index
+        with self._buffer_lock:
+            index = self._buffer_index
+            for _ in range(self._buffer_count):
+                index = (index - 1) % self._buffer_size
+                if self._buffer_mode[index] == mode:
+                    timestamps.append(self._buffer_time[index])
+                    data_list.append(self._buffer_data[index])
+                    if len(data_list) == readings:
+                        break
+        timestamps.reverse()
+        data_list.reverse()
+        return timestamps, data_list
+
+    @staticmethod
+    def _mode_index(channel, gain_A):
+        """
+        _mode_index returns a small int which identifies channel and gain.
+
+        Args:
+            channel(str): ('A' || 'B')
+            gain_A(int): (128 || 64)
+
+        Returns: int 0 for A 128, 1 for A 64, 2 for B and -1 if unknown
+        """
+        if channel == 'A' and gain_A == 128:
+            return 0
+        elif channel == 'A' and gain_A == 64:
+            return 1
+        elif channel == 'B':
+            return 2
+        else:
+            return -1
+
+    def __getstate__(self):
+        """
+        __getstate__ leaves out locks, threads, ring buffer, recorder,
+        callbacks and native backend so the object can be pickled.
+        """
+        return {
+            name: getattr(self, name)
+            for name in self._PICKLED_SLOTS
+            if hasattr(self, name)
+        }
+
+    def __setstate__(self, state):
+        """
+        __setstate__ restores the pickled state and creates
+        new acquisition attributes.
+        """
+        for name, value in state.items():
+            setattr(self, name, value)
+        self._init_runtime_state()
+
+    def get_current_channel(self):
+        """
+        get current channel returns the value of current channel.
+
+        Returns: ('A' || 'B')
+        """
+        return self._current_channel
+
+    def get_data_filter(self):
+        """
+        get data filter.
+
+        Returns: self._data_filter
+        """
+        return self._data_filter
+
+    def get_current_gain_A(self):
+        """
+        get current gain A returns the value of current gain on channel A
+
+        Returns: (128 || 64) current gain on channel A
+        """
+        return self._gain_channel_A
+
+    def get_last_raw_data(self, channel='', gain_A=0):
+        """
+        get last raw data returns the last read data for a
+        channel and gain. By default for current one.
+
+        Args:
+            channel(str): select channel ('A' || 'B'). If not then it returns the current one.
+            gain_A(int): select gain (128 || 64). If not then it returns the current one.
+        
+        Raises:
+            ValueError: if channel is not ('A' || 'B' || '') or gain_A is not (128 || 64 || 0)
+                '' and 0 is default value.
+
+        Returns: int the last data that was received for the chosen channel and gain
+        """
+        return self._mode_config(channel, gain_A).last_raw_data
+
+    def get_current_offset(self, channel='', gain_A=0):
+        """
+        get current offset returns the current offset for
+        a particular channel and gain. By default the current one.
+
+        Args:
+            channel(str): select for which channel ('A' || 'B')
+            gain_A(int): select for which gain (128 || 64)
+        
+        Raises:
+            ValueError: if channel is not ('A' || 'B' || '') or gain_A is not (128 || 64 || 0)
+                '' and 0 is default value.
+
+        Returns: int the offset for the chosen channel and gain
+        """
+        return self._mode_config(channel, gain_A).offset
+
+    def get_current_scale_ratio(self, channel='', gain_A=0):
+        """
+        get current scale ratio returns the current scale ratio
+        for a particular channel and gain. By default
+        the current one.
+
+        Args:
+            channel(str): select for which channel ('A' || 'B')
+            gain_A(int): select for which gain (128 || 64)
+
+        Returns: int the scale ratio for the chosen channel and gain
+        """
+        return self._mode_config(channel, gain_A).scale_ratio
+
+    def power_down(self):
+        """
+        power down method turns off the hx711. The callback thread
+        is stopped, the next callback starts it again.
+        """
+        with self._read_lock:
+            self._gpio.set_clock(self._pd_sck, False)
+            self._gpio.set_clock(self._pd_sck, True)
+            time.sleep(0.01)
+        self._stop_callbacks()
+
+    def cleanup(self):
+        """
+        cleanup method stops the acquisition and callback threads
+        and releases the pins by cleanup of the GPIO backend.
+        Do not use it while other HX711 share the GPIO backend.
+
+        Raises:
+            Exception: which stopped the acquisition thread if it was
+                not raised yet
+        """
+        try:
+            self.stop_acquisition()
+        finally:
+            self._stop_callbacks()
+            with self._read_lock:
+                self._gpio.cleanup()
+
+    def power_up(self):
+        """
+        power up function turns on the hx711.
+        """
+        with self._read_lock:
+            self._gpio.set_clock(self._pd_sck, False)
+            time.sleep(0.01)
+
+    def reset(self):
+        """
+        reset method resets the hx711 and prepare it for the next reading.
+
+        Returns: True if error encountered
+        """
+        self.power_down()
+        self.power_up()
+        result = self.get_raw_data_mean(6)
+        if result:
+            return False
+        else:
+            return True
+
+
+    def outliers_filter(self, data_list, stdev_thresh = 1.0):
+        """
+        It filters out outliers from the provided list of int.
+        Median is used as an estimator of outliers.
+        Outliers are compared to the standard deviation from the median
+        Default filter is of 1.0 standard deviation from the median
+
+        Args:
+            data_list([int]): List of int. It can contain Bool False that is removed.
+        
+        Returns: list of filtered data. Excluding outliers.
+        """
+        return outliers_filter(data_list, stdev_thresh)
+
+
+class HX711Array:
+    """
+    HX711Array represents several hx711 chips which share one Clock pin.
+    On each clock pulse the Data pins of all chips are read together,
+    therefore one frame gives synchronized readings of all chips.
     """
 
     def __init__(self,
-                 dout_pin,
+                 dout_pins,
                  pd_sck_pin,
                  gain_channel_A=128,
-                 select_channel='A'):
+                 select_channel='A',
+                 gpio_backend=None,
+                 data_rate=None):
+        """
+        Init a new instance of HX711Array
+
+        Args:
+            dout_pins([int]): pin numbers where the Data pins of hx711 chips are connected.
+            pd_sck_pin(int): pin number where the shared Clock pin is connected.
+            gain_channel_A(int): Optional, by default value 128. Options (128 || 64)
+            select_channel(str): Optional, by default 'A'. Options ('A' || 'B')
+            gpio_backend(GPIOBackend): Optional, by default RPiGPIOBackend.
+                Backend used for access to the pins.
+            data_rate(int): Optional, by default it is not known. Output data
+                rate set by the RATE pin of the chips. Options (10 || 80)
+
+        Raises:
+            TypeError: if pd_sck_pin or dout_pins are not int type
+                or gpio_backend is not GPIOBackend type
+            ValueError: if dout_pins is empty or data_rate is
+                not (10 || 80 || None)
+        """
+        dout_pins = list(dout_pins)
+        if not dout_pins:
+            raise ValueError('dout_pins must contain at least one pin.')
+        for dout_pin in dout_pins:
+            if not isinstance(dout_pin, int):
+                raise TypeError('dout_pins must be type int. '
+                                'Received dout_pin: {}'.format(dout_pin))
+        if not isinstance(pd_sck_pin, int):
+            raise TypeError('pd_sck_pin must be type int. '
+                            'Received pd_sck_pin: {}'.format(pd_sck_pin))
+        if gpio_backend is None:
+            gpio_backend = RPiGPIOBackend()
+        elif not isinstance(gpio_backend, GPIOBackend):
+            raise TypeError('gpio_backend must be type GPIOBackend. '
+                            'Received gpio_backend: {}'.format(gpio_backend))
+        self._dout_pins = dout_pins
+        self._pd_sck = pd_sck_pin
+        self._gpio = gpio_backend
+        count = len(dout_pins)
+        self._gain_channel_A = 0
+        self._wanted_channel = ''
+        self._current_channel = ''
+        # the same table as in HX711, the offset and scale ratio
+        # of each mode are lists with a value for each chip
+        self._modes = (_ModeConfig(0, 'A', 128, 1), _ModeConfig(1, 'A', 64, 3),
+                       _ModeConfig(2, 'B', 0, 2))
+        for mode in self._modes:
+            mode.offset = [0] * count
+            mode.scale_ratio = [1] * count
+        self._wanted_mode = self._modes[2]
+        self._current_mode = self._modes[2]
+        self._debug_mode = False
+        self._data_filter = outliers_filter
+        self._filter_engine = None
+        self._ready_timeout = 0.5  # max time to wait for data ready
+        self._spin_time = 0.0005  # busy wait before the expected conversion
+        self._conversion_period = 0.0  # median of recent times between conversions
+        self._conversion_intervals = deque(maxlen=9)
+        self._last_ready_time = 0.0
+        self._last_ready_known = False  # the end of conversion was seen
+        self._recovery_policy = RecoveryPolicy()
+        self._discard_conversions = 0  # left to discard after wake up
+        self._metrics = HX711Metrics()
+        self._data_rate = None
+        if data_rate is not None:
+            self.set_data_rate(data_rate)
+
+        self._gpio.setup_output(self._pd_sck)  # pin _pd_sck is output only
+        for dout_pin in self._dout_pins:
+            self._gpio.setup_input(dout_pin)  # pins _dout_pins are input only
+        # no channel is selected yet so only the gain is stored
+        self.set_gain_A(gain_channel_A, skip_if_active=True)
+        self.select_channel(select_channel)
+
+    def __len__(self):
+        return len(self._dout_pins)
+
+    def select_channel(self, channel, skip_if_active=False):
+        """
+        select_channel method evaluates if the desired channel
+        is valid and then sets the _wanted_channel variable.
+        Then it discards the conversions until the output settles.
+
+        Args:
+            channel(str): the channel to select. Options ('A' || 'B')
+            skip_if_active(bool): Optional, by default False. If True and
+                the channel is already active, nothing is read.
+        Raises:
+            ValueError: if channel is not 'A' or 'B'
+        """
+        channel = channel.capitalize()
+        if (channel == 'A'):
+            self._wanted_channel = 'A'
+        elif (channel == 'B'):
+            self._wanted_channel = 'B'
+        else:
+            raise ValueError('Parameter "channel" has to be "A" or "B". '
+                             'Received: {}'.format(channel))
+        self._select_mode()
+        if skip_if_active and self._current_channel == channel:
+            return
+        self._settle()
+
+    def set_gain_A(self, gain, skip_if_active=False):
+        """
+        set_gain_A method sets gain for channel A.
+        Then it discards the conversions until the output settles.
+
+        Args:
+            gain(int): Gain for channel A (128 || 64)
+            skip_if_active(bool): Optional, by default False. If True and
+                the gain is already active or channel A is not selected,
+                nothing is read.
+
+        Raises:
+            ValueError: if gain is different than 128 or 64
+        """
+        previous_gain = self._gain_channel_A
+        if gain == 128 or gain == 64:
+            self._gain_channel_A = gain
+        else:
+            raise ValueError('gain has to be 128 or 64. '
+                             'Received: {}'.format(gain))
+        self._select_mode()
+        if skip_if_active and (self._wanted_channel != 'A' or
+                               (gain == previous_gain and
+                                self._current_channel == 'A')):
+            return
+        self._settle()
+
+    def set_data_rate(self, data_rate):
+        """
+        set_data_rate method sets the output data rate of the chips.
+        It is used for the number of conversions discarded after
+        channel or gain change like in HX711.
+
+        Args:
+            data_rate(int): samples per second (10 || 80)
+
+        Raises:
+            ValueError: if data_rate is not 10 or 80
+        """
+        if data_rate not in HX711._SETTLING_TIME:
+            raise ValueError('Parameter "data_rate" has to be 10 or 80. '
+                             'Received: {}'.format(data_rate))
+        self._data_rate = data_rate
+
+    def get_data_rate(self):
+        """
+        get data rate returns the configured data rate.
+
+        Returns: float samples per second. 0.0 if it is not known.
+        """
+        if self._data_rate is not None:
+            return float(self._data_rate)
+        return 0.0
+
+    def _settle(self):
+        """
+        _settle sends the wanted channel and gain to the chips and discards
+        the conversions until the output settles after the change.
+        """
+        data_rate = self.get_data_rate()
+        if not data_rate and self._conversion_period:
+            # estimated from the times of recent conversions
+            data_rate = 1.0 / self._conversion_period
+        # the first reading sends the pulses for the new channel and gain
+        # the data before is garbage and cannot be used.
+        for _ in range(1 + HX711._settling_conversions(data_rate)):
+            self._read()
+
+    def set_data_filter(self, data_filter):
+        """
+        set_data_filter method sets data filter that is passed as an argument.
+        The filter is used for the readings of each chip separately.
+
+        Args:
+            data_filter(data_filter): Data filter that takes list of int numbers and
+                returns a list of filtered int numbers.
+
+        Raises:
+            TypeError: if filter is not a function.
+        """
+        if callable(data_filter):
+            self._data_filter = data_filter
+        else:
+            raise TypeError('Parameter "data_filter" must be a function. '
+                            'Received: {}'.format(data_filter))
+
+    def set_debug_mode(self, flag=False):
         """
-        Init a new instance of HX711
+        set_debug_mode method is for turning on and off
+        debug mode.
 
         Args:
-            dout_pin(int): Raspberry Pi pin number where the Data pin of HX711 is connected.
-            pd_sck_pin(int): Raspberry Pi pin number where the Clock pin of HX711 is connected.
-            gain_channel_A(int): Optional, by default value 128. Options (128 || 64)
-            select_channel(str): Optional, by default 'A'. Options ('A' || 'B')
+            flag(bool): True turns on the debug mode. False turns it off.
 
         Raises:
-            TypeError: if pd_sck_pin or dout_pin are not int type
+            ValueError: if flag is not bool type
         """
-        if (isinstance(dout_pin, int)):
-            if (isinstance(pd_sck_pin, int)):
-                self._pd_sck = pd_sck_pin
-                self._dout = dout_pin
-            else:
-                raise TypeError('pd_sck_pin must be type int. '
-                                'Received pd_sck_pin: {}'.format(pd_sck_pin))
+        if flag == False:
+            self._debug_mode = False
+            print('Debug mode DISABLED')
+        elif flag == True:
+            self._debug_mode = True
+            print('Debug mode ENABLED')
         else:
-            raise TypeError('dout_pin must be type int. '
-                            'Received dout_pin: {}'.format(dout_pin))
-
-        self._gain_channel_A = 0
-        self._offset_A_128 = 0  # offset for channel A and gain 128
-        self._offset_A_64 = 0  # offset for channel A and gain 64
-        self._offset_B = 0  # offset for channel B
-        self._last_raw_data_A_128 = 0
-        self._last_raw_data_A_64 = 0
-        self._last_raw_data_B = 0
-        self._wanted_channel = ''
-        self._current_channel = ''
-        self._scale_ratio_A_128 = 1  # scale ratio for channel A and gain 128
-        self._scale_ratio_A_64 = 1  # scale ratio for channel A and gain 64
-        self._scale_ratio_B = 1  # scale ratio for channel B
-        self._debug_mode = False
-        self._data_filter = self.outliers_filter  # default it is used outliers_filter
-
-        GPIO.setup(self._pd_sck, GPIO.OUT)  # pin _pd_sck is output only
-        GPIO.setup(self._dout, GPIO.IN)  # pin _dout is input only
-        self.select_channel(select_channel)
-        self.set_gain_A(gain_channel_A)
+            raise ValueError('Parameter "flag" can be only BOOL value. '
+                             'Received: {}'.format(flag))
 
-    def select_channel(self, channel):
+    def set_filter_engine(self, filter_engine):
         """
-        select_channel method evaluates if the desired channel
-        is valid and then sets the _wanted_channel variable.
+        set_filter_engine method sets engine which filters the readings of
+        all chips in one batched call, for example NumpyFilterEngine.
+        When it is set it is used instead of the data filter.
 
         Args:
-            channel(str): the channel to select. Options ('A' || 'B')
+            filter_engine(NumpyFilterEngine): engine with method batch_mean.
+                None turns it off and the data filter is used again.
+
         Raises:
-            ValueError: if channel is not 'A' or 'B'
+            TypeError: if filter_engine does not have method batch_mean.
         """
-        channel = channel.capitalize()
-        if (channel == 'A'):
-            self._wanted_channel = 'A'
-        elif (channel == 'B'):
-            self._wanted_channel = 'B'
+        if filter_engine is None or callable(
+                getattr(filter_engine, 'batch_mean', None)):
+            self._filter_engine = filter_engine
         else:
-            raise ValueError('Parameter "channel" has to be "A" or "B". '
-                             'Received: {}'.format(channel))
-        # after changing channel or gain it has to wait 50 ms to allow adjustment.
-        # the data before is garbage and cannot be used.
-        self._read()
-        time.sleep(0.5)
+            raise TypeError('Parameter "filter_engine" must have method '
+                            'batch_mean. Received: {}'.format(filter_engine))
 
-    def set_gain_A(self, gain):
+    def set_recovery_policy(self, recovery_policy):
         """
-        set_gain_A method sets gain for channel A.
-        
+        set_recovery_policy method sets how timing violations are handled.
+        It works the same as for HX711, a frame broken by a slow clock
+        pulse is read again and the conversions after wake up
+        are discarded for all chips.
+
         Args:
-            gain(int): Gain for channel A (128 || 64)
-        
+            recovery_policy(RecoveryPolicy): the policy with its counters
+
         Raises:
-            ValueError: if gain is different than 128 or 64
+            TypeError: if recovery_policy is not RecoveryPolicy type
         """
-        if gain == 128:
-            self._gain_channel_A = gain
-        elif gain == 64:
-            self._gain_channel_A = gain
-        else:
-            raise ValueError('gain has to be 128 or 64. '
-                             'Received: {}'.format(gain))
-        # after changing channel or gain it has to wait 50 ms to allow adjustment.
-        # the data before is garbage and cannot be used.
-        self._read()
-        time.sleep(0.5)
+        if not isinstance(recovery_policy, RecoveryPolicy):
+            raise TypeError('Parameter "recovery_policy" must be type '
+                            'RecoveryPolicy. Received: {}'.format(
+                                recovery_policy))
+        self._recovery_policy = recovery_policy
+
+    def get_recovery_policy(self):
+        """
+        get recovery policy returns the policy with counters of
+        timing violations, retries and discarded conversions.
+
+        Returns: RecoveryPolicy
+        """
+        return self._recovery_policy
+
+    def get_metrics(self):
+        """
+        get metrics returns the counters and histograms of the frames.
+        A frame is counted as invalid if the data of any chip is invalid.
+
+        Returns: HX711Metrics
+        """
+        return self._metrics
 
     def zero(self, readings=30):
         """
-        zero is a method which sets the current data as
-        an offset for particulart channel. It can be used for
-        subtracting the weight of the packaging. Also known as tare.
+        zero is a method which sets the current data of each chip as
+        an offset for the current channel and gain. Also known as tare.
 
         Args:
             readings(int): Number of readings for mean. Allowed values 1..99
@@ -121,572 +4947,969 @@ class HX711:
 
         Returns: True if error occured.
         """
-        if readings > 0 and readings < 100:
-            result = self.get_raw_data_mean(readings)
-            if result != False:
-                if (self._current_channel == 'A' and
-                        self._gain_channel_A == 128):
-                    self._offset_A_128 = result
-                    return False
-                elif (self._current_channel == 'A' and
-                      self._gain_channel_A == 64):
-                    self._offset_A_64 = result
-                    return False
-                elif (self._current_channel == 'B'):
-                    self._offset_B = result
-                    return False
-                else:
-                    if self._debug_mode:
-                        print('Cannot zero() channel and gain mismatch.\n'
-                              'current channel: {}\n'
-                              'gain A: {}\n'.format(self._current_channel,
-                                                    self._gain_channel_A))
-                    return True
-            else:
-                if self._debug_mode:
-                    print('From method "zero()".\n'
-                          'get_raw_data_mean(readings) returned False.\n')
-                return True
-        else:
+        if not (readings > 0 and readings < 100):
             raise ValueError('Parameter "readings" '
                              'can be in range 1 up to 99. '
                              'Received: {}'.format(readings))
+        results = self.get_raw_data_mean(readings)
+        if any(result is False for result in results):
+            if self._debug_mode:
+                print('From method "zero()".\n'
+                      'get_raw_data_mean(readings) returned False.\n')
+            return True
+        self._current_mode.offset[:] = results
+        return False
 
-    def set_offset(self, offset, channel='', gain_A=0):
+    def set_offset(self, offset, index, channel='', gain_A=0):
         """
-        set offset method sets desired offset for specific
-        channel and gain. Optional, by default it sets offset for current
-        channel and gain.
-        
+        set offset method sets desired offset for one chip and specific
+        channel and gain. By default for current channel and gain.
+
         Args:
             offset(int): specific offset for channel
+            index(int): index of the chip in dout_pins
             channel(str): Optional, by default it is the current channel.
                 Or use these options ('A' || 'B')
-        
+            gain_A(int): Optional, by default it is the current gain.
+                Or use these options (128 || 64)
+
         Raises:
             ValueError: if channel is not ('A' || 'B' || '')
             TypeError: if offset is not int type
         """
-        channel = channel.capitalize()
-        if isinstance(offset, int):
-            if channel == 'A' and gain_A == 128:
-                self._offset_A_128 = offset
-                return
-            elif channel == 'A' and gain_A == 64:
-                self._offset_A_64 = offset
-                return
-            elif channel == 'B':
-                self._offset_B = offset
-                return
-            elif channel == '':
-                if self._current_channel == 'A' and self._gain_channel_A == 128:
-                    self._offset_A_128 = offset
-                    return
-                elif self._current_channel == 'A' and self._gain_channel_A == 64:
-                    self._offset_A_64 = offset
-                    return
-                else:
-                    self._offset_B = offset
-                    return
-            else:
-                raise ValueError('Parameter "channel" has to be "A" or "B". '
-                                 'Received: {}'.format(channel))
-        else:
+        if not isinstance(offset, int):
             raise TypeError('Parameter "offset" has to be integer. '
                             'Received: ' + str(offset) + '\n')
+        self._mode_config(channel, gain_A).offset[index] = offset
 
-    def set_scale_ratio(self, scale_ratio, channel='', gain_A=0):
+    def set_scale_ratio(self, scale_ratio, index, channel='', gain_A=0):
         """
         set_scale_ratio method sets the ratio for calculating
-        weight in desired units. In order to find this ratio for
-        example to grams or kg. You must have known weight.
+        weight in desired units for one chip.
 
         Args:
             scale_ratio(float): number > 0.0 that is used for
                 conversion to weight units
+            index(int): index of the chip in dout_pins
             channel(str): Optional, by default it is the current channel.
-                Or use these options ('a'|| 'A' || 'b' || 'B')
-            gain_A(int): Optional, by default it is the current channel.
+                Or use these options ('A' || 'B')
+            gain_A(int): Optional, by default it is the current gain.
                 Or use these options (128 || 64)
+
         Raises:
             ValueError: if channel is not ('A' || 'B' || '')
-            TypeError: if offset is not int type
         """
-        channel = channel.capitalize()
-        if isinstance(gain_A, int):
-            if channel == 'A' and gain_A == 128:
-                self._scale_ratio_A_128 = scale_ratio
-                return
-            elif channel == 'A' and gain_A == 64:
-                self._scale_ratio_A_64 = scale_ratio
-                return
-            elif channel == 'B':
-                self._scale_ratio_B = scale_ratio
-                return
-            elif channel == '':
-                if self._current_channel == 'A' and self._gain_channel_A == 128:
-                    self._scale_ratio_A_128 = scale_ratio
-                    return
-                elif self._current_channel == 'A' and self._gain_channel_A == 64:
-                    self._scale_ratio_A_64 = scale_ratio
-                    return
-                else:
-                    self._scale_ratio_B = scale_ratio
-                    return
+        self._mode_config(channel, gain_A).scale_ratio[index] = scale_ratio
+
+    def get_current_offset(self, index, channel='', gain_A=0):
+        """
+        get current offset returns the offset of one chip for
+        a particular channel and gain. By default the current one.
+
+        Args:
+            index(int): index of the chip in dout_pins
+            channel(str): select for which channel ('A' || 'B')
+            gain_A(int): select for which gain (128 || 64)
+
+        Returns: int the offset for the chosen channel and gain
+        """
+        return self._mode_config(channel, gain_A).offset[index]
+
+    def get_current_scale_ratio(self, index, channel='', gain_A=0):
+        """
+        get current scale ratio returns the scale ratio of one chip
+        for a particular channel and gain. By default the current one.
+
+        Args:
+            index(int): index of the chip in dout_pins
+            channel(str): select for which channel ('A' || 'B')
+            gain_A(int): select for which gain (128 || 64)
+
+        Returns: float the scale ratio for the chosen channel and gain
+        """
+        return self._mode_config(channel, gain_A).scale_ratio[index]
+
+    def get_current_channel(self):
+        """
+        get current channel returns the value of current channel.
+
+        Returns: ('A' || 'B')
+        """
+        return self._current_channel
+
+    def get_current_gain_A(self):
+        """
+        get current gain A returns the value of current gain on channel A
+
+        Returns: (128 || 64) current gain on channel A
+        """
+        return self._gain_channel_A
+
+    def read(self):
+        """
+        read method reads one frame from all chips.
+
+        Returns: [(bool || int)] for each chip False if the reading is invalid
+            or int if the reading was correct
+        """
+        return self._read()
+
+    def get_raw_data_mean(self, readings=30):
+        """
+        get_raw_data_mean returns mean value of readings for each chip.
+
+        Args:
+            readings(int): Number of readings for mean.
+
+        Returns: [(bool || int)] for each chip False if reading is invalid.
+            if it is int then reading is valid
+        """
+        frames = [self._read() for _ in range(readings)]
+        mode = self._current_mode.index if self._current_channel else -1
+        if readings > 2 and self._filter_engine is not None:
+            # one row of readings for each chip, the engine counts
+            # the rejected readings from its mask
+            means = self._filter_engine.batch_mean(list(zip(*frames)),
+                                                   self._metrics, mode)
+            results = [False if mean != mean else int(mean) for mean in means]
+            if self._debug_mode:
+                print('get_raw_data_mean: {}'.format(results))
+            return results
+        results = []
+        for index in range(len(self._dout_pins)):
+            data_list = [frame[index] for frame in frames]
+            if len(data_list) > 2 and self._data_filter:
+                filtered_data = self._data_filter(data_list)
+                self._metrics.observe_filter(mode, len(data_list),
+                                             len(filtered_data))
+                data_list = filtered_data
             else:
-                raise ValueError('Parameter "channel" has to be "A" or "B". '
-                                 'received: {}'.format(channel))
-        else:
-            raise TypeError('Parameter "gain_A" has to be integer. '
-                            'Received: ' + str(gain_A) + '\n')
+                data_list = [data for data in data_list if data is not False]
+            if not data_list:
+                results.append(False)
+            else:
+                results.append(int(stat.mean(data_list)))
+        if self._debug_mode:
+            print('get_raw_data_mean: {}'.format(results))
+        return results
 
-    def set_data_filter(self, data_filter):
+    def get_data_mean(self, readings=30):
         """
-        set_data_filter method sets data filter that is passed as an argument.
+        get_data_mean returns average value of readings minus
+        offset for each chip.
 
         Args:
-            data_filter(data_filter): Data filter that takes list of int numbers and
-                returns a list of filtered int numbers.
-        
-        Raises:
-            TypeError: if filter is not a function.
+            readings(int): Number of readings for mean
+
+        Returns: [(bool || int)] for each chip False if reading was not ok.
+            If it is int then reading was ok
         """
-        if callable(data_filter):
-            self._data_filter = data_filter
-        else:
-            raise TypeError('Parameter "data_filter" must be a function. '
-                            'Received: {}'.format(data_filter))
+        results = self.get_raw_data_mean(readings)
+        offsets = self._current_mode.offset
+        return [
+            False if result is False else result - offset
+            for result, offset in zip(results, offsets)
+        ]
 
-    def set_debug_mode(self, flag=False):
+    def get_weight_mean(self, readings=30):
         """
-        set_debug_mode method is for turning on and off
-        debug mode.
-        
+        get_weight_mean returns average value of readings minus
+        offset divided by scale ratio for each chip.
+
         Args:
-            flag(bool): True turns on the debug mode. False turns it off.
-        
-        Raises:
-            ValueError: if fag is not bool type
+            readings(int): Number of readings for mean
+
+        Returns: [(bool || float)] for each chip False if reading was not ok.
+            If it is float then reading was ok
         """
-        if flag == False:
-            self._debug_mode = False
-            print('Debug mode DISABLED')
-            return
-        elif flag == True:
-            self._debug_mode = True
-            print('Debug mode ENABLED')
-            return
-        else:
-            raise ValueError('Parameter "flag" can be only BOOL value. '
-                             'Received: {}'.format(flag))
+        results = self.get_raw_data_mean(readings)
+        mode = self._current_mode
+        return [
+            False if result is False else float((result - offset) / ratio)
+            for result, offset, ratio in zip(results, mode.offset,
+                                             mode.scale_ratio)
+        ]
 
-    def _save_last_raw_data(self, channel, gain_A, data):
+    def _select_mode(self):
         """
-        _save_last_raw_data saves the last raw data for specific channel and gain.
-        
+        _select_mode chooses the records of the wanted and the current
+        channel and gain from the table like in HX711.
+        """
+        self._wanted_mode = self._modes[HX711._mode_index(
+            self._wanted_channel, self._gain_channel_A)]
+        self._current_mode = self._modes[HX711._mode_index(
+            self._current_channel, self._gain_channel_A)]
+
+    def _mode_config(self, channel, gain_A):
+        """
+        _mode_config returns the record of specific channel and gain.
+
         Args:
-            channel(str):
-            gain_A(int):
-            data(int):
-        Returns: False if error occured
+            channel(str): ('A' || 'B' || '') '' is the current channel and gain
+            gain_A(int): (128 || 64) it is not needed for channel B
+
+        Raises:
+            ValueError: if channel is not ('A' || 'B' || '') or
+                gain_A is not (128 || 64) for channel A
+
+        Returns: _ModeConfig
         """
-        if channel == 'A' and gain_A == 128:
-            self._last_raw_data_A_128 = data
-        elif channel == 'A' and gain_A == 64:
-            self._last_raw_data_A_64 = data
-        elif channel == 'B':
-            self._last_raw_data_B = data
-        else:
-            return False
+        channel = channel.capitalize()
+        if channel == '':
+            return self._current_mode
+        index = HX711._mode_index(channel, gain_A)
+        if index < 0:
+            raise ValueError(
+                'Parameter "channel" has to be "A" or "B". '
+                'Received: {} \nParameter "gain_A" has to be 128 or 64. Received {}'
+                .format(channel, gain_A))
+        return self._modes[index]
 
     def _ready(self):
         """
-        _ready method check if data is prepared for reading from HX711
+        _ready method check if all chips have data prepared for reading
 
-        Returns: bool True if ready else False when not ready        
+        Returns: bool True if ready else False when not ready
         """
-        # if DOUT pin is low data is ready for reading
-        if GPIO.input(self._dout) == 0:
+        # if DOUT pins are low data is ready for reading
+        return not any(self._gpio.read_lines(self._dout_pins))
+
+    def _wait_ready(self):
+        """
+        _wait_ready method waits until all chips have data ready for
+        reading like HX711 without edge detection. It sleeps until
+        shortly before the expected end of conversion and then spins.
+
+        Returns: bool True if data is ready, False if it timed out.
+        """
+        if self._ready():
             return True
+        now = time.perf_counter()
+        deadline = now + self._ready_timeout
+        period = self._conversion_period
+        if period and self._last_ready_known:
+            # sleep until shortly before the next expected conversion
+            periods = (now - self._last_ready_time) // period + 1
+            delay = min(self._last_ready_time + periods * period,
+                        deadline) - self._spin_time - now
+            if delay > 0:
+                time.sleep(delay)
+                if self._ready():
+                    # the end of conversion was not seen, so the next
+                    # wait does not sleep like in HX711
+                    self._last_ready_known = False
+                    if time.perf_counter() < now + delay + self._spin_time:
+                        # it woke up on time so the period may be too long
+                        self._forget_longest_interval()
+                    return True
+        spin_end = time.perf_counter() + 2 * self._spin_time
+        while not self._ready():
+            now = time.perf_counter()
+            if now >= deadline:
+                return False
+            if now > spin_end:
+                time.sleep(self._spin_time)
+        # the chips share the clock so they convert at the same time
+        now = time.perf_counter()
+        interval = now - self._last_ready_time
+        if self._last_ready_known and interval < self._ready_timeout:
+            intervals = self._conversion_intervals
+            intervals.append(interval)
+            self._conversion_period = max(
+                sorted(intervals)[len(intervals) // 2],
+                HX711._MIN_CONVERSION_PERIOD)
+        self._last_ready_time = now
+        self._last_ready_known = True
+        return True
+
+    def _forget_longest_interval(self):
+        """
+        _forget_longest_interval removes the longest of the recent
+        intervals between conversions like in HX711.
+        """
+        intervals = self._conversion_intervals
+        if intervals:
+            intervals.remove(max(intervals))
+        if intervals:
+            self._conversion_period = max(
+                sorted(intervals)[len(intervals) // 2],
+                HX711._MIN_CONVERSION_PERIOD)
         else:
-            return False
+            self._conversion_period = 0.0
+
+    def _read(self):
+        """
+        _read method reads bits from all chips at once, converts them to INT
+        and validate the data. Timing violations are handled by
+        the recovery policy like in HX711.
+
+        Returns: [(bool || int)] for each chip False if it is false reading.
+            if it is int then the reading was correct
+        """
+        count = len(self._dout_pins)
+        policy = self._recovery_policy
+        retries = 0
+        while True:
+            self._gpio.set_clock(self._pd_sck, False)  # start by setting the pd_sck to 0
+            # nothing was read yet when the current channel is not known
+            mode = self._current_mode.index if self._current_channel else -1
+            start_counter = time.perf_counter()
+            if not self._wait_ready():
+                self._metrics.observe_timeout(mode)
+                if self._debug_mode:
+                    print('HX711Array._read() not ready after {} s\n'.format(
+                        self._ready_timeout))
+                return [False] * count
+            wait_time = time.perf_counter() - start_counter
 
-    def _set_channel_gain(self, num):
+            discard = self._discard_conversions > 0
+            if discard:
+                self._discard_conversions -= 1
+            violations = policy.violations
+            start_counter = time.perf_counter()
+            results = self._read_frame()
+            end_counter = time.perf_counter()
+            violation = policy.violations != violations
+            self._metrics.observe_frame(
+                mode, wait_time, end_counter - start_counter,
+                results is not False and
+                any(result is False for result in results), violation,
+                end_counter)
+            if discard:
+                # conversion after wake up is not settled
+                policy.discarded += 1
+            if violation and (results is False or discard):
+                # the frame was broken by slow clock pulse
+                if retries >= policy.max_retries:
+                    policy.failures += 1
+                    return [False] * count
+                policy.retries += 1
+                retries += 1
+                continue
+            if discard:
+                continue
+            # if there was violation only the gain pulses were slow
+            # and the data is ok
+            return results
+
+    def _read_frame(self):
         """
-        _set_channel_gain is called only from _read method.
-        It finishes the data transmission for HX711 which sets
-        the next required gain and channel.
+        _read_frame method clocks out one frame from all chips which
+        are ready for reading and sets the next channel and gain.
 
-        Args:
-            num(int): how many ones it sends to HX711
-                options (1 || 2 || 3)
-        
-        Returns: bool True if HX711 is ready for the next reading
-            False if HX711 is not ready for the next reading
+        Returns: (bool || [(bool || int)]) False if the frame was broken
+            by slow clock pulse. Otherwise for each chip False if
+            the data is invalid or int if the reading was correct
         """
-        for _ in range(num):
+        count = len(self._dout_pins)
+        set_clock = self._gpio.set_clock
+        read_lines = self._gpio.read_lines
+        pd_sck = self._pd_sck
+        dout_pins = self._dout_pins
+        data_in = [0] * count  # 2's complement data from each hx711
+        for _ in range(24):
             start_counter = time.perf_counter()
-            GPIO.output(self._pd_sck, True)
-            GPIO.output(self._pd_sck, False)
+            # request next bit from all chips
+            set_clock(pd_sck, True)
+            set_clock(pd_sck, False)
             end_counter = time.perf_counter()
-            # check if hx 711 did not turn off...
             if end_counter - start_counter >= 0.00006:
                 # if pd_sck pin is HIGH for 60 us and more than the HX 711 enters power down mode.
                 if self._debug_mode:
-                    print('Not enough fast while setting gain and channel')
+                    print('Not enough fast while reading data')
                     print(
                         'Time elapsed: {}'.format(end_counter - start_counter))
-                # hx711 has turned off. First few readings are inaccurate.
-                # Despite it, this reading was ok and data can be used.
-                result = self.get_raw_data_mean(6)  # set for the next reading.
-                if result == False:
-                    return False
-        return True
-
-    def _read(self):
-        """
-        _read method reads bits from hx711, converts to INT
-        and validate the data.
-        
-        Returns: (bool || int) if it returns False then it is false reading.
-            if it returns int then the reading was correct
-        """
-        GPIO.output(self._pd_sck, False)  # start by setting the pd_sck to 0
-        ready_counter = 0
-        while (not self._ready() and ready_counter <= 40):
-            time.sleep(0.01)  # sleep for 10 ms because data is not ready
-            ready_counter += 1
-            if ready_counter == 50:  # if counter reached max value then return False
-                if self._debug_mode:
-                    print('self._read() not ready after 40 trials\n')
+                self._timing_violation()
+                self._abort_frame()
                 return False
+            levels = read_lines(dout_pins)
+            for index in range(count):
+                data_in[index] = (data_in[index] << 1) | levels[index]
 
-        # read first 24 bits of data
-        data_in = 0  # 2's complement data from hx 711
-        for _ in range(24):
+        mode = self._wanted_mode
+        for _ in range(mode.pulses):
             start_counter = time.perf_counter()
-            # request next bit from hx 711
-            GPIO.output(self._pd_sck, True)
-            GPIO.output(self._pd_sck, False)
+            set_clock(pd_sck, True)
+            set_clock(pd_sck, False)
             end_counter = time.perf_counter()
-            if end_counter - start_counter >= 0.00006:  # check if the hx 711 did not turn off...
-                # if pd_sck pin is HIGH for 60 us and more than the HX 711 enters power down mode.
+            if end_counter - start_counter >= 0.00006:
                 if self._debug_mode:
-                    print('Not enough fast while reading data')
+                    print('Not enough fast while setting gain and channel')
                     print(
                         'Time elapsed: {}'.format(end_counter - start_counter))
-                return False
-            # Shift the bits as they come to data_in variable.
-            # Left shift by one bit then bitwise OR with the new bit.
-            data_in = (data_in << 1) | GPIO.input(self._dout)
+                # hx711 chips have turned off. The data is still ok.
+                self._timing_violation()
+                self._abort_frame()
+                break
+        self._current_mode = mode
+        self._current_channel = mode.channel
 
-        if self._wanted_channel == 'A' and self._gain_channel_A == 128:
-            if not self._set_channel_gain(1):  # send only one bit which is 1
-                return False  # return False because channel was not set properly
-            else:
-                self._current_channel = 'A'  # else set current channel variable
-                self._gain_channel_A = 128  # and gain
-        elif self._wanted_channel == 'A' and self._gain_channel_A == 64:
-            if not self._set_channel_gain(3):  # send three ones
-                return False  # return False because channel was not set properly
-            else:
-                self._current_channel = 'A'  # else set current channel variable
-                self._gain_channel_A = 64
-        else:
-            if not self._set_channel_gain(2):  # send two ones
-                return False  # return False because channel was not set properly
+        results = []
+        for value in data_in:
+            # 0x7fffff and 0x800000 are the highest and the lowest values
+            if value == 0x7fffff or value == 0x800000:
+                results.append(False)
+            elif value & 0x800000:
+                results.append(-((value ^ 0xffffff) + 1))
             else:
-                self._current_channel = 'B'  # else set current channel variable
+                results.append(value)
+        if self._debug_mode:
+            print('HX711Array frame: {}'.format(results))
+        return results
 
-        if self._debug_mode:  # print 2's complement value
-            print('Binary value as received: {}'.format(bin(data_in)))
+    def _timing_violation(self):
+        """
+        _timing_violation counts the violation and schedules the discard
+        of conversions after the chips wake up from power down mode.
+        """
+        self._recovery_policy.violations += 1
+        self._discard_conversions = self._recovery_policy.wakeup_discard
 
-        #check if data is valid
-        if (data_in == 0x7fffff
-                or  # 0x7fffff is the highest possible value from hx711
-                data_in == 0x800000
-           ):  # 0x800000 is the lowest possible value from hx711
-            if self._debug_mode:
-                print('Invalid data detected: {}\n'.format(data_in))
-            return False  # rturn false because the data is invalid
-
-        # calculate int from 2's complement
-        signed_data = 0
-        # 0b1000 0000 0000 0000 0000 0000 check if the sign bit is 1. Negative number.
-        if (data_in & 0x800000):
-            signed_data = -(
-                (data_in ^ 0xffffff) + 1)  # convert from 2's complement to int
-        else:  # else do not do anything the value is positive number
-            signed_data = data_in
+    def _abort_frame(self):
+        """
+        _abort_frame powers down the chips after a timing violation
+        like in HX711, so all of them start again with channel A gain 128.
+        """
+        self._gpio.set_clock(self._pd_sck, True)
+        time.sleep(0.0001)
+        self._gpio.set_clock(self._pd_sck, False)
 
-        if self._debug_mode:
-            print('Converted 2\'s complement value: {}'.format(signed_data))
 
-        return signed_data
+class ScaleFarm:
+    """
+    ScaleFarm runs one worker process per hx711 so many scales can be
+    read on time on all CPU cores. Workers publish timestamped readings
+    into a shared memory table which is read by the parent process
+    without copying. ScaleFarm restarts workers which died or stopped
+    sending heartbeats.
+    """
 
-    def get_raw_data_mean(self, readings=30):
+    # columns of one row in the shared memory table. All are float64.
+    SEQUENCE = 0  # even when the row is consistent, odd while it is written
+    TIMESTAMP = 1  # time.time() of the reading
+    RAW = 2  # raw data of the reading
+    WEIGHT = 3  # weight of the reading
+    HEARTBEAT = 4  # time.time() of the last loop of the worker
+    CONVERSIONS = 5  # number of conversions read by the worker
+    INVALID = 6  # number of invalid conversions
+    _COLUMNS = 8
+
+    def __init__(self, factories, cpus=None, stale_timeout=5.0,
+                 check_interval=1.0, restart_backoff=1.0,
+                 max_restart_backoff=60.0, start_method=None):
         """
-        get_raw_data_mean returns mean value of readings.
+        Init a new instance of ScaleFarm
 
         Args:
-            readings(int): Number of readings for mean.
+            factories([function]): functions without arguments which create
+                HX711 inside the worker process. They have to be picklable
+                (module level functions or functools.partial of them).
+            cpus([int]): Optional, CPU core for each worker. By default workers
+                are spread over available cores.
+            stale_timeout(float): Optional, by default 5.0 s. Worker without
+                heartbeat for this time is restarted.
+            check_interval(float): Optional, by default 1.0 s. How often
+                the health of workers is checked.
+            restart_backoff(float): Optional, by default 1.0 s. A failed
+                worker is restarted at once, when it fails again the wait
+                before the restart starts at this time and doubles
+                with each failure in a row.
+            max_restart_backoff(float): Optional, by default 60.0 s.
+                The longest wait before a restart.
+            start_method(str): Optional, by default 'forkserver' if it is
+                available else 'spawn'. Workers are not forked from
+                the parent, which can hold GPIO, locks and threads.
 
-        Returns: (bool || int) if False then reading is invalid.
-            if it returns int then reading is valid
+        Raises:
+            ValueError: if factories is empty or cpus has different length
         """
-        # do backup of current channel befor reading for later use
-        backup_channel = self._current_channel
-        backup_gain = self._gain_channel_A
-        data_list = []
-        # do required number of readings
-        for _ in range(readings):
-            data_list.append(self._read())
-        data_mean = False
-        if readings > 2 and self._data_filter:
-            filtered_data = self._data_filter(data_list)
-            if not filtered_data:
-                return False
-            if self._debug_mode:
-                print('data_list: {}'.format(data_list))
-                print('filtered_data list: {}'.format(filtered_data))
-                print('data_mean:', stat.mean(filtered_data))
-            data_mean = stat.mean(filtered_data)
-        else:
-            data_mean = stat.mean(data_list)
-        self._save_last_raw_data(backup_channel, backup_gain, data_mean)
-        return int(data_mean)
+        self._factories = list(factories)
+        if not self._factories:
+            raise ValueError('Parameter "factories" must not be empty.')
+        if cpus is None:
+            cores = sorted(os.sched_getaffinity(0)) if hasattr(
+                os, 'sched_getaffinity') else list(range(os.cpu_count() or 1))
+            cpus = [cores[i % len(cores)] for i in range(len(self._factories))]
+        elif len(cpus) != len(self._factories):
+            raise ValueError('Parameter "cpus" must have the same length as '
+                             'factories. Received: {}'.format(cpus))
+        self._cpus = list(cpus)
+        self._stale_timeout = stale_timeout
+        self._check_interval = check_interval
+        self._restart_backoff = restart_backoff
+        self._max_restart_backoff = max_restart_backoff
+        if start_method is None:
+            start_method = ('forkserver' if 'forkserver' in
+                            multiprocessing.get_all_start_methods() else
+                            'spawn')
+        self._context = multiprocessing.get_context(start_method)
+        self._shared_memory = None
+        self._table = None
+        self._stop_event = None
+        self._processes = [None] * len(self._factories)
+        self._restarts = [0] * len(self._factories)
+        self._started_at = [0.0] * len(self._factories)
+        self._failures = [0] * len(self._factories)  # failures in a row
+        self._next_restart = [0.0] * len(self._factories)
+        self._monitor_thread = None
+        self._monitor_stop = threading.Event()
 
-    def get_data_mean(self, readings=30):
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def __len__(self):
+        return len(self._factories)
+
+    @property
+    def table(self):
         """
-        get_data_mean returns average value of readings minus
-        offset for the channel which was read.
+        table returns the shared memory table as memoryview of float64
+        with shape (workers, 8). Index it by [worker, column] with
+        the column constants of ScaleFarm. None if farm is not started.
+        """
+        return self._table
 
-        Args:
-            readings(int): Number of readings for mean
+    def start(self):
+        """
+        start method creates the shared memory table, starts
+        the workers and the thread which checks their health.
+        """
+        from multiprocessing import shared_memory
+        size = len(self._factories) * self._COLUMNS * 8
+        self._shared_memory = shared_memory.SharedMemory(create=True,
+                                                         size=size)
+        flat = self._shared_memory.buf.cast('d')
+        for i in range(len(flat)):
+            flat[i] = 0.0
+        flat.release()
+        self._table = self._shared_memory.buf.cast(
+            'd', (len(self._factories), self._COLUMNS))
+        self._stop_event = self._context.Event()
+        self._failures = [0] * len(self._factories)
+        self._next_restart = [0.0] * len(self._factories)
+        for index in range(len(self._factories)):
+            self._start_worker(index)
+        self._monitor_stop.clear()
+        self._monitor_thread = threading.Thread(target=self._monitor_loop,
+                                                name='hx711-scale-farm',
+                                                daemon=True)
+        self._monitor_thread.start()
 
-        Returns: (bool || int) False if reading was not ok.
-            If it returns int then reading was ok
+    def stop(self, timeout=2.0):
         """
-        result = self.get_raw_data_mean(readings)
-        if result != False:
-            if self._current_channel == 'A' and self._gain_channel_A == 128:
-                return result - self._offset_A_128
-            elif self._current_channel == 'A' and self._gain_channel_A == 64:
-                return result - self._offset_A_64
-            else:
-                return result - self._offset_B
-        else:
-            return False
+        stop method stops the workers and releases the shared memory.
 
-    def get_weight_mean(self, readings=30):
+        Args:
+            timeout(float): Optional, by default 2.0 s. How long it waits
+                for each worker before it is terminated.
         """
-        get_weight_mean returns average value of readings minus
-        offset divided by scale ratio for a specific channel
-        and gain.
+        if self._shared_memory is None:
+            return
+        self._monitor_stop.set()
+        if self._monitor_thread is not None:
+            self._monitor_thread.join()
+            self._monitor_thread = None
+        self._stop_event.set()
+        for process in self._processes:
+            if process is not None:
+                process.join(timeout)
+                if process.is_alive():
+                    process.terminate()
+                    process.join()
+        self._processes = [None] * len(self._factories)
+        self._table.release()
+        self._table = None
+        self._shared_memory.close()
+        self._shared_memory.unlink()
+        self._shared_memory = None
+
+    def get_reading(self, index, timeout=0.01):
+        """
+        get_reading returns the latest reading of one worker.
 
         Args:
-            readings(int): Number of readings for mean
+            index(int): index of the worker
+            timeout(float): Optional, by default 0.01 s. How long it waits
+                for the worker to finish writing the row. A worker which
+                died while writing leaves the row inconsistent until
+                it is restarted.
 
-        Returns: (bool || float) False if reading was not ok.
-            If it returns float then reading was ok
+        Returns: (None || (float, float, float, int)) timestamp, raw data,
+            weight and sequence number. Sequence number 0 means no reading
+            yet. None if the row was not consistent within the timeout
+            or farm is not started.
         """
-        result = self.get_raw_data_mean(readings)
-        if result != False:
-            if self._current_channel == 'A' and self._gain_channel_A == 128:
-                return float(
-                    (result - self._offset_A_128) / self._scale_ratio_A_128)
-            elif self._current_channel == 'A' and self._gain_channel_A == 64:
-                return float(
-                    (result - self._offset_A_64) / self._scale_ratio_A_64)
-            else:
-                return float((result - self._offset_B) / self._scale_ratio_B)
-        else:
-            return False
+        table = self._table
+        if table is None:
+            return None
+        deadline = None
+        while True:
+            sequence = table[index, self.SEQUENCE]
+            # sequence is odd while the worker is writing the row
+            if not int(sequence) & 1:
+                timestamp = table[index, self.TIMESTAMP]
+                raw = table[index, self.RAW]
+                weight = table[index, self.WEIGHT]
+                if table[index, self.SEQUENCE] == sequence:
+                    return timestamp, raw, weight, int(sequence) // 2
+            now = time.perf_counter()
+            if deadline is None:
+                deadline = now + timeout
+            elif now >= deadline:
+                return None
 
-    def get_current_channel(self):
+    def get_readings(self, timeout=0.01):
         """
-        get current channel returns the value of current channel.
+        get_readings returns the latest readings of all workers.
 
-        Returns: ('A' || 'B')
+        Args:
+            timeout(float): Optional, by default 0.01 s. See get_reading
+
+        Returns: [(None || (float, float, float, int))] see get_reading
         """
-        return self._current_channel
+        return [
+            self.get_reading(index, timeout) for index in range(len(self))
+        ]
 
-    def get_data_filter(self):
+    def get_status(self):
         """
-        get data filter.
+        get_status returns health of all workers.
 
-        Returns: self._data_filter
+        Returns: [dict] for each worker pid, alive, cpu, restarts,
+            heartbeat_age in seconds, conversions and invalid conversions.
+            Empty list if farm is not started.
         """
-        return self._data_filter
+        if self._table is None:
+            return []
+        now = time.time()
+        status = []
+        for index, process in enumerate(self._processes):
+            heartbeat = self._table[index, self.HEARTBEAT]
+            status.append({
+                'pid': process.pid if process is not None else None,
+                'alive': process is not None and process.is_alive(),
+                'cpu': self._cpus[index],
+                'restarts': self._restarts[index],
+                'heartbeat_age': now - heartbeat if heartbeat else None,
+                'conversions': int(self._table[index, self.CONVERSIONS]),
+                'invalid': int(self._table[index, self.INVALID]),
+            })
+        return status
 
-    def get_current_gain_A(self):
+    def check_workers(self):
         """
-        get current gain A returns the value of current gain on channel A
+        check_workers restarts workers which are dead or which did
+        not send heartbeat for longer than stale_timeout. A worker which
+        fails again is restarted after the restart backoff.
 
-        Returns: (128 || 64) current gain on channel A
+        Returns: [int] indexes of restarted workers. Empty list
+            if farm is not started.
         """
-        return self._gain_channel_A
+        if self._table is None:
+            return []
+        now = time.time()
+        restarted = []
+        for index, process in enumerate(self._processes):
+            if process is not None:
+                heartbeat = self._table[index, self.HEARTBEAT]
+                started_at = self._started_at[index]
+                last_sign = max(heartbeat, started_at)
+                if process.is_alive() and now - last_sign < self._stale_timeout:
+                    if heartbeat - started_at >= self._stale_timeout:
+                        # it has been running well so it is not failing
+                        self._failures[index] = 0
+                    continue
+                if process.is_alive():
+                    process.terminate()
+                process.join()
+                self._processes[index] = None
+                self._failures[index] += 1
+                self._next_restart[index] = now + self._backoff(
+                    self._failures[index])
+            if now < self._next_restart[index]:
+                continue  # waits for the backoff
+            self._restarts[index] += 1
+            self._start_worker(index)
+            restarted.append(index)
+        return restarted
 
-    def get_last_raw_data(self, channel='', gain_A=0):
+    def _backoff(self, failures):
         """
-        get last raw data returns the last read data for a
-        channel and gain. By default for current one.
+        _backoff returns how long a worker waits before it is restarted.
+        The first failure is restarted at once.
 
         Args:
-            channel(str): select channel ('A' || 'B'). If not then it returns the current one.
-            gain_A(int): select gain (128 || 64). If not then it returns the current one.
-        
-        Raises:
-            ValueError: if channel is not ('A' || 'B' || '') or gain_A is not (128 || 64 || 0)
-                '' and 0 is default value.
+            failures(int): failures of the worker in a row
 
-        Returns: int the last data that was received for the chosen channel and gain
+        Returns: float seconds
         """
-        channel = channel.capitalize()
-        if channel == 'A' and gain_A == 128:
-            return self._last_raw_data_A_128
-        elif channel == 'A' and gain_A == 64:
-            return self._last_raw_data_A_64
-        elif channel == 'B':
-            return self._last_raw_data_B
-        elif channel == '':
-            if self._current_channel == 'A' and self._gain_channel_A == 128:
-                return self._last_raw_data_A_128
-            elif self._current_channel == 'A' and self._gain_channel_A == 64:
-                return self._last_raw_data_A_64
+        if failures < 2:
+            return 0.0
+        return min(self._restart_backoff * 2**min(failures - 2, 30),
+                   self._max_restart_backoff)
+
+    def _start_worker(self, index):
+        """
+        _start_worker starts worker process for index.
+        """
+        self._started_at[index] = time.time()
+        process = self._context.Process(
+            target=_scale_farm_worker,
+            args=(self._shared_memory.name, index, self._factories[index],
+                  self._cpus[index], self._stop_event),
+            name='hx711-worker-{}'.format(index),
+            daemon=True)
+        process.start()
+        self._processes[index] = process
+
+    def _monitor_loop(self):
+        """
+        _monitor_loop checks the health of workers until farm stops.
+        """
+        while not self._monitor_stop.wait(self._check_interval):
+            self.check_workers()
+
+
+def _scale_farm_worker(shm_name, index, factory, cpu, stop_event):
+    """
+    _scale_farm_worker runs in the worker process of ScaleFarm. It reads
+    hx711 continuously and writes each conversion to its row
+    of the shared memory table.
+    """
+    from multiprocessing import shared_memory
+    if hasattr(os, 'sched_setaffinity'):
+        try:
+            os.sched_setaffinity(0, {cpu})
+        except OSError:
+            pass  # keep running on any core
+    shm = shared_memory.SharedMemory(name=shm_name)
+    table = shm.buf.cast('d')
+    row = index * ScaleFarm._COLUMNS  # start of the row in the table
+    try:
+        table[row + ScaleFarm.HEARTBEAT] = time.time()
+        hx = factory()
+        sequence = int(table[row + ScaleFarm.SEQUENCE]) & ~1
+        conversions = int(table[row + ScaleFarm.CONVERSIONS])
+        invalid = int(table[row + ScaleFarm.INVALID])
+        for channel, gain_A, weight in hx.stream_channels():
+            now = time.time()
+            conversions += 1
+            if weight is False:
+                invalid += 1
             else:
-                return self._last_raw_data_B
-        else:
-            raise ValueError(
-                'Parameter "channel" has to be "A" or "B". '
-                'Received: {} \nParameter "gain_A" has to be 128 or 64. Received {}'
-                .format(channel, gain_A))
+                # sequence is odd while the row is being written
+                table[row + ScaleFarm.SEQUENCE] = sequence + 1
+                table[row + ScaleFarm.TIMESTAMP] = now
+                # by schedule the current channel can be the next one
+                table[row + ScaleFarm.RAW] = hx.get_last_raw_data(
+                    channel, gain_A)
+                table[row + ScaleFarm.WEIGHT] = weight
+                sequence += 2
+                table[row + ScaleFarm.SEQUENCE] = sequence
+            table[row + ScaleFarm.CONVERSIONS] = conversions
+            table[row + ScaleFarm.INVALID] = invalid
+            table[row + ScaleFarm.HEARTBEAT] = now
+            if stop_event.is_set():
+                break
+    finally:
+        table.release()
+        shm.close()
 
-    def get_current_offset(self, channel='', gain_A=0):
+
+class AsyncHX711:
+    """
+    AsyncHX711 is an asyncio interface for HX711. It waits for data ready
+    without blocking the event loop, therefore many scales can be read
+    from one event loop with asyncio.gather. The HX711 instance does
+    the actual communication with the chip.
+    """
+
+    def __init__(self, hx, poll_interval=0.001, ready_timeout=0.5):
         """
-        get current offset returns the current offset for
-        a particular channel and gain. By default the current one.
+        Init a new instance of AsyncHX711
 
         Args:
-            channel(str): select for which channel ('A' || 'B')
-            gain_A(int): select for which gain (128 || 64)
-        
+            hx(HX711): instance of HX711 which is used for reading.
+            poll_interval(float): Optional, by default 0.001 s. How long it
+                waits between checks if data is ready.
+            ready_timeout(float): Optional, by default 0.5 s. How long it
+                waits for data ready before the reading is invalid.
+
         Raises:
-            ValueError: if channel is not ('A' || 'B' || '') or gain_A is not (128 || 64 || 0)
-                '' and 0 is default value.
+            TypeError: if hx is not HX711 type
+            ValueError: if poll_interval or ready_timeout is not bigger than 0
+        """
+        if not isinstance(hx, HX711):
+            raise TypeError('Parameter "hx" must be type HX711. '
+                            'Received: {}'.format(hx))
+        if poll_interval <= 0 or ready_timeout <= 0:
+            raise ValueError('Parameters "poll_interval" and "ready_timeout" '
+                             'have to be bigger than 0. Received: {}, {}'.format(
+                                 poll_interval, ready_timeout))
+        self._hx = hx
+        self._poll_interval = poll_interval
+        self._ready_timeout = ready_timeout
 
-        Returns: int the offset for the chosen channel and gain
+    @property
+    def hx(self):
         """
-        channel = channel.capitalize()
-        if channel == 'A' and gain_A == 128:
-            return self._offset_A_128
-        elif channel == 'A' and gain_A == 64:
-            return self._offset_A_64
-        elif channel == 'B':
-            return self._offset_B
-        elif channel == '':
-            if self._current_channel == 'A' and self._gain_channel_A == 128:
-                return self._offset_A_128
-            elif self._current_channel == 'A' and self._gain_channel_A == 64:
-                return self._offset_A_64
-            else:
-                return self._offset_B
-        else:
-            raise ValueError(
-                'Parameter "channel" has to be "A" or "B". '
-                'Received: {} \nParameter "gain_A" has to be 128 or 64. Received {}'
-                .format(channel, gain_A))
+        hx returns the HX711 instance used for reading.
+        """
+        return self._hx
 
-    def get_current_scale_ratio(self, channel='', gain_A=0):
+    async def read(self):
         """
-        get current scale ratio returns the current scale ratio
-        for a particular channel and gain. By default
-        the current one.
+        read waits for data ready without blocking the event loop
+        and then reads one conversion from hx711.
 
-        Args:
-            channel(str): select for which channel ('A' || 'B')
-            gain_A(int): select for which gain (128 || 64)
+        Returns: (bool || int) if it returns False then it is false reading.
+            if it returns int then the reading was correct
+        """
+        return (await self.read_channel())[2]
 
-        Returns: int the scale ratio for the chosen channel and gain
+    async def read_channel(self):
         """
-        channel = channel.capitalize()
-        if channel == 'A' and gain_A == 128:
-            return self._scale_ratio_A_128
-        elif channel == 'A' and gain_A == 64:
-            return self._scale_ratio_A_64
-        elif channel == 'B':
-            return self._scale_ratio_B
-        elif channel == '':
-            if self._current_channel == 'A' and self._gain_channel_A == 128:
-                return self._scale_ratio_A_128
-            elif self._current_channel == 'A' and self._gain_channel_A == 64:
-                return self._scale_ratio_A_64
-            else:
-                return self._scale_ratio_B
-        else:
-            raise ValueError(
-                'Parameter "channel" has to be "A" or "B". '
-                'Received: {} \nParameter "gain_A" has to be 128 or 64. Received {}'
-                .format(channel, gain_A))
+        read_channel is like read but it returns also the channel and gain
+        which was read. The frame is read by HX711.read_channel in
+        the default executor, so the event loop never holds
+        the read lock of HX711. If data is not ready in ready_timeout
+        the reading is still left to HX711, which waits its own
+        ready timeout and counts it in the metrics.
 
-    def power_down(self):
+        Returns: (str, int, bool || int) channel, gain (0 for channel B)
+            and False if the reading is invalid or int raw data
         """
-        power down method turns off the hx711.
+        hx = self._hx
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self._ready_timeout
+        while not hx.is_ready() and loop.time() < deadline:
+            await asyncio.sleep(self._poll_interval)
+        return await loop.run_in_executor(None, hx.read_channel)
+
+    async def get_raw_data_mean(self, readings=30):
         """
-        GPIO.output(self._pd_sck, False)
-        GPIO.output(self._pd_sck, True)
-        time.sleep(0.01)
+        get_raw_data_mean returns mean value of readings of the channel
+        and gain which is current before reading. When schedule is active
+        the readings of other channels and gains are left out like in
+        HX711.get_raw_data_mean.
 
-    def power_up(self):
+        Args:
+            readings(int): Number of readings for mean.
+
+        Returns: (bool || int) if False then reading is invalid.
+            if it returns int then reading is valid
         """
-        power up function turns on the hx711.
+        channel, gain_A = self._current_mode()
+        return await self._raw_data_mean(readings, channel, gain_A)
+
+    async def get_data_mean(self, readings=30):
         """
-        GPIO.output(self._pd_sck, False)
-        time.sleep(0.01)
+        get_data_mean returns average value of readings minus
+        offset for the channel and gain which is current before reading.
 
-    def reset(self):
+        Args:
+            readings(int): Number of readings for mean
+
+        Returns: (bool || int) False if reading was not ok.
+            If it returns int then reading was ok
         """
-        reset method resets the hx711 and prepare it for the next reading.
+        channel, gain_A = self._current_mode()
+        result = await self._raw_data_mean(readings, channel, gain_A)
+        if result != False:
+            return result - self._hx.get_current_offset(channel, gain_A)
+        else:
+            return False
 
-        Returns: True if error encountered
+    async def get_weight_mean(self, readings=30):
         """
-        self.power_down()
-        self.power_up()
-        result = self.get_raw_data_mean(6)
-        if result:
+        get_weight_mean returns average value of readings minus
+        offset divided by scale ratio for the channel and gain which is
+        current before reading. If calibration is set for them,
+        it converts the data instead of scale ratio.
+
+        Args:
+            readings(int): Number of readings for mean
+
+        Returns: (bool || float) False if reading was not ok.
+            If it returns float then reading was ok
+        """
+        hx = self._hx
+        channel, gain_A = self._current_mode()
+        result = await self._raw_data_mean(readings, channel, gain_A)
+        if result == False:
             return False
-        else:
-            return True
+        data = result - hx.get_current_offset(channel, gain_A)
+        calibration = hx.get_calibration(channel, gain_A)
+        if calibration is not None:
+            return float(calibration.convert(data))
+        return float(data / hx.get_current_scale_ratio(channel, gain_A))
 
+    def _current_mode(self):
+        """
+        _current_mode returns the current channel and gain of hx711.
+        Gain is 0 for channel B like in HX711.get_schedule.
 
-    def outliers_filter(self, data_list, stdev_thresh = 1.0):
+        Returns: (str, int) channel and gain
         """
-        It filters out outliers from the provided list of int.
-        Median is used as an estimator of outliers.
-        Outliers are compared to the standard deviation from the median
-        Default filter is of 1.0 standard deviation from the median
+        channel = self._hx.get_current_channel()
+        if channel == 'B':
+            return channel, 0
+        return channel, self._hx.get_current_gain_A()
 
-        Args:
-            data_list([int]): List of int. It can contain Bool False that is removed.
-        
-        Returns: list of filtered data. Excluding outliers.
+    async def _raw_data_mean(self, readings, channel, gain_A):
         """
-        # filter out -1 which indicates no signal
-        # filter out booleans
-        data = [num for num in data_list if (num != -1 and num != False and num != True)] 
-        if not data:
-            return []
+        _raw_data_mean reads the readings of one channel and gain
+        and returns their mean. It stops when the channel and gain
+        was not read in readings cycles of the schedule.
 
-        median = stat.median(data)
-        dists_from_median = [(abs(measurement - median)) for measurement in data]
-        stdev = stat.stdev(dists_from_median)
-        if stdev:
-            ratios_to_stdev = [(dist / stdev) for dist in dists_from_median]
-        else:
-            # stdev is 0. Therefore return just the median
-            return [median]
-        filtered_data = []
-        for i in range(len(data)):
-            if ratios_to_stdev[i] < stdev_thresh:
-                filtered_data.append(data[i])
-        return filtered_data
+        Returns: (bool || int) if False then reading is invalid.
+            if it returns int then reading is valid
+        """
+        hx = self._hx
+        schedule = hx.get_schedule()
+        reads = readings * max(len(schedule), 1)
+        data_list = []
+        while len(data_list) < readings and reads > 0:
+            reads -= 1
+            read_channel, read_gain, result = await self.read_channel()
+            if not schedule or (read_channel, read_gain) == (channel, gain_A):
+                data_list.append(result)
+        return hx.get_readings_mean(data_list, channel, gain_A)
+
+
+def outliers_filter(data_list, stdev_thresh=1.0):
+    """
+    It filters out outliers from the provided list of int.
+    Median is used as an estimator of outliers.
+    Outliers are compared to the standard deviation from the median
+    Default filter is of 1.0 standard deviation from the median
+
+    Args:
+        data_list([int]): List of int. It can contain Bool False that is removed.
+    
+    Returns: list of filtered data. Excluding outliers.
+    """
+    # filter out -1 which indicates no signal
+    # filter out booleans
+    data = [num for num in data_list if (num != -1 and num != False and num != True)] 
+    if len(data) < 2:
+        # stdev requires at least two readings
+        return data
+
+    median = stat.median(data)
+    dists_from_median = [(abs(measurement - median)) for measurement in data]
+    stdev = stat.stdev(dists_from_median)
+    if stdev:
+        ratios_to_stdev = [(dist / stdev) for dist in dists_from_median]
+    else:
+        # stdev is 0. Therefore return just the median
+        return [median]
+    filtered_data = []
+    for i in range(len(data)):
+        if ratios_to_stdev[i] < stdev_thresh:
+            filtered_data.append(data[i])
+    return filtered_data
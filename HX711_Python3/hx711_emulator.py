@@ -0,0 +1,266 @@
+"""
+This file holds software emulator of HX711 which works as RPi.GPIO module
+"""
+#!/usr/bin/env python3
+
+import random
+import sys
+import time
+import types
+
+from hx711 import FakeGPIOBackend
+
+# constants of RPi.GPIO
+BOARD = 10
+BCM = 11
+OUT = 0
+IN = 1
+LOW = 0
+HIGH = 1
+PUD_OFF = 20
+PUD_DOWN = 21
+PUD_UP = 22
+RISING = 31
+FALLING = 32
+BOTH = 33
+
+_mode = None
+_backend = FakeGPIOBackend()  # simulates the chips on the pins
+_outputs = {}  # pin: level of output pin
+_chips = {}  # dout pin: EmulatedHX711
+
+
+class EmulatedHX711:
+    """
+    EmulatedHX711 is hx711 connected to the emulated GPIO pins.
+    The chip itself (timing of conversions, bits, gain pulses and
+    power down) is simulated by FakeGPIOBackend. EmulatedHX711 gives
+    it the values of conversions with noise and glitches. After start
+    and power down the output settles for 4 conversions.
+    """
+
+    SETTLING_CONVERSIONS = 4
+
+    def __init__(self,
+                 dout_pin,
+                 pd_sck_pin,
+                 data_rate=10,
+                 value_A=100000,
+                 value_B=5000,
+                 noise=0.0,
+                 glitch_rate=0.0,
+                 seed=None):
+        """
+        Init a new instance of EmulatedHX711
+
+        Args:
+            dout_pin(int): pin where the Data pin is connected.
+            pd_sck_pin(int): pin where the Clock pin is connected.
+            data_rate(int): Optional, by default 10. Options (10 || 80)
+            value_A(int || function): Optional, by default 100000. Raw value
+                of channel A at gain 128, at gain 64 it is half. It can be
+                function without arguments which returns the value.
+            value_B(int || function): Optional, by default 5000. Raw value
+                of channel B (gain 32).
+            noise(float): Optional, by default 0.0. Standard deviation
+                of gaussian noise added to each conversion.
+            glitch_rate(float): Optional, by default 0.0. Probability that
+                a conversion is a glitch, either a spike or full scale value
+                0x7fffff or 0x800000 which hx711 returns as invalid.
+            seed(int): Optional, seed of random noise and glitches.
+
+        Raises:
+            ValueError: if data_rate is not 10 or 80
+        """
+        if data_rate not in (10, 80):
+            raise ValueError('Parameter "data_rate" has to be 10 or 80. '
+                             'Received: {}'.format(data_rate))
+        self.dout_pin = dout_pin
+        self.pd_sck_pin = pd_sck_pin
+        self.value_A = value_A
+        self.value_B = value_B
+        self.noise = noise
+        self.glitch_rate = glitch_rate
+        self._random = random.Random(seed)
+        self._state = _backend.add_chip(
+            dout_pin,
+            pd_sck_pin,
+            source=self._conversion,
+            data_rate=data_rate,
+            settling_conversions=self.SETTLING_CONVERSIONS)
+
+    @property
+    def channel(self):
+        """
+        channel of the last conversion ('A' || 'B')
+        """
+        return self._state['channel']
+
+    @property
+    def gain_A(self):
+        """
+        gain_A of channel A in the last conversion (128 || 64)
+        """
+        return self._state['gain_A']
+
+    @property
+    def power_downs(self):
+        """
+        power_downs is how many times the chip was powered down
+        """
+        return self._state['power_downs']
+
+    def time_to_ready(self):
+        """
+        time_to_ready returns seconds until the next conversion
+        is finished.
+        """
+        return max(0.0, self._state['next_ready'] - time.perf_counter())
+
+    def _conversion(self, channel, gain_A):
+        """
+        _conversion returns the raw value of the next conversion.
+        """
+        if channel == 'B':
+            value = self.value_B
+        else:
+            value = self.value_A
+        if callable(value):
+            value = value()
+        if channel == 'A' and gain_A == 64:
+            value = value / 2
+        if self.noise:
+            value += self._random.gauss(0.0, self.noise)
+        if self.glitch_rate and self._random.random() < self.glitch_rate:
+            glitch = self._random.choice(('spike', 'high', 'low'))
+            if glitch == 'high':
+                return 0x7fffff
+            elif glitch == 'low':
+                return -0x800000
+            value += self._random.choice((-1, 1)) * self._random.randint(
+                10000, 1000000)
+        return int(value)
+
+
+def add_chip(dout_pin, pd_sck_pin, **kwargs):
+    """
+    add_chip connects emulated hx711 to the pins. Chips can share
+    the PD_SCK pin. Keyword arguments are passed to EmulatedHX711.
+
+    Args:
+        dout_pin(int): pin where the Data pin is connected.
+        pd_sck_pin(int): pin where the Clock pin is connected.
+
+    Returns: EmulatedHX711 the emulated chip
+    """
+    chip = EmulatedHX711(dout_pin, pd_sck_pin, **kwargs)
+    _chips[dout_pin] = chip
+    return chip
+
+
+def remove_chips():
+    """
+    remove_chips disconnects all emulated chips and resets the pins.
+    """
+    global _mode, _backend
+    _mode = None
+    _backend = FakeGPIOBackend()
+    _outputs.clear()
+    _chips.clear()
+
+
+def install():
+    """
+    install registers this module as RPi.GPIO, so code which imports
+    RPi.GPIO afterwards uses the emulator. If hx711 is already imported
+    its GPIO is replaced as well.
+    """
+    module = sys.modules[__name__]
+    rpi = types.ModuleType('RPi')
+    rpi.GPIO = module
+    sys.modules['RPi'] = rpi
+    sys.modules['RPi.GPIO'] = module
+    hx711 = sys.modules.get('hx711')
+    if hx711 is not None:
+        hx711.GPIO = module
+
+
+def _channels(channel):
+    """
+    _channels returns list of pins, RPi.GPIO accepts int or list.
+    """
+    if isinstance(channel, (list, tuple)):
+        return list(channel)
+    return [channel]
+
+
+# functions of RPi.GPIO
+
+
+def setmode(mode):
+    global _mode
+    _mode = mode
+
+
+def getmode():
+    return _mode
+
+
+def setwarnings(flag):
+    pass
+
+
+def setup(channel, direction, pull_up_down=PUD_OFF, initial=None):
+    if _mode is None:
+        raise RuntimeError('Please set pin numbering mode using '
+                           'GPIO.setmode(GPIO.BOARD) or GPIO.setmode(GPIO.BCM)')
+    for pin in _channels(channel):
+        if direction == OUT:
+            _outputs[pin] = False
+            if initial:
+                output(pin, initial)
+
+
+def output(channel, state):
+    for pin in _channels(channel):
+        level = bool(state)
+        if _outputs.get(pin) != level:
+            _outputs[pin] = level
+            _backend.set_clock(pin, level)
+
+
+def input(channel):
+    if channel in _chips:
+        return _backend.read_data(channel)
+    return int(_outputs.get(channel, 0))
+
+
+def wait_for_edge(channel, edge, bouncetime=None, timeout=None):
+    chip = _chips.get(channel)
+    deadline = None if timeout is None else time.perf_counter() + timeout / 1000
+    level = input(channel)
+    while True:
+        delay = chip.time_to_ready() if chip is not None else 0.001
+        if deadline is not None:
+            delay = min(delay, deadline - time.perf_counter())
+            if delay <= 0:
+                return None
+        time.sleep(max(delay, 0.0001))
+        new_level = input(channel)
+        if new_level != level:
+            if (edge == BOTH or (edge == FALLING and not new_level) or
+                    (edge == RISING and new_level)):
+                return channel
+            level = new_level
+
+
+def cleanup(channel=None):
+    if channel is None:
+        for pin in list(_outputs):
+            output(pin, False)
+        _outputs.clear()
+        return
+    for pin in _channels(channel):
+        if pin in _outputs:
+            output(pin, False)
+            del _outputs[pin]
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Benchmarks of the read paths and filters on the emulated hx711.
+It runs without Raspberry Pi because hx711_emulator is used as RPi.GPIO.
+
+python3 benchmark_suite.py --output results.json
+python3 benchmark_suite.py --baseline results.json  # compare with older run
+"""
+import argparse
+import json
+import platform
+import random
+import statistics as stat
+import sys
+import tempfile
+import time
+
+import hx711_emulator
+hx711_emulator.install()  # hx711 uses the emulator as RPi.GPIO
+
+import RPi.GPIO as GPIO
+import hx711
+from hx711 import (HX711, EMAFilter, FakeGPIOBackend, GPIOMemBackend,
+                   HampelFilter, KalmanFilter, NumpyFilterEngine,
+                   RunningMedianFilter, outliers_filter)
+
+# relative change which is reported as regression
+REGRESSION_THRESHOLD = 0.1
+
+
+def measure(name, function, calls, samples_per_call):
+    # returns results of calling the function repeatedly
+    latencies = []
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    for _ in range(calls):
+        start = time.perf_counter()
+        function()
+        latencies.append(time.perf_counter() - start)
+    wall_time = time.perf_counter() - wall_start
+    cpu_time = time.process_time() - cpu_start
+    samples = calls * samples_per_call
+    latencies.sort()
+    result = {
+        'name': name,
+        'calls': calls,
+        'samples': samples,
+        'samples_per_s': samples / wall_time,
+        'latency_p50_ms': latencies[len(latencies) // 2] * 1000,
+        'latency_p90_ms': latencies[int(len(latencies) * 0.9)] * 1000,
+        'latency_p99_ms': latencies[int(len(latencies) * 0.99)] * 1000,
+        'cpu_us_per_sample': cpu_time / samples * 1000000,
+    }
+    print('{name:32s} {samples_per_s:10.1f} samples/s  p50 {latency_p50_ms:8.3f} ms'
+          '  p90 {latency_p90_ms:8.3f} ms  p99 {latency_p99_ms:8.3f} ms'
+          '  cpu {cpu_us_per_sample:8.2f} us/sample'.format(**result))
+    return result
+
+
+def read_benchmarks(data_rate, calls, readings):
+    hx711_emulator.remove_chips()
+    GPIO.setmode(GPIO.BCM)
+    hx711_emulator.add_chip(21, 20, data_rate=data_rate, noise=20,
+                            glitch_rate=0.01, seed=1)
+    hx = HX711(dout_pin=21, pd_sck_pin=20, data_rate=data_rate)
+    hx.set_scale_ratio(100.0)
+    results = [
+        measure('read', hx._read, calls * readings, 1),
+        measure('get_raw_data_mean({})'.format(readings),
+                lambda: hx.get_raw_data_mean(readings), calls, readings),
+        measure('get_weight_mean({})'.format(readings),
+                lambda: hx.get_weight_mean(readings), calls, readings),
+    ]
+    GPIO.cleanup()
+    return results
+
+
+def frame_benchmarks(calls):
+    # clocking out of frames, FakeGPIOBackend adds only little overhead
+    # so most of the time is spent in HX711. read_frame_per_bit is the frame
+    # which times each clock pulse, read_frame times only the whole frame.
+    gpio = FakeGPIOBackend()
+    gpio.add_chip(5, 6, data_rate=80)
+    hx = HX711(dout_pin=5, pd_sck_pin=6, gpio_backend=gpio, data_rate=80)
+    results = compare_frames(hx, '', calls)
+    # GPIOMemBackend on a regular file has the cost of register access
+    # without hardware
+    with tempfile.NamedTemporaryFile() as registers:
+        registers.write(bytes(GPIOMemBackend._BLOCK_SIZE))
+        registers.flush()
+        gpio = GPIOMemBackend(registers.name)
+        hx = HX711(dout_pin=5, pd_sck_pin=6, gpio_backend=gpio, data_rate=80)
+        results += compare_frames(hx, '_gpiomem', calls)
+        gpio.cleanup()
+    return results
+
+
+def compare_frames(hx, suffix, calls):
+    # returns results of the frame timed per bit and of the whole frame
+
+    def read_frame_per_bit():
+        hx._pulse_time = 0.0  # the frame measures it again
+        hx._read_frame()
+
+    hx._read_frame()
+    per_bit = measure('read_frame_per_bit' + suffix, read_frame_per_bit,
+                      calls, 1)
+    hx._read_frame()
+    whole = measure('read_frame' + suffix, hx._read_frame, calls, 1)
+    print('{:32s} {:10.1%} of the frame timed per bit'.format(
+        'read_frame' + suffix,
+        whole['latency_p50_ms'] / per_bit['latency_p50_ms']))
+    return [per_bit, whole]
+
+
+def filter_benchmarks(calls, readings):
+    data_rng = random.Random(1)
+    windows = [[int(data_rng.gauss(100000, 20)) for _ in range(readings)]
+               for _ in range(100)]
+    samples = [value for window in windows for value in window]
+
+    def run_filter(data_filter):
+        for window in windows:
+            data_filter(window)
+
+    results = [
+        measure('outliers_filter({})'.format(readings),
+                lambda: run_filter(outliers_filter), calls, len(windows)),
+    ]
+    if hx711.np is not None:
+        engine = NumpyFilterEngine()
+        results.append(
+            measure('NumpyFilterEngine.mean({})'.format(readings),
+                    lambda: run_filter(engine.mean), calls, len(windows)))
+        results.append(
+            measure('NumpyFilterEngine.batch_mean',
+                    lambda: engine.batch_mean(windows), calls, len(windows)))
+    for stream_filter in (RunningMedianFilter(), HampelFilter(), EMAFilter(),
+                          KalmanFilter()):
+
+        def run_stream_filter(update=stream_filter.update):
+            for sample in samples:
+                update(sample)
+
+        results.append(
+            measure(type(stream_filter).__name__, run_stream_filter, calls,
+                    len(samples)))
+    return results
+
+
+def compare(results, baseline):
+    # prints relative change against the baseline and returns regressions
+    old_results = {result['name']: result for result in baseline['results']}
+    regressions = []
+    for result in results:
+        old = old_results.get(result['name'])
+        if old is None:
+            continue
+        throughput = result['samples_per_s'] / old['samples_per_s'] - 1
+        cpu = result['cpu_us_per_sample'] / old['cpu_us_per_sample'] - 1
+        regression = (throughput < -REGRESSION_THRESHOLD or
+                      cpu > REGRESSION_THRESHOLD)
+        if regression:
+            regressions.append(result['name'])
+        print('{:32s} throughput {:+7.1%}  cpu per sample {:+7.1%}{}'.format(
+            result['name'], throughput, cpu,
+            '  REGRESSION' if regression else ''))
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--data-rate', type=int, default=80, choices=(10, 80))
+    parser.add_argument('--calls', type=int, default=20)
+    parser.add_argument('--readings', type=int, default=30)
+    parser.add_argument('--output', default='benchmark_results.json',
+                        help='file where results are saved')
+    parser.add_argument('--baseline', help='results of older run to compare')
+    args = parser.parse_args()
+
+    results = read_benchmarks(args.data_rate, args.calls, args.readings)
+    results += frame_benchmarks(args.calls * args.readings * 10)
+    results += filter_benchmarks(args.calls, args.readings)
+    report = {
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': sys.version.split()[0],
+        'machine': platform.machine(),
+        'data_rate': args.data_rate,
+        'results': results,
+    }
+    with open(args.output, 'w') as output_file:
+        json.dump(report, output_file, indent=2)
+    print('Results saved to', args.output)
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            regressions = compare(results, json.load(baseline_file))
+        if regressions:
+            sys.exit(1)
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+import random
+import time
+
+from hx711 import HX711, FakeGPIOBackend
+
+if __name__ == '__main__':
+    # Simulated chip so it can be run without Raspberry Pi.
+    # On real hardware use GPIO.setmode(GPIO.BCM) and HX711(21, 20)
+    load = [100000]  # raw value of the simulated load cell
+
+    def source(channel, gain_A):
+        return load[0] + random.randint(-50, 50)
+
+    backend = FakeGPIOBackend()
+    backend.add_chip(21, 20, source=source, data_rate=80)
+    hx = HX711(dout_pin=21, pd_sck_pin=20, gpio_backend=backend)
+    hx.set_offset(0)
+    hx.set_scale_ratio(100.0)  # 100 per gram
+
+    # Instead of reading in a loop, the callbacks are called when
+    # something happens. They run in their own thread.
+    hx.on_threshold(1500, 'rising', 10,
+                    lambda weight: print('Bin is full: {:.1f} g'.format(weight)))
+    hx.on_threshold(500, 'falling', 10,
+                    lambda weight: print('Bin is empty: {:.1f} g'.format(weight)))
+    hx.on_change(100, lambda weight: print('Weight: {:.1f} g'.format(weight)))
+
+    # the acquisition thread reads every conversion and checks the callbacks
+    hx.start_acquisition()
+    try:
+        for grams in (1000, 1200, 1600, 1550, 800, 300, 1000):
+            load[0] = grams * 100
+            time.sleep(0.5)
+    finally:
+        hx.stop_acquisition()
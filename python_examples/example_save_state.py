@@ -1,23 +1,23 @@
 #!/usr/bin/env python3
-import pickle
-import os
-
 import RPi.GPIO as GPIO  # import GPIO
-from hx711 import HX711  # import the class HX711
+from hx711 import HX711, CalibrationStore  # import the class HX711
 
 try:
     GPIO.setmode(GPIO.BCM)  # set GPIO pin mode to BCM numbering
-    # Create an object hx which represents your real hx711 chip
-    # Required input parameters are only 'dout_pin' and 'pd_sck_pin'
-    hx = HX711(dout_pin=21, pd_sck_pin=20)
-    # Check if we have swap file. If yes that suggest that the program was not
-    # terminated proprly (power failure). We load the latest state.
-    swap_file_name = 'swap_file.swp'
-    if os.path.isfile(swap_file_name):
-        with open(swap_file_name, 'rb') as swap_file:
-            hx = pickle.load(swap_file)
-            # now we loaded the state before the Pi restarted.
+    # Check if we have saved state of the hx711 connected to these pins.
+    # If yes that suggest that the program was not terminated properly
+    # (power failure). We load the latest state.
+    store = CalibrationStore('calibration.json')
+    state = store.get_state(dout_pin=21, pd_sck_pin=20)
+    if state is not None:
+        # warm start. Offsets, ratios and filters are loaded and it does
+        # not wait for the channel and gain to settle.
+        hx = HX711(dout_pin=21, pd_sck_pin=20, state=state)
+        # now we loaded the state before the Pi restarted.
     else:
+        # Create an object hx which represents your real hx711 chip
+        # Required input parameters are only 'dout_pin' and 'pd_sck_pin'
+        hx = HX711(dout_pin=21, pd_sck_pin=20)
         # measure tare and save the value as offset for current channel
         # and gain selected. That means channel A and gain 128
         err = hx.zero()
@@ -62,13 +62,11 @@ try:
 
         # This is how you can save the ratio and offset in order to load it later.
         # If Raspberry Pi unexpectedly powers down, load the settings.
-        print('Saving the HX711 state to swap file on persistant memory')
-        with open(swap_file_name, 'wb') as swap_file:
-            pickle.dump(hx, swap_file)
-            swap_file.flush()
-            os.fsync(swap_file.fileno())
-            # you have to flush, fsynch and close the file all the time.
-            # This will write the file to the drive. It is slow but safe.
+        print('Saving the HX711 state to calibration file on persistant memory')
+        # The file is written to a temporary file, synced to the drive
+        # and renamed, so it is never half written. Many HX711 can be
+        # saved to the same file, they are identified by the pins.
+        store.save(hx)
 
     # Read data several times and return mean value
     # subtracted by offset and converted by scale ratio to
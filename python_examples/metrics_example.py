@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+import os
+import sys
+import tempfile
+import time
+import timeit
+
+from hx711 import HX711, FakeGPIOBackend, HX711Metrics, write_metrics_textfile
+
+if __name__ == '__main__':
+    # Simulated chip so it can be run without Raspberry Pi.
+    # On real hardware use GPIO.setmode(GPIO.BCM) and HX711(21, 20)
+    backend = FakeGPIOBackend()
+    backend.add_chip(21, 20, data_rate=80)
+    hx = HX711(dout_pin=21, pd_sck_pin=20, gpio_backend=backend)
+    # python3 metrics_example.py /var/lib/node_exporter/hx711.prom
+    # node_exporter --collector.textfile.directory=/var/lib/node_exporter
+    # reads the file. By default it is written to the temp directory.
+    if len(sys.argv) > 1:
+        path = sys.argv[1]
+    else:
+        path = os.path.join(tempfile.gettempdir(), 'hx711.prom')
+
+    for _ in range(5):
+        print('Raw data:', hx.get_raw_data_mean(readings=30))
+        write_metrics_textfile(path, {'scale_1': hx})
+    print('Metrics written to', path)
+
+    stats = hx.stats()['A_128']
+    print('conversions: {} invalid: {} effective SPS: {:.1f} '
+          'filter rejection ratio: {:.2f}'.format(
+              stats['conversions'], stats['invalid'], stats['effective_sps'],
+              stats['filter_rejection_ratio']))
+    wait_time = stats['wait_time']
+    frame_time = stats['frame_time']
+    print('mean wait for data ready: {:.2f} ms mean frame: {:.1f} us'.format(
+        wait_time['sum'] / wait_time['count'] * 1000,
+        frame_time['sum'] / frame_time['count'] * 1000000))
+
+    # overhead of metrics per conversion
+    metrics = HX711Metrics()
+    number = 100000
+    overhead = timeit.timeit(
+        lambda: metrics.observe_frame(0, 0.01, 0.0002, False, False,
+                                      time.perf_counter()),
+        number=number) / number
+    print('metrics overhead per conversion: {:.2f} us'.format(
+        overhead * 1000000))
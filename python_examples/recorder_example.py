@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+import time
+
+from hx711 import HX711, FakeGPIOBackend, SampleLog, SampleRecorder
+
+if __name__ == '__main__':
+    # Simulated chip so it can be run without Raspberry Pi.
+    # On real hardware use GPIO.setmode(GPIO.BCM) and HX711(21, 20)
+    backend = FakeGPIOBackend()
+    backend.add_chip(21, 20, data_rate=80)
+    hx = HX711(dout_pin=21, pd_sck_pin=20, gpio_backend=backend)
+
+    start = time.time_ns()
+    # every frame read by hx is recorded. Records are synced to disk
+    # in batches of 1000 or at least once per second.
+    with SampleRecorder('hx711_log') as recorder:
+        hx.set_recorder(recorder)
+        for _ in range(10):
+            print('Weight:', hx.get_weight_mean(readings=30))
+        hx.set_recorder(None)
+    end = time.time_ns()
+
+    log = SampleLog('hx711_log')  # requires numpy
+    # raw records are memory mapped numpy arrays
+    for records in log.samples(start, end):
+        print('Records: {} first raw: {} last raw: {}'.format(
+            records.size, records['raw'][0], records['raw'][-1]))
+    # min, max and mean for at most 10 buckets of the range
+    seconds, buckets = log.query(start, end, points=10)
+    for bucket in buckets:
+        print('{} s bucket at {}: count {} min {} max {} mean {:.1f}'.format(
+            seconds, bucket['timestamp'], bucket['count'], bucket['min'],
+            bucket['max'], bucket['mean']))
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+import functools
+import time
+
+from hx711 import HX711, FakeGPIOBackend, ScaleFarm
+
+
+def create_fake_scale(dout_pin, pd_sck_pin):
+    # Each worker process creates its own HX711. Here it is a simulated chip
+    # so the farm can be tried without Raspberry Pi.
+    # On real hardware use GPIO.setmode(GPIO.BCM) and HX711(dout_pin, pd_sck_pin)
+    backend = FakeGPIOBackend()
+    backend.add_chip(dout_pin, pd_sck_pin, data_rate=80)
+    return HX711(dout_pin=dout_pin, pd_sck_pin=pd_sck_pin,
+                 gpio_backend=backend)
+
+
+if __name__ == '__main__':
+    # Measure how throughput and latency scale with the number of workers.
+    for workers in (1, 2, 4, 8, 16):
+        factories = [
+            functools.partial(create_fake_scale, 2 * i, 2 * i + 1)
+            for i in range(workers)
+        ]
+        with ScaleFarm(factories) as farm:
+            time.sleep(3)  # workers create HX711 and select channel
+            start = sum(status['conversions'] for status in farm.get_status())
+            start_time = time.time()
+            latencies = []
+            while time.time() - start_time < 5:
+                now = time.time()
+                for reading in farm.get_readings():
+                    # None if the worker died while it was writing
+                    if reading is not None and reading[3]:
+                        latencies.append(now - reading[0])
+                time.sleep(0.01)
+            end = sum(status['conversions'] for status in farm.get_status())
+            elapsed = time.time() - start_time
+            latencies.sort()
+            print('workers: {:2d} conversions/s: {:7.1f} '
+                  'median age of reading: {:.1f} ms'.format(
+                      workers, (end - start) / elapsed,
+                      latencies[len(latencies) // 2] * 1000))
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+import time
+
+from hx711 import HX711, FakeGPIOBackend
+
+
+def benchmark(function, repeat=5):
+    # returns the best time of the function call in ms
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append((time.perf_counter() - start) * 1000)
+    return min(times)
+
+
+if __name__ == '__main__':
+    # Simulated chip so it can be run without Raspberry Pi.
+    # On real hardware use GPIO.setmode(GPIO.BCM) and HX711(21, 20, data_rate=80)
+    for data_rate in (10, 80):
+        backend = FakeGPIOBackend()
+        backend.add_chip(21, 20, data_rate=data_rate)
+
+        def create():
+            return HX711(dout_pin=21, pd_sck_pin=20, gpio_backend=backend,
+                         data_rate=data_rate)
+
+        hx = create()
+        print('{} SPS'.format(data_rate))
+        print('  constructor:            {:7.1f} ms'.format(benchmark(create)))
+        print('  channel A -> B -> A:    {:7.1f} ms'.format(
+            benchmark(lambda: (hx.select_channel('B'), hx.select_channel('A')))))
+        print('  gain 128 -> 64 -> 128:  {:7.1f} ms'.format(
+            benchmark(lambda: (hx.set_gain_A(64), hx.set_gain_A(128)))))
+        print('  already active channel: {:7.3f} ms'.format(
+            benchmark(lambda: hx.select_channel('A', skip_if_active=True))))
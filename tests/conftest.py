@@ -0,0 +1,37 @@
+import os
+import sys
+
+import pytest
+
+# hx711 is a single module in HX711_Python3, it is not installed as package
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(__file__)),
+                    'HX711_Python3'))
+
+from hx711 import HX711, FakeGPIOBackend
+
+
+def scheduled_source(channel, gain_A):
+    return 5000 if channel == 'B' else 100000
+
+
+@pytest.fixture
+def scheduled_hx711():
+    """
+    scheduled_hx711 returns a function which creates HX711 reading
+    channel A 128 and B by the schedule from a simulated chip.
+    """
+
+    def create(gpio=None, A_128=1, B=1):
+        if gpio is None:
+            # a delayed clock pulse on a busy machine must not reset the chip
+            gpio = FakeGPIOBackend(simulate_power_down=False)
+        gpio.add_chip(5, 6, source=scheduled_source, data_rate=80)
+        hx = HX711(dout_pin=5, pd_sck_pin=6, gpio_backend=gpio)
+        hx.set_scale_ratio(100.0, 'A', 128)
+        hx.set_scale_ratio(10.0, 'B')
+        hx.set_schedule(A_128=A_128, B=B)
+        hx.get_raw_data_mean(2)  # first frames follow the schedule
+        return hx
+
+    return create
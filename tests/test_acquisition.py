@@ -0,0 +1,100 @@
+import itertools
+import threading
+import time
+
+import pytest
+
+from hx711 import HX711, FakeGPIOBackend
+
+
+class BrokenGPIOBackend(FakeGPIOBackend):
+
+    def __init__(self):
+        super().__init__(simulate_power_down=False)
+        self.broken = False
+
+    def read_data(self, pin):
+        if self.broken:
+            raise OSError('GPIO line was released')
+        return super().read_data(pin)
+
+
+def wait_stopped(hx):
+    deadline = time.perf_counter() + 2.0
+    while hx._acquisition_thread is not None:
+        assert time.perf_counter() < deadline
+        time.sleep(0.01)
+
+
+def test_buffered_reading_raises_acquisition_error():
+    gpio = BrokenGPIOBackend()
+    gpio.add_chip(5, 6, data_rate=80)
+    hx = HX711(dout_pin=5, pd_sck_pin=6, gpio_backend=gpio)
+    hx.start_acquisition()
+    gpio.broken = True
+    wait_stopped(hx)
+    with pytest.raises(OSError):
+        hx.get_raw_data_mean(5)
+    # it is raised once, then the readings are taken directly
+    gpio.broken = False
+    assert hx.get_raw_data_mean(5) is not False
+
+
+def test_stop_acquisition_raises_acquisition_error():
+    gpio = BrokenGPIOBackend()
+    gpio.add_chip(5, 6, data_rate=80)
+    hx = HX711(dout_pin=5, pd_sck_pin=6, gpio_backend=gpio)
+    hx.start_acquisition()
+    gpio.broken = True
+    wait_stopped(hx)
+    with pytest.raises(OSError):
+        hx.stop_acquisition()
+    gpio.broken = False
+    hx.start_acquisition()
+    hx.stop_acquisition()
+
+
+class CountingGPIOBackend(FakeGPIOBackend):
+
+    def __init__(self):
+        super().__init__(simulate_power_down=False)
+        self.main_thread_reads = 0
+
+    def read_data(self, pin):
+        if threading.current_thread() is threading.main_thread():
+            self.main_thread_reads += 1
+        return super().read_data(pin)
+
+
+def test_ring_buffer_keeps_latest_conversions():
+    gpio = CountingGPIOBackend()
+    conversions = itertools.count(1)
+    gpio.add_chip(5, 6, source=lambda channel, gain_A: next(conversions),
+                  data_rate=80)
+    hx = HX711(dout_pin=5, pd_sck_pin=6, gpio_backend=gpio, data_rate=80)
+    hx.start_acquisition(buffer_size=5)
+    time.sleep(0.15)  # more conversions than the buffer holds
+    with hx._read_lock:
+        # the acquisition thread waits for the lock after it buffered
+        # the last reading
+        time.sleep(0.02)
+        last = next(conversions) - 1
+        timestamps, data_list = hx.get_buffered_data(10)
+        # the latest conversions, a busy machine can miss some of them
+        assert len(data_list) == 5
+        assert data_list == sorted(set(data_list))
+        assert data_list[-1] == last
+        assert timestamps == sorted(timestamps)
+        assert hx.get_buffered_data(2)[1] == data_list[-2:]
+        # the means are computed from the buffer without reading GPIO
+        reads = gpio.main_thread_reads
+        assert hx.get_raw_data_mean(3) == hx.get_readings_mean(data_list[-3:])
+        assert hx.get_data_mean(5) == hx.get_readings_mean(data_list)
+        hx.set_scale_ratio(2)
+        assert hx.get_weight_mean(3) == hx.get_readings_mean(
+            data_list[-3:]) / 2
+        assert gpio.main_thread_reads == reads
+    hx.stop_acquisition()
+    # the readings are taken directly from hx711 again
+    assert hx.get_raw_data_mean(3) is not False
+    assert gpio.main_thread_reads > reads
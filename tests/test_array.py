@@ -0,0 +1,146 @@
+import time
+
+import pytest
+
+from hx711 import HX711Array, FakeGPIOBackend
+
+VALUES = {5: 1000, 7: -2000}
+
+
+def create_array():
+    gpio = FakeGPIOBackend()
+    chips = [
+        gpio.add_chip(pin, 6,
+                      source=lambda channel, gain_A, pin=pin: VALUES[pin])
+        for pin in VALUES
+    ]
+    array = HX711Array(list(VALUES), 6, gpio_backend=gpio, data_rate=80)
+    return array, chips
+
+
+def test_array_waits_for_predicted_conversion(monkeypatch):
+    array, chips = create_array()
+    sleeps = []
+    sleep = time.sleep
+
+    def counting_sleep(delay):
+        sleeps.append(delay)
+        sleep(delay)
+
+    monkeypatch.setattr(time, 'sleep', counting_sleep)
+    readings = 16
+    start = time.perf_counter()
+    for _ in range(readings):
+        assert array.read() == [VALUES[5], VALUES[7]]
+    elapsed = time.perf_counter() - start
+    # a frame broken by a busy machine takes more conversions
+    assert readings * 0.8 < elapsed * 80 < readings * 2
+    if array._conversion_period:
+        # a busy machine can make it learn the period again
+        assert array._conversion_period == pytest.approx(
+            chips[0]['period'], rel=0.5)
+    # it sleeps until the end of conversion instead of polling all the time
+    assert len(sleeps) < elapsed / array._spin_time / 2
+
+
+def test_never_ready_array_times_out():
+    array, chips = create_array()
+    chips[1]['next_ready'] = float('inf')
+    array.read()  # the frame which was ready is clocked out
+    timeouts = array.get_metrics().stats()['A_128']['ready_timeouts']
+    start = time.perf_counter()
+    assert array.read() == [False, False]
+    elapsed = time.perf_counter() - start
+    assert array._ready_timeout <= elapsed < array._ready_timeout + 0.2
+    assert array.get_metrics().stats()['A_128']['ready_timeouts'] > timeouts
+
+
+def spiking_source():
+    conversions = []
+
+    def source(channel, gain_A):
+        conversions.append(channel)
+        # every fifth conversion is a spike far from the load
+        if len(conversions) % 5 == 0:
+            return 50000
+        return 1000 + len(conversions) % 3
+
+    return source
+
+
+@pytest.mark.parametrize('engine', [False, True])
+def test_array_counts_filtered_readings(engine):
+    array, chips = create_array()
+    for chip in chips:
+        chip['source'] = spiking_source()
+    if engine:
+        pytest.importorskip('numpy')
+        from hx711 import NumpyFilterEngine
+        array.set_filter_engine(NumpyFilterEngine())
+    before = array.get_metrics().stats()['A_128']
+    means = array.get_raw_data_mean(10)
+    stats = array.get_metrics().stats()['A_128']
+    # the readings of both chips are counted
+    assert stats['filter_readings'] - before['filter_readings'] == 20
+    assert stats['filter_rejected'] > before['filter_rejected']
+    assert all(1000 <= mean <= 1002 for mean in means), means
+
+
+def test_array_debug_mode_prints_like_hx711(capsys):
+    array, _ = create_array()
+    array.set_debug_mode(True)
+    assert 'Debug mode ENABLED' in capsys.readouterr().out
+    array.set_debug_mode(False)
+    assert 'Debug mode DISABLED' in capsys.readouterr().out
+    with pytest.raises(ValueError):
+        array.set_debug_mode('yes')
+
+
+def test_too_long_period_of_array_is_learned_again():
+    array, chips = create_array()
+    while not (array._last_ready_known and array._conversion_period):
+        array.read()
+    array._conversion_intervals.extend([2 * chips[0]['period']] * 9)
+    array._conversion_period = 2 * chips[0]['period']
+    # waits of a busy machine do not wake up on time, so it can take longer
+    for _ in range(80):
+        array.read()
+        if array._conversion_period == pytest.approx(chips[0]['period'],
+                                                     rel=0.2):
+            break
+    assert array._conversion_period == pytest.approx(chips[0]['period'],
+                                                     rel=0.2)
+
+
+class LateGPIOBackend(FakeGPIOBackend):
+    """
+    LateGPIOBackend raises the clock late once, while PD_SCK is low.
+    """
+
+    late_pulse = None
+    rising = 0
+
+    def set_clock(self, pin, state):
+        if state:
+            self.rising += 1
+            if self.rising == self.late_pulse:
+                time.sleep(0.0002)
+        super().set_clock(pin, state)
+
+
+def test_late_pulse_powers_down_chips():
+    gpio = LateGPIOBackend()
+    chips = [
+        gpio.add_chip(pin, 6,
+                      source=lambda channel, gain_A, pin=pin: VALUES[pin])
+        for pin in VALUES
+    ]
+    array = HX711Array(list(VALUES), 6, gpio_backend=gpio, data_rate=80)
+    power_downs = [chip['power_downs'] for chip in chips]
+    gpio.late_pulse = gpio.rising + 3
+    # the chips did not see PD_SCK high for 60 us, they would
+    # continue the frame without the power down
+    assert array.read() == [VALUES[5], VALUES[7]]
+    assert all(chip['power_downs'] > count
+               for chip, count in zip(chips, power_downs))
+    assert [array.read() for _ in range(3)] == [[VALUES[5], VALUES[7]]] * 3
@@ -0,0 +1,63 @@
+import asyncio
+import time
+
+from hx711 import HX711, AsyncHX711, FakeGPIOBackend, RecoveryPolicy
+
+
+def test_async_means_use_the_channel_before_reading(scheduled_hx711):
+    hx = scheduled_hx711()
+    scale = AsyncHX711(hx)
+
+    async def means():
+        results = []
+        for _ in range(2):
+            channel = hx.get_current_channel()
+            results.append((channel, await scale.get_raw_data_mean(6)))
+            await scale.read()  # next channel of the schedule
+        channel = hx.get_current_channel()
+        results.append((channel, await scale.get_weight_mean(6)))
+        return results
+
+    (first, raw_1), (second, raw_2), (third, weight) = asyncio.run(means())
+    for channel, raw in ((first, raw_1), (second, raw_2)):
+        assert raw == (5000 if channel == 'B' else 100000)
+    assert weight == (5000 / 10.0 if third == 'B' else 100000 / 100.0)
+
+
+def test_async_read_channel_labels_the_reading(scheduled_hx711):
+    hx = scheduled_hx711(A_128=1, B=0)
+    scale = AsyncHX711(hx)
+    assert asyncio.run(scale.read_channel()) == ('A', 128, 100000)
+
+
+def test_gather_overlaps_waits_of_scales():
+    scales = []
+    for dout_pin in range(5, 9):
+        gpio = FakeGPIOBackend(simulate_power_down=False)
+        gpio.add_chip(dout_pin, 20, source=lambda channel, gain_A: 100,
+                      data_rate=10)
+        hx = HX711(dout_pin=dout_pin, pd_sck_pin=20, gpio_backend=gpio,
+                   data_rate=10)
+        # a frame slowed down by a busy machine costs one conversion
+        hx.set_recovery_policy(RecoveryPolicy(wakeup_discard=0))
+        scales.append(AsyncHX711(hx))
+
+    async def read(scale):
+        # the readings after the first one wait for the next conversion
+        return [await scale.read() for _ in range(4)]
+
+    async def one_by_one():
+        return [await read(scale) for scale in scales]
+
+    async def together():
+        return await asyncio.gather(*(read(scale) for scale in scales))
+
+    elapsed = []
+    for readings in (one_by_one, together):
+        start = time.perf_counter()
+        assert asyncio.run(readings()) == [[100] * 4] * 4
+        elapsed.append(time.perf_counter() - start)
+    # one by one each scale waits at least two conversions of 100 ms.
+    # Together they wait about four conversions at once.
+    assert elapsed[0] > 0.75
+    assert elapsed[1] < elapsed[0] * 0.6
@@ -0,0 +1,89 @@
+import json
+
+import pytest
+
+from hx711 import Calibration, FakeGPIOBackend, HX711
+
+
+def test_linear_fit():
+    data = [0, 10000, 20000, 40000]
+    weights = [5 + 0.01 * value for value in data]
+    calibration = Calibration.fit(data, weights)
+    for value in (-5000, 0, 15000, 80000):
+        assert calibration.convert(value) == pytest.approx(5 + 0.01 * value)
+    # raw data is converted after the offset is subtracted
+    assert calibration.convert(11000, offset=1000) == pytest.approx(105.0)
+
+
+def test_linear_fit_is_least_squares():
+    calibration = Calibration.fit([0, 1, 2, 3], [0.0, 1.0, 1.0, 3.0])
+    # slope 0.9 and intercept -0.1 of the least squares line
+    assert calibration.convert(0) == pytest.approx(-0.1)
+    assert calibration.convert(10) == pytest.approx(8.9)
+
+
+def test_poly_fit():
+    pytest.importorskip('numpy')
+    data = [-20000, -5000, 0, 10000, 30000]
+    weights = [2e-7 * value**2 + 0.01 * value + 3 for value in data]
+    calibration = Calibration.fit(data, weights, kind='poly', degree=2)
+    for value in (-10000, 1234, 25000):
+        assert calibration.convert(value) == pytest.approx(
+            2e-7 * value**2 + 0.01 * value + 3)
+
+
+def test_piecewise_fit():
+    calibration = Calibration.fit([0, 1000, 3000], [0.0, 10.0, 30.0 + 10.0],
+                                  kind='piecewise')
+    assert calibration.convert(500) == pytest.approx(5.0)
+    assert calibration.convert(2000) == pytest.approx(25.0)
+    # the end segments are extended
+    assert calibration.convert(-1000) == pytest.approx(-10.0)
+    assert calibration.convert(4000) == pytest.approx(55.0)
+
+
+def test_convert_arrays_like_values():
+    np = pytest.importorskip('numpy')
+    data = np.array([-3000, 0, 500, 1000, 2999, 3000, 6000])
+    for calibration in (Calibration.fit([0, 1000, 3000], [0, 10, 40]),
+                        Calibration.fit([0, 1000, 3000], [0, 10, 40],
+                                        kind='piecewise')):
+        expected = [calibration.convert(float(value)) for value in data]
+        assert calibration.convert(data).tolist() == pytest.approx(expected)
+        assert calibration.convert(data + 7, offset=7).tolist() == (
+            pytest.approx(expected))
+
+
+def test_dict_round_trip():
+    for kind in ('linear', 'piecewise'):
+        calibration = Calibration.fit([0, 1000, 3000], [0, 10, 40], kind=kind)
+        restored = Calibration.from_dict(
+            json.loads(json.dumps(calibration.to_dict())))
+        for value in (-100, 700, 2500, 5000):
+            assert restored.convert(value) == calibration.convert(value)
+
+
+def test_fit_needs_enough_points():
+    with pytest.raises(ValueError):
+        Calibration.fit([100], [1.0])
+    with pytest.raises(ValueError):
+        Calibration.fit([100, 100], [1.0, 2.0])
+    with pytest.raises(ValueError):
+        Calibration.fit([1, 2], [1.0, 2.0], kind='poly', degree=2)
+    with pytest.raises(ValueError):
+        Calibration.fit([1, 2], [1.0, 2.0], kind='spline')
+
+
+def test_hx711_uses_calibration_instead_of_scale_ratio():
+    gpio = FakeGPIOBackend(simulate_power_down=False)
+    gpio.add_chip(5, 6, source=lambda channel, gain_A: 21000, data_rate=80)
+    hx = HX711(dout_pin=5, pd_sck_pin=6, gpio_backend=gpio)
+    hx.set_offset(1000)
+    hx.set_scale_ratio(1000.0)
+    hx.set_calibration(Calibration.fit([0, 10000, 30000], [0, 10, 40],
+                                       kind='piecewise'))
+    assert hx.get_weight_mean(5) == pytest.approx(25.0)
+    hx.set_calibration(None)
+    assert hx.get_weight_mean(5) == pytest.approx(20.0)
+    with pytest.raises(TypeError):
+        hx.set_calibration(object())
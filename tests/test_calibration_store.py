@@ -0,0 +1,115 @@
+import json
+import os
+
+import pytest
+
+import hx711
+from hx711 import CalibrationStore, FakeGPIOBackend, HX711
+
+
+def source(channel, gain_A):
+    return 3000 if channel == 'B' else 21000
+
+
+def create_gpio():
+    gpio = FakeGPIOBackend(simulate_power_down=False)
+    gpio.add_chip(5, 6, source=source, data_rate=80)
+    gpio.add_chip(7, 6, source=source, data_rate=80)
+    return gpio
+
+
+def calibrated_hx711(gpio, dout_pin=5):
+    hx = HX711(dout_pin=dout_pin, pd_sck_pin=6, gpio_backend=gpio,
+               data_rate=80)
+    hx.set_offset(1000)
+    hx.set_scale_ratio(10.0)
+    hx.set_offset(-500, 'B')
+    hx.set_scale_ratio(2.0, 'B')
+    return hx
+
+
+def conversions(hx):
+    return sum(mode['conversions'] for mode in hx.stats().values())
+
+
+def test_save_keeps_other_devices(tmp_path):
+    store = CalibrationStore(str(tmp_path / 'calibration.json'))
+    assert store.load() == {}
+    gpio = create_gpio()
+    store.save(calibrated_hx711(gpio))
+    other = HX711(dout_pin=7, pd_sck_pin=6, gpio_backend=gpio)
+    other.set_offset(42)
+    store.save(other)
+    assert sorted(store.load()) == ['5:6', '7:6']
+    assert store.get_state(5, 6)['offsets']['A_128'] == 1000
+    assert store.get_state(7, 6)['offsets']['A_128'] == 42
+    assert store.get_state(9, 6) is None
+    # only the store file is left in the directory
+    assert os.listdir(str(tmp_path)) == ['calibration.json']
+
+
+def test_failed_write_keeps_old_file(tmp_path, monkeypatch):
+    path = str(tmp_path / 'calibration.json')
+    store = CalibrationStore(path)
+    gpio = create_gpio()
+    hx = calibrated_hx711(gpio)
+    store.save(hx)
+    with open(path) as store_file:
+        saved = store_file.read()
+
+    def power_failure(source_path, destination_path):
+        raise OSError('power failure')
+
+    hx.set_offset(2000)
+    monkeypatch.setattr(hx711.os, 'replace', power_failure)
+    with pytest.raises(OSError):
+        store.save(hx)
+    monkeypatch.undo()
+    assert os.listdir(str(tmp_path)) == ['calibration.json']
+    with open(path) as store_file:
+        assert store_file.read() == saved
+    assert store.get_state(5, 6)['offsets']['A_128'] == 1000
+
+
+def test_warm_start_reads_nothing(tmp_path):
+    store = CalibrationStore(str(tmp_path / 'calibration.json'))
+    gpio = create_gpio()
+    hx = calibrated_hx711(gpio)
+    hx.select_channel('B')
+    store.save(hx)
+
+    warm = store.create(5, 6, gpio_backend=gpio)
+    assert conversions(warm) == 0
+    assert warm.get_current_channel() == 'B'
+    assert warm.get_current_offset('A', 128) == 1000
+    assert warm.get_current_scale_ratio('B') == 2.0
+    assert warm.get_data_rate() == 80.0
+    assert warm.get_weight_mean(5) == (3000 + 500) / 2.0
+    assert warm.get_recovery_policy().discarded >= 1
+
+
+def test_warm_start_uses_arguments(tmp_path):
+    store = CalibrationStore(str(tmp_path / 'calibration.json'))
+    gpio = create_gpio()
+    store.save(calibrated_hx711(gpio))
+    warm = store.create(5, 6, gpio_backend=gpio, data_rate=10)
+    assert conversions(warm) == 0
+    # the RATE pin was changed after the state was saved
+    assert warm.get_data_rate() == 10.0
+    assert warm.get_current_offset('A', 128) == 1000
+    with pytest.raises(TypeError):
+        store.create(5, 6, gpio_backend=gpio, unknown=1)
+
+
+def test_create_without_state_uses_arguments(tmp_path):
+    store = CalibrationStore(str(tmp_path / 'calibration.json'))
+    hx = store.create(5, 6, gpio_backend=create_gpio(), select_channel='B')
+    assert hx.get_current_channel() == 'B'
+    assert conversions(hx) > 0
+
+
+def test_unknown_version(tmp_path):
+    path = tmp_path / 'calibration.json'
+    path.write_text(json.dumps({'version': 99, 'devices': {}}))
+    with pytest.raises(ValueError):
+        CalibrationStore(str(path)).load()
@@ -0,0 +1,160 @@
+import gc
+import threading
+import time
+import weakref
+
+import pytest
+
+from hx711 import HX711, FakeGPIOBackend
+
+
+def create_hx711(level):
+    gpio = FakeGPIOBackend(simulate_power_down=False)
+    gpio.add_chip(5, 6, source=lambda channel, gain_A: level[channel],
+                  data_rate=80)
+    return HX711(dout_pin=5, pd_sck_pin=6, gpio_backend=gpio, data_rate=80)
+
+
+def drive(hx, level, weights):
+    stream = hx.stream()
+    for weight in weights:
+        level['A'] = weight
+        assert next(stream) == weight
+
+
+def wait_for(calls, count, timeout=2.0):
+    # callbacks are called from the callback thread
+    deadline = time.perf_counter() + timeout
+    while len(calls) < count and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.05)
+    return calls
+
+
+def test_threshold_reports_each_crossing_once():
+    level = {'A': 0, 'B': 0}
+    hx = create_hx711(level)
+    rising = []
+    falling = []
+    hx.on_threshold(100, 'rising', 10, rising.append)
+    hx.on_threshold(100, 'falling', 10, falling.append)
+    # noise around the value is within hysteresis
+    drive(hx, level, [0, 120, 95, 105, 95, 130, 50, 150])
+    assert wait_for(rising, 2) == [120.0, 150.0]
+    assert wait_for(falling, 2) == [95.0, 50.0]
+
+
+def test_threshold_ignores_weight_at_registration():
+    level = {'A': 500, 'B': 0}
+    hx = create_hx711(level)
+    calls = []
+    hx.on_threshold(100, 'both', 0, calls.append)
+    drive(hx, level, [500, 600, 50, 200])
+    assert wait_for(calls, 2) == [50.0, 200.0]
+
+
+def test_change_and_remove_callback():
+    level = {'A': 0, 'B': 0}
+    hx = create_hx711(level)
+    changes = []
+    handle = hx.on_change(10, changes.append)
+    drive(hx, level, [0, 5, 12, 18, 22, 40])
+    # reference moves to the reported weight
+    assert wait_for(changes, 3) == [12.0, 22.0, 40.0]
+    hx.remove_callback(handle)
+    drive(hx, level, [1000, 0])
+    assert wait_for(changes, 4, timeout=0.2) == [12.0, 22.0, 40.0]
+
+
+def test_callbacks_for_other_channel_are_not_called():
+    level = {'A': 0, 'B': 0}
+    hx = create_hx711(level)
+    calls = []
+    hx.on_change(1, calls.append, channel='B')
+    drive(hx, level, [0, 100, 200])
+    assert wait_for(calls, 1, timeout=0.2) == []
+
+
+def test_failing_callback_does_not_stop_others(capsys):
+    level = {'A': 0, 'B': 0}
+    hx = create_hx711(level)
+    calls = []
+    hx.on_change(10, lambda weight: 1 / 0)
+    hx.on_change(10, calls.append)
+    drive(hx, level, [0, 50, 100])
+    assert wait_for(calls, 2) == [50.0, 100.0]
+    assert 'ZeroDivisionError' in capsys.readouterr().err
+
+
+def callback_threads():
+    return [thread for thread in threading.enumerate()
+            if thread.name == 'hx711-callbacks']
+
+
+def test_thread_stops_with_last_callback_and_frees_hx711():
+    threads = len(callback_threads())
+    level = {'A': 0, 'B': 0}
+    hx = create_hx711(level)
+    calls = []
+    first = hx.on_change(10, calls.append)
+    second = hx.on_change(20, calls.append)
+    assert len(callback_threads()) == threads + 1
+    hx.remove_callback(first)
+    assert len(callback_threads()) == threads + 1
+    hx.remove_callback(second)
+    assert len(callback_threads()) == threads
+    reference = weakref.ref(hx)
+    del hx
+    gc.collect()
+    assert reference() is None
+
+
+def test_power_down_stops_thread_and_next_callback_starts_it():
+    threads = len(callback_threads())
+    level = {'A': 0, 'B': 0}
+    hx = create_hx711(level)
+    calls = []
+    hx.on_change(10, calls.append)
+    hx.power_down()
+    assert len(callback_threads()) == threads
+    hx.power_up()
+    drive(hx, level, [0, 50])
+    assert wait_for(calls, 1) == [50.0]
+    assert len(callback_threads()) == threads + 1
+    hx.cleanup()
+    assert len(callback_threads()) == threads
+
+
+def test_callback_can_remove_itself():
+    level = {'A': 0, 'B': 0}
+    hx = create_hx711(level)
+    calls = []
+
+    def once(weight):
+        calls.append(weight)
+        hx.remove_callback(handle)
+
+    handle = hx.on_change(10, once)
+    drive(hx, level, [0, 50])
+    assert wait_for(calls, 1) == [50.0]
+    drive(hx, level, [100])
+    assert wait_for(calls, 2, timeout=0.2) == [50.0]
+    assert hx._callback_thread is None
+
+
+@pytest.mark.parametrize('register', [
+    lambda hx: hx.on_threshold(1, 'up', 0, print),
+    lambda hx: hx.on_threshold(1, 'rising', -1, print),
+    lambda hx: hx.on_change(0, print),
+    lambda hx: hx.on_change(1, print, channel='C'),
+])
+def test_invalid_arguments_raise_value_error(register):
+    hx = create_hx711({'A': 0, 'B': 0})
+    with pytest.raises(ValueError):
+        register(hx)
+
+
+def test_callback_must_be_callable():
+    hx = create_hx711({'A': 0, 'B': 0})
+    with pytest.raises(TypeError):
+        hx.on_change(1, 'print')
@@ -0,0 +1,109 @@
+import time
+
+from hx711 import FakeGPIOBackend
+
+
+def wait_ready(gpio, dout):
+    deadline = time.perf_counter() + 1.0
+    while gpio.read_data(dout):
+        assert time.perf_counter() < deadline
+        time.sleep(0.0002)
+
+
+def read_frame(gpio, dout, pd_sck, pulses=25):
+    wait_ready(gpio, dout)
+    data = 0
+    for _ in range(24):
+        gpio.set_clock(pd_sck, True)
+        gpio.set_clock(pd_sck, False)
+        data = (data << 1) | gpio.read_data(dout)
+    for _ in range(pulses - 24):
+        gpio.set_clock(pd_sck, True)
+        gpio.set_clock(pd_sck, False)
+    return data
+
+
+def recording_source(values, calls):
+
+    def source(channel, gain_A):
+        calls.append((channel, gain_A))
+        return values.pop(0)
+
+    return source
+
+
+def test_frame_is_24_bit_twos_complement():
+    gpio = FakeGPIOBackend(simulate_power_down=False)
+    calls = []
+    gpio.add_chip(5, 6, source=recording_source([0x123456, -2, 0x900000],
+                                                calls),
+                  data_rate=80)
+    gpio.setup_output(6)
+    assert read_frame(gpio, 5, 6) == 0x123456
+    assert read_frame(gpio, 5, 6) == 0xfffffe
+    # out of range values saturate like hx711
+    assert read_frame(gpio, 5, 6) == 0x7fffff
+
+
+def test_gain_pulses_select_next_conversion():
+    gpio = FakeGPIOBackend(simulate_power_down=False)
+    calls = []
+    gpio.add_chip(5, 6, source=recording_source([1, 2, 3, 4], calls),
+                  data_rate=80)
+    gpio.setup_output(6)
+    read_frame(gpio, 5, 6, pulses=26)
+    read_frame(gpio, 5, 6, pulses=27)
+    read_frame(gpio, 5, 6, pulses=25)
+    read_frame(gpio, 5, 6)
+    assert [channel for channel, _ in calls] == ['A', 'B', 'A', 'A']
+    assert calls[2:] == [('A', 64), ('A', 128)]
+
+
+def test_long_clock_pulse_powers_chip_down():
+    gpio = FakeGPIOBackend()
+    calls = []
+    chip = gpio.add_chip(5, 6, source=recording_source([1, 2, 3], calls),
+                         data_rate=80)
+    gpio.setup_output(6)
+    read_frame(gpio, 5, 6, pulses=26)  # the next one would be channel B
+    gpio.set_clock(6, True)
+    time.sleep(0.0002)
+    assert gpio.read_data(5) == 1  # powered down
+    gpio.set_clock(6, False)
+    assert chip['power_downs'] >= 1
+    read_frame(gpio, 5, 6)
+    # it starts again with channel A and gain 128
+    assert calls[-1] == ('A', 128)
+
+
+def test_power_down_can_be_turned_off():
+    gpio = FakeGPIOBackend(simulate_power_down=False)
+    chip = gpio.add_chip(5, 6, source=lambda channel, gain_A: 7,
+                         data_rate=80)
+    gpio.setup_output(6)
+    gpio.inject_slow_pulses(6, count=3)
+    assert read_frame(gpio, 5, 6) == 7
+    assert chip['power_downs'] == 0
+
+
+def test_wait_for_edge():
+    gpio = FakeGPIOBackend(simulate_power_down=False)
+    gpio.add_chip(5, 6, source=lambda channel, gain_A: 7, data_rate=10)
+    gpio.setup_output(6)
+    read_frame(gpio, 5, 6)
+    # the next conversion is ready in 100 ms
+    assert gpio.wait_for_edge(5, 0.001) is False
+    assert gpio.wait_for_edge(5, 0.5) is True
+    assert gpio.read_data(5) == 0
+    # data which is already ready is not lost
+    assert gpio.wait_for_edge(5, 0.001) is True
+
+
+def test_read_lines_reads_all_chips():
+    gpio = FakeGPIOBackend(simulate_power_down=False)
+    gpio.add_chip(5, 6, data_rate=80)
+    gpio.add_chip(7, 6, data_rate=80)
+    gpio.setup_output(6)
+    wait_ready(gpio, 5)
+    wait_ready(gpio, 7)
+    assert gpio.read_lines([5, 7, 9]) == [0, 0, 1]
@@ -0,0 +1,73 @@
+import random
+import statistics
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from hx711 import HX711, FakeGPIOBackend, NumpyFilterEngine, outliers_filter
+
+
+def random_windows(count, seed=3):
+    rng = random.Random(seed)
+    windows = []
+    for _ in range(count):
+        size = rng.randint(3, 30)
+        level = rng.randint(-800000, 800000)
+        window = []
+        for _ in range(size):
+            chance = rng.random()
+            if chance < 0.15:
+                window.append(False)
+            elif chance < 0.25:
+                # spike far from the load
+                window.append(level + rng.choice((-1, 1)) * rng.randint(
+                    5000, 200000))
+            else:
+                window.append(level + rng.randint(-200, 200))
+        windows.append(window)
+    return windows
+
+
+def test_filter_and_mean_match_outliers_filter():
+    engine = NumpyFilterEngine()
+    for window in random_windows(300):
+        expected = outliers_filter(window)
+        assert engine.filter(window).tolist() == expected
+        if expected:
+            assert engine.mean(window) == pytest.approx(
+                statistics.mean(expected))
+        else:
+            # every reading was rejected
+            assert engine.mean(window) is False
+    assert engine.mean([False] * 5) is False
+    # one valid reading is kept
+    assert outliers_filter([False, 5, False]) == [5]
+    assert engine.filter([False, 5, False]).tolist() == [5]
+
+
+def test_batch_mean_matches_outliers_filter():
+    engine = NumpyFilterEngine(stdev_thresh=1.5)
+    windows = random_windows(200, seed=5)
+    # batch_mean takes rows of the same length like frames of HX711Array
+    windows = [window[:12] for window in windows if len(window) >= 12]
+    windows.append([False] * 12)
+    means = engine.batch_mean(windows)
+    for window, mean in zip(windows[:-1], means):
+        expected = outliers_filter(window, 1.5)
+        if expected:
+            assert mean == pytest.approx(statistics.mean(expected))
+        else:
+            assert np.isnan(mean)
+    assert np.isnan(means[-1])
+
+
+def test_hx711_mean_is_the_same_with_engine():
+    gpio = FakeGPIOBackend(simulate_power_down=False)
+    gpio.add_chip(5, 6, source=lambda channel, gain_A: 0, data_rate=80)
+    hx = HX711(dout_pin=5, pd_sck_pin=6, gpio_backend=gpio, data_rate=80)
+    windows = random_windows(100, seed=7) + [[False, False, False]]
+    expected = [hx.get_readings_mean(window) for window in windows]
+    hx.set_filter_engine(NumpyFilterEngine())
+    assert [hx.get_readings_mean(window) for window in windows] == expected
+    assert expected[-1] is False
@@ -0,0 +1,81 @@
+import struct
+
+import pytest
+
+from hx711 import GPIOMemBackend
+
+WORDS = GPIOMemBackend._BLOCK_SIZE // 4
+
+
+@pytest.fixture
+def registers(tmp_path):
+    # a regular file stands in for /dev/gpiomem
+    path = tmp_path / 'gpiomem'
+    path.write_bytes(struct.pack('<{}I'.format(WORDS), *([0xffffffff] * 6 +
+                                                         [0] * (WORDS - 6))))
+    gpio = GPIOMemBackend(str(path))
+    yield gpio, path
+    gpio.cleanup()
+
+
+def word(path, index):
+    with open(str(path), 'rb') as registers_file:
+        registers_file.seek(index * 4)
+        return struct.unpack('<I', registers_file.read(4))[0]
+
+
+def write_word(path, index, value):
+    with open(str(path), 'r+b') as registers_file:
+        registers_file.seek(index * 4)
+        registers_file.write(struct.pack('<I', value))
+
+
+def test_function_select_bits(registers):
+    gpio, path = registers
+    # pin 5: GPFSEL0 bits 15..17, pin 27: GPFSEL2 bits 21..23
+    gpio.setup_input(5)
+    assert word(path, 0) == 0xffffffff & ~(7 << 15)
+    gpio.setup_output(27)
+    assert word(path, 2) == (0xffffffff & ~(7 << 21)) | (1 << 21)
+    # other pins of the registers are not touched
+    assert word(path, 1) == 0xffffffff
+    gpio.setup_output(53)
+    assert word(path, 5) == (0xffffffff & ~(7 << 9)) | (1 << 9)
+    with pytest.raises(ValueError):
+        gpio.setup_input(54)
+
+
+def test_set_and_clear_registers(registers):
+    gpio, path = registers
+    gpio.setup_output(6)
+    # setup_output sets the pin low
+    assert word(path, GPIOMemBackend._GPCLR0) == 1 << 6
+    gpio.set_clock(6, True)
+    assert word(path, GPIOMemBackend._GPSET0) == 1 << 6
+    gpio.setup_output(40)
+    gpio.set_clock(40, True)
+    # pins 32..53 use the second register of each pair
+    assert word(path, GPIOMemBackend._GPSET0 + 1) == 1 << 8
+    gpio.set_clock(40, False)
+    assert word(path, GPIOMemBackend._GPCLR0 + 1) == 1 << 8
+
+
+def test_level_registers(registers):
+    gpio, path = registers
+    for pin in (5, 7, 35):
+        gpio.setup_input(pin)
+    write_word(path, GPIOMemBackend._GPLEV0, 1 << 7)
+    write_word(path, GPIOMemBackend._GPLEV0 + 1, 1 << 3)
+    assert gpio.read_data(5) == 0
+    assert gpio.read_data(7) == 1
+    assert gpio.read_data(35) == 1
+    assert gpio.read_lines([5, 7, 35]) == [0, 1, 1]
+    assert gpio.wait_for_edge(5, 0.01) is True
+    assert gpio.wait_for_edge(7, 0.01) is False
+
+
+def test_too_small_file_is_rejected(tmp_path):
+    path = tmp_path / 'gpiomem'
+    path.write_bytes(b'')
+    with pytest.raises((OSError, ValueError)):
+        GPIOMemBackend(str(path))
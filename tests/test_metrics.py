@@ -0,0 +1,79 @@
+import os
+
+from hx711 import (HX711, FakeGPIOBackend, HX711Metrics, render_metrics_text,
+                   write_metrics_textfile)
+
+
+def samples(text):
+    result = {}
+    for line in text.splitlines():
+        if not line.startswith('#'):
+            name, _, value = line.rpartition(' ')
+            result[name] = float(value)
+    return result
+
+
+def test_stats_count_frames_timeouts_and_filter():
+    metrics = HX711Metrics()
+    metrics.observe_frame(0, 0.003, 0.0003, False, False, 10.0)
+    metrics.observe_frame(0, 0.2, 0.02, True, True, 10.1)
+    metrics.observe_frame(2, 0.0001, 0.00001, False, False, 10.1)
+    metrics.observe_frame(-1, 0.1, 0.1, True, True, 10.2)  # unknown mode
+    metrics.observe_timeout(1)
+    metrics.observe_filter(0, 10, 7)
+    stats = metrics.stats()
+    a128 = stats['A_128']
+    assert a128['conversions'] == 2
+    assert a128['invalid'] == 1
+    assert a128['timing_violations'] == 1
+    assert a128['filter_rejected'] == 3
+    assert a128['filter_rejection_ratio'] == 0.3
+    assert abs(a128['effective_sps'] - 10.0) < 1e-9
+    assert a128['wait_time']['buckets'][0.0025] == 0
+    assert a128['wait_time']['buckets'][0.005] == 1
+    assert a128['wait_time']['buckets'][0.25] == 2
+    assert a128['frame_time']['buckets'][float('inf')] == 2
+    assert stats['A_64']['ready_timeouts'] == 1
+    assert stats['B']['conversions'] == 1
+    metrics.reset()
+    assert metrics.stats()['A_128']['conversions'] == 0
+
+
+def test_render_metrics_text_format():
+    metrics = HX711Metrics()
+    metrics.observe_frame(2, 0.001, 0.0002, False, False, 1.0)
+    text = render_metrics_text({'left "front"': metrics}, prefix='scale')
+    assert text.endswith('\n')
+    assert '# TYPE scale_conversions_total counter' in text
+    assert '# TYPE scale_effective_sps gauge' in text
+    assert '# TYPE scale_data_ready_wait_seconds histogram' in text
+    values = samples(text)
+    labels = 'scale="left \\"front\\"",channel="B",gain="32"'
+    assert values['scale_conversions_total{%s}' % labels] == 1
+    assert values['scale_data_ready_wait_seconds_bucket{%s,le="0.0005"}' %
+                  labels] == 0
+    assert values['scale_data_ready_wait_seconds_bucket{%s,le="0.001"}' %
+                  labels] == 1
+    assert values['scale_data_ready_wait_seconds_bucket{%s,le="+Inf"}' %
+                  labels] == 1
+    assert values['scale_data_ready_wait_seconds_sum{%s}' % labels] == 0.001
+    assert values['scale_frame_duration_seconds_count{%s}' % labels] == 1
+    # every channel and gain is rendered even without readings
+    assert ('scale_conversions_total{scale="left \\"front\\"",channel="A",'
+            'gain="64"}') in values
+
+
+def test_write_metrics_textfile_from_hx711(tmp_path):
+    gpio = FakeGPIOBackend(simulate_power_down=False)
+    gpio.add_chip(5, 6, source=lambda channel, gain_A: 100, data_rate=80)
+    hx = HX711(dout_pin=5, pd_sck_pin=6, gpio_backend=gpio, data_rate=80)
+    for _ in range(3):
+        assert hx.read_channel() == ('A', 128, 100)
+    path = str(tmp_path / 'hx711.prom')
+    write_metrics_textfile(path, {'kitchen': hx})
+    assert os.listdir(str(tmp_path)) == ['hx711.prom']
+    with open(path) as metrics_file:
+        values = samples(metrics_file.read())
+    labels = 'scale="kitchen",channel="A",gain="128"'
+    assert values['hx711_conversions_total{%s}' % labels] >= 3
+    assert values['hx711_invalid_total{%s}' % labels] == 0
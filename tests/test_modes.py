@@ -0,0 +1,66 @@
+import itertools
+
+import pytest
+
+from hx711 import HX711, FakeGPIOBackend, EMAFilter
+
+VALUES = {('A', 128): 1000, ('A', 64): 2000, ('B', 0): 3000}
+# offset and scale ratio of each channel and gain
+SETTINGS = {('A', 128): (100, 2.0), ('A', 64): (-200, 4.0), ('B', 0): (0, 0.5)}
+
+
+def create_hx711():
+    gpio = FakeGPIOBackend(simulate_power_down=False)
+    gpio.add_chip(5, 6,
+                  source=lambda channel, gain_A: VALUES[
+                      channel, gain_A if channel == 'A' else 0],
+                  data_rate=80)
+    hx = HX711(dout_pin=5, pd_sck_pin=6, gpio_backend=gpio, data_rate=80)
+    for (channel, gain_A), (offset, scale_ratio) in SETTINGS.items():
+        hx.set_offset(offset, channel, gain_A)
+        hx.set_scale_ratio(scale_ratio, channel, gain_A)
+    return hx
+
+
+def select(hx, channel, gain_A):
+    hx.select_channel(channel)
+    if channel == 'A':
+        hx.set_gain_A(gain_A)
+
+
+def test_each_mode_has_own_offset_and_scale_ratio():
+    hx = create_hx711()
+    for channel, gain_A in [('A', 64), ('B', 0), ('A', 128), ('B', 0),
+                            ('A', 64)]:
+        select(hx, channel, gain_A)
+        mode = hx._current_mode
+        # the switch picked the entry of the table for the mode
+        assert mode is hx._modes[hx._mode_index(channel, gain_A)]
+        assert (mode.channel, mode.gain_A) == (channel, gain_A)
+        offset, scale_ratio = SETTINGS[channel, gain_A]
+        assert hx.get_current_offset() == offset
+        assert hx.get_current_scale_ratio() == scale_ratio
+        assert hx.get_weight_mean(3) == pytest.approx(
+            (VALUES[channel, gain_A] - offset) / scale_ratio)
+        assert hx.get_last_raw_data() == VALUES[channel, gain_A]
+    # the last raw data of the other modes are kept
+    for (channel, gain_A), value in VALUES.items():
+        assert hx.get_last_raw_data(channel, gain_A or 128) == value
+
+
+def test_each_mode_has_own_stream_filter_state():
+    hx = create_hx711()
+    for channel, gain_A in VALUES:
+        hx.set_stream_filter(EMAFilter(alpha=0.5), channel, gain_A or 128)
+    filters = [mode.stream_filter for mode in hx._modes]
+    assert len(set(map(id, filters))) == 3
+    select(hx, 'A', 128)
+    assert list(itertools.islice(hx.stream(), 2)) == [450.0, 450.0]
+    select(hx, 'B', 0)
+    assert next(hx.stream()) == 6000.0
+    # the filter of A 128 continues from its state, not from channel B
+    select(hx, 'A', 128)
+    assert hx._current_mode.stream_filter is filters[0]
+    assert next(hx.stream()) == 450.0
+    # each filter saw only the readings of its mode
+    assert hx.get_stream_filter('A', 64).update(0) == 0.0
@@ -0,0 +1,122 @@
+import ctypes
+
+import pytest
+
+import hx711
+from hx711 import HX711, FakeGPIOBackend
+
+
+class FakeFunction:
+    """
+    FakeFunction stands in for a function of ctypes.CDLL. It keeps
+    the argtypes and restype set by HX711 and records the calls.
+    """
+
+    def __init__(self, function):
+        self.function = function
+        self.argtypes = None
+        self.restype = None
+        self.calls = []
+
+    def __call__(self, *args):
+        self.calls.append(args)
+        return self.function(*args)
+
+
+class FakeNativeLibrary:
+    """
+    FakeNativeLibrary behaves like libhx711.so built from HX711_C.
+    getRawData returns the sign extended value of the current channel
+    and gain like the C code, then the gain pulses select the wanted ones.
+    """
+
+    def __init__(self, values=None, init_result=0, setup_result=0):
+        self.values = values or {('A', 128): -5, ('A', 64): 42, ('B', 0): 300}
+        self.mode = ('A', 128)
+        self.frames = []  # (wanted_channel, gain_channel_A) of each frame
+        self.initHX711 = FakeFunction(
+            lambda hx_ref, clock_pin, data_pin: init_result)
+        self.setupGPIO = FakeFunction(lambda hx_ref: setup_result)
+        self.getRawData = FakeFunction(self._get_raw_data)
+        self.cleanGPIO = FakeFunction(lambda hx_ref: None)
+
+    def _get_raw_data(self, hx_ref):
+        native_hx = hx_ref._obj
+        wanted = (native_hx.wanted_channel, native_hx.gain_channel_A)
+        self.frames.append(wanted)
+        value = self.values[self.mode]
+        if wanted[0] == b'A':
+            self.mode = ('A', wanted[1])
+        else:
+            self.mode = ('B', 0)
+        return value
+
+
+def create_hx711(monkeypatch, library):
+    gpio = FakeGPIOBackend(simulate_power_down=False)
+    gpio.add_chip(5, 6, source=lambda channel, gain_A: 1, data_rate=80)
+    hx = HX711(dout_pin=5, pd_sck_pin=6, gpio_backend=gpio, data_rate=80)
+    paths = []
+
+    def load(path):
+        paths.append(path)
+        return library
+
+    monkeypatch.setattr(hx711.ctypes, 'CDLL', load)
+    hx.set_native_backend('/opt/libhx711.so')
+    assert paths == ['/opt/libhx711.so']
+    return hx
+
+
+def test_native_library_is_set_up(monkeypatch):
+    library = FakeNativeLibrary()
+    create_hx711(monkeypatch, library)
+    pointer = ctypes.POINTER(hx711._NativeHX711)
+    assert library.initHX711.argtypes == [
+        pointer, ctypes.c_ubyte, ctypes.c_ubyte
+    ]
+    assert library.getRawData.argtypes == [pointer]
+    assert library.getRawData.restype is ctypes.c_int
+    assert library.cleanGPIO.restype is None
+    hx_ref, clock_pin, data_pin = library.initHX711.calls[0]
+    assert (clock_pin, data_pin) == (6, 5)
+    assert library.setupGPIO.calls[0][0]._obj is hx_ref._obj
+
+
+def test_native_read_converts_data_and_switches_mode(monkeypatch):
+    library = FakeNativeLibrary()
+    hx = create_hx711(monkeypatch, library)
+    assert hx.read_channel() == ('A', 128, -5)
+    assert library.frames == [(b'A', 128)]
+    # the channel and gain are passed for the next conversion
+    hx.select_channel('B')
+    assert library.frames[1] == (b'B', 128)
+    assert hx.get_current_channel() == 'B'
+    assert hx.read_channel() == ('B', 0, 300)
+    hx.select_channel('A')
+    hx.set_gain_A(64)
+    assert library.frames[-1] == (b'A', 64)
+    assert (hx.get_current_channel(), hx.get_current_gain_A()) == ('A', 64)
+    assert hx.read_channel() == ('A', 64, 42)
+
+
+def test_native_read_validates_data(monkeypatch):
+    # 0x7fffff is invalid, sign extended 0x800000 is the minimum
+    library = FakeNativeLibrary({('A', 128): 0x7fffff})
+    hx = create_hx711(monkeypatch, library)
+    assert hx.read_channel() == ('A', 128, False)
+    library.values[('A', 128)] = -0x800000
+    assert hx.read_channel() == ('A', 128, False)
+
+
+def test_native_backend_errors_and_cleanup(monkeypatch):
+    with pytest.raises(ValueError):
+        create_hx711(monkeypatch, FakeNativeLibrary(init_result=1))
+    with pytest.raises(OSError):
+        create_hx711(monkeypatch, FakeNativeLibrary(setup_result=-1))
+    library = FakeNativeLibrary()
+    hx = create_hx711(monkeypatch, library)
+    hx.set_native_backend(None)
+    assert len(library.cleanGPIO.calls) == 1
+    # GPIO is used again
+    assert hx.read_channel()[2] == 1
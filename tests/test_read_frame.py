@@ -0,0 +1,88 @@
+import time
+
+import pytest
+
+from hx711 import HX711, FakeGPIOBackend, RecoveryPolicy
+
+VALUES = {('A', 128): -1234567, ('A', 64): 2345678, ('B', 0): -42}
+
+
+def create_hx711():
+    gpio = FakeGPIOBackend()
+    gpio.add_chip(5, 6,
+                  source=lambda channel, gain_A: VALUES[
+                      channel, gain_A if channel == 'A' else 0],
+                  data_rate=80)
+    hx = HX711(dout_pin=5, pd_sck_pin=6, gpio_backend=gpio, data_rate=80)
+    return hx, gpio
+
+
+def per_bit_frame(*args):
+    raise AssertionError('the frame was timed per bit')
+
+
+def test_first_frame_measures_pulse_time():
+    hx, _ = create_hx711()
+    # the constructor read frames, the first one timed each pulse
+    assert 0.0 < hx._pulse_time < 0.00006
+
+
+def test_whole_frame_decodes_value_and_sends_gain_pulses(monkeypatch):
+    hx, gpio = create_hx711()
+    monkeypatch.setattr(HX711, '_read_frame_timed', per_bit_frame)
+    assert hx.read_channel() == ('A', 128, VALUES['A', 128])
+    # the gain pulses of the frame select the next conversion of the chip
+    hx.select_channel('B')
+    assert hx.read_channel() == ('B', 0, VALUES['B', 0])
+    assert gpio._chips[5]['channel'] == 'B'
+    hx.select_channel('A')
+    hx.set_gain_A(64)
+    assert hx.read_channel() == ('A', 64, VALUES['A', 64])
+    assert (gpio._chips[5]['channel'], gpio._chips[5]['gain_A']) == ('A', 64)
+
+
+def test_whole_frame_detects_power_down(monkeypatch):
+    hx, gpio = create_hx711()
+    monkeypatch.setattr(HX711, '_read_frame_timed', per_bit_frame)
+    policy = hx.get_recovery_policy()
+    violations = policy.violations
+    gpio.inject_slow_pulses(6, count=1, duration=0.0001)
+    # the broken frame is read again after the chip woke up
+    assert hx.read_channel() == ('A', 128, VALUES['A', 128])
+    # a busy machine can slow down another frame too
+    assert policy.violations >= violations + 1
+    # the slow pulse and the power down after the violation
+    assert gpio._chips[5]['power_downs'] >= 2
+
+
+class LateGPIOBackend(FakeGPIOBackend):
+    """
+    LateGPIOBackend raises the clock late once, while PD_SCK is low,
+    like a thread preempted between two pulses.
+    """
+
+    late_pulse = None
+    rising = 0
+
+    def set_clock(self, pin, state):
+        if state:
+            self.rising += 1
+            if self.rising == self.late_pulse:
+                time.sleep(0.0002)
+        super().set_clock(pin, state)
+
+
+def test_late_pulse_powers_down_hx711():
+    gpio = LateGPIOBackend()
+    chip = gpio.add_chip(5, 6, source=lambda channel, gain_A: 1000,
+                         data_rate=80)
+    hx = HX711(dout_pin=5, pd_sck_pin=6, gpio_backend=gpio, data_rate=80)
+    hx.set_recovery_policy(RecoveryPolicy(max_retries=2, wakeup_discard=0))
+    hx._pulse_time = 0.0  # the next frame is timed per pulse
+    power_downs = chip['power_downs']
+    gpio.late_pulse = gpio.rising + 3
+    # the chip did not see PD_SCK high for 60 us, it would
+    # continue the frame without the power down
+    assert hx._read() == 1000
+    assert chip['power_downs'] > power_downs
+    assert [hx._read() for _ in range(3)] == [1000] * 3
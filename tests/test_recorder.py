@@ -0,0 +1,105 @@
+import os
+import time
+
+import pytest
+
+from hx711 import HX711, FakeGPIOBackend, SampleLog, SampleRecorder
+
+pytest.importorskip('numpy')
+
+SECOND = 1000000000
+START = 1700000000 * SECOND  # start of a bucket of every pyramid level
+
+
+def test_records_round_trip(tmp_path):
+    with SampleRecorder(str(tmp_path), segment_records=2) as recorder:
+        recorder.record(0, 10, timestamp=START)
+        recorder.record(0, False, timestamp=START + 1)
+        recorder.record(2, -30, SampleRecorder.FLAG_DISCARDED,
+                        timestamp=START + 2)
+        recorder.record(0, 40, timestamp=START + SECOND)
+    log = SampleLog(str(tmp_path))
+    # a full segment is closed and the next records go to a new one
+    assert [log.read_segment(path).size for path in log.segments()] == [
+        2, 2, 0]
+    records = [record for view in log.samples() for record in view]
+    assert [int(record['timestamp']) - START for record in records] == [
+        0, 1, 2, SECOND]
+    assert [int(record['raw']) for record in records] == [10, 0, -30, 40]
+    assert [int(record['mode']) for record in records] == [0, 0, 2, 0]
+    assert [int(record['flags']) for record in records] == [
+        0, SampleRecorder.FLAG_INVALID, SampleRecorder.FLAG_DISCARDED, 0]
+
+    views = log.samples(start=START + 1, end=START + SECOND)
+    assert [int(record['raw']) for view in views for record in view] == [
+        0, -30]
+
+
+def test_new_recorder_starts_new_segment(tmp_path):
+    with SampleRecorder(str(tmp_path)) as recorder:
+        recorder.record(0, 1, timestamp=START)
+    with SampleRecorder(str(tmp_path)) as recorder:
+        recorder.record(0, 2, timestamp=START + 1)
+    log = SampleLog(str(tmp_path))
+    assert [os.path.basename(path) for path in log.segments()] == [
+        'samples-000001.bin', 'samples-000002.bin']
+    assert [int(view['raw'][0]) for view in log.samples()] == [1, 2]
+
+
+def test_timestamps_do_not_go_back(tmp_path, monkeypatch):
+    with SampleRecorder(str(tmp_path)) as recorder:
+        start = time.time_ns()
+        recorder.record(0, 1)
+        # the system clock is set back by an hour
+        monkeypatch.setattr(time, 'time_ns', lambda: start - 3600 * SECOND)
+        recorder.record(0, 2)
+        recorder.record(0, 3, timestamp=START + 5)
+        recorder.record(0, 4, timestamp=START)
+    monkeypatch.undo()
+    timestamps = [int(value) for value in SampleLog(str(tmp_path)).samples()[0]
+                  ['timestamp']]
+    assert timestamps == sorted(timestamps)
+    assert abs(timestamps[0] - start) < 60 * SECOND
+    assert timestamps[2] == timestamps[3]
+    # the segment can be searched by time
+    log = SampleLog(str(tmp_path))
+    views = log.samples(start=timestamps[1])
+    assert [int(raw) for view in views for raw in view['raw']] == [2, 3, 4]
+
+
+def test_pyramid_keeps_only_valid_readings(tmp_path):
+    with SampleRecorder(str(tmp_path)) as recorder:
+        for offset, raw in enumerate((10, 20, 30)):
+            recorder.record(0, raw, timestamp=START + offset)
+        recorder.record(0, False, timestamp=START + 3)
+        recorder.record(0, 1000, SampleRecorder.FLAG_TIMING_VIOLATION,
+                        timestamp=START + 4)
+        recorder.record(2, 7, timestamp=START + 5)
+        recorder.record(0, 50, timestamp=START + SECOND)
+    log = SampleLog(str(tmp_path))
+    seconds, buckets = log.query(START, START + 2 * SECOND)
+    assert seconds == 1
+    assert [(int(bucket['count']), bucket['min'], bucket['max'],
+             bucket['mean']) for bucket in buckets] == [(3, 10.0, 30.0, 20.0),
+                                                        (1, 50.0, 50.0, 50.0)]
+    # the coarse levels have the same readings in one bucket
+    hour = log.pyramid(3600)
+    hour = hour[hour['mode'] == 0]
+    assert [int(bucket['count']) for bucket in hour] == [4]
+    seconds, buckets = log.query(START, START + 2 * SECOND, channel='B')
+    assert [int(bucket['count']) for bucket in buckets] == [1]
+
+
+def test_hx711_records_each_conversion(tmp_path):
+    gpio = FakeGPIOBackend(simulate_power_down=False)
+    gpio.add_chip(5, 6, source=lambda channel, gain_A: 12345, data_rate=80)
+    hx = HX711(dout_pin=5, pd_sck_pin=6, gpio_backend=gpio)
+    with SampleRecorder(str(tmp_path)) as recorder:
+        hx.set_recorder(recorder)
+        hx.get_raw_data_mean(5)
+        hx.set_recorder(None)
+    records = [record for view in SampleLog(str(tmp_path)).samples()
+               for record in view if not record['flags']]
+    assert len(records) >= 5
+    assert {(int(record['mode']), int(record['raw']))
+            for record in records} == {(0, 12345)}
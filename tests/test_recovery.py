@@ -0,0 +1,111 @@
+import random
+
+import pytest
+
+from hx711 import HX711, FakeGPIOBackend, RecoveryPolicy
+
+VALUES = {'A': 1000, 'B': 2000}
+
+
+def create_hx711(policy):
+    gpio = FakeGPIOBackend()
+    conversions = []
+
+    def source(channel, gain_A):
+        conversions.append(channel)
+        return VALUES[channel]
+
+    gpio.add_chip(5, 6, source=source, data_rate=80)
+    hx = HX711(dout_pin=5, pd_sck_pin=6, gpio_backend=gpio, data_rate=80)
+    hx.set_recovery_policy(policy)
+    hx.select_channel('B')
+    hx._read()  # the gain pulses select channel B
+    policy.reset_stats()
+    return hx, gpio, conversions
+
+
+@pytest.mark.parametrize('max_retries, wakeup_discard', [(-1, 0), (0, -1),
+                                                         (1.5, 2), (2, None)])
+def test_invalid_policy_raises_value_error(max_retries, wakeup_discard):
+    with pytest.raises(ValueError):
+        RecoveryPolicy(max_retries, wakeup_discard)
+
+
+def test_wake_up_conversions_are_discarded():
+    policy = RecoveryPolicy(max_retries=2, wakeup_discard=2)
+    hx, gpio, conversions = create_hx711(policy)
+    del conversions[:]
+    gpio.inject_slow_pulses(6, count=1)
+    # the broken frame, A 128 after wake up and one more are not returned
+    assert hx._read() == VALUES['B']
+    assert policy.discarded >= 2 and not policy.failures
+    if policy.violations == 1:
+        # no frame was slowed down by the machine. Conversions which were
+        # not read while it was busy are repeated.
+        woken = conversions.index('B', 1)
+        assert conversions[0] == 'B' and woken > 1
+        assert set(conversions[1:woken]) == {'A'}
+        assert len(conversions) - woken >= 2
+        assert set(conversions[woken:]) == {'B'}
+        assert policy.get_stats() == {
+            'violations': 1,
+            'retries': 1,
+            'discarded': 2,
+            'failures': 0
+        }
+
+
+def test_without_discard_wake_up_conversion_is_returned():
+    policy = RecoveryPolicy(max_retries=2, wakeup_discard=0)
+    hx, gpio, _ = create_hx711(policy)
+    gpio.inject_slow_pulses(6, count=1)
+    # hx711 woke up with channel A gain 128
+    assert hx._read() == VALUES['A']
+    assert policy.get_stats()['discarded'] == 0
+
+
+def test_retries_are_limited():
+    policy = RecoveryPolicy(max_retries=1, wakeup_discard=1)
+    hx, gpio, conversions = create_hx711(policy)
+    del conversions[:]
+    gpio.inject_slow_pulses(6, count=1000)
+    assert hx._read() is False
+    assert policy.get_stats() == {
+        'violations': 2,
+        'retries': 1,
+        'discarded': 1,
+        'failures': 1
+    }
+    assert len(conversions) == 2
+    policy.reset_stats()
+    assert set(policy.get_stats().values()) == {0}
+
+
+def slowing_source(gpio, conversions, rng):
+
+    def source(channel, gain_A):
+        conversions.append(channel)
+        if rng.random() < 0.4:
+            # the frame of this conversion gets one slow pulse
+            gpio.inject_slow_pulses(6, count=1)
+        return VALUES[channel]
+
+    return source
+
+
+@pytest.mark.parametrize('max_retries, wakeup_discard', [(2, 2), (1, 3)])
+def test_cost_of_reading_is_bounded(max_retries, wakeup_discard):
+    policy = RecoveryPolicy(max_retries, wakeup_discard)
+    hx, gpio, conversions = create_hx711(policy)
+    rng = random.Random(max_retries)
+    bound = (max_retries + 1) * (wakeup_discard + 1)
+    for _ in range(15):
+        del conversions[:]
+        # clock pulses are slowed down at random during the reading
+        gpio._chips[5]['source'] = slowing_source(gpio, conversions, rng)
+        result = hx._read()
+        assert len(conversions) <= bound
+        # a reading never returns the conversion after wake up
+        assert result in (VALUES['B'], False)
+    assert policy.violations and policy.discarded
+
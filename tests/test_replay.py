@@ -0,0 +1,81 @@
+import time
+
+import pytest
+
+from hx711 import HX711, ReplayGPIOBackend, RecoveryPolicy
+
+
+def create_hx711(recording, speed=None):
+    gpio = ReplayGPIOBackend(recording, speed=speed)
+    hx = HX711(dout_pin=5, pd_sck_pin=6, gpio_backend=gpio)
+    # recorded readings do not power down, a frame slowed down by
+    # a busy machine must not discard them
+    hx.set_recovery_policy(RecoveryPolicy(max_retries=0, wakeup_discard=0))
+    gpio.start()
+    return hx, gpio
+
+
+def test_replay_goes_through_conversion_and_ends_with_eof():
+    recording = [(0.0, 'A', 128, 100), (0.1, 'A', 128, -100),
+                 (0.2, 'A', 128, 0x7fffff), (0.3, 'A', 128, 250)]
+    hx, gpio = create_hx711(recording)
+    hx.set_offset(50)
+    hx.set_scale_ratio(2.0)
+    assert gpio.remaining() == 4
+    stream = hx.stream()
+    readings = []
+    with pytest.raises(EOFError):
+        while True:
+            readings.append(next(stream))
+    assert gpio.replayed == 4
+    assert gpio.finished
+    if not hx.get_recovery_policy().violations:
+        # no frame was broken by a busy machine.
+        # 0x7fffff is invalid reading of hx711
+        assert readings == [25.0, -75.0, False, 100.0]
+
+
+def test_gain_pulses_select_recorded_channel():
+    recording = [(0.0, 'A', 128, 1), (0.0, 'B', 0, 2), (0.1, 'A', 128, 3),
+                 (0.1, 'B', 0, 4), (0.1, 'a', 64, 5)]
+    hx, gpio = create_hx711(recording)
+    hx.set_schedule(A_128=1, B=1)
+    readings = {('A', 128): [], ('B', 0): []}
+    with pytest.raises(EOFError):
+        while True:
+            channel, gain_A, raw = hx.read_channel()
+            readings[channel, gain_A].append(raw)
+    assert gpio.remaining('A', 64) == 1
+    if not hx.get_recovery_policy().violations:
+        # each channel gets its own recorded readings in order
+        assert readings[('A', 128)] == [1, 3]
+        assert readings[('B', 0)] in ([2], [2, 4])
+
+
+def test_from_csv_and_speed(tmp_path):
+    path = tmp_path / 'recording.csv'
+    path.write_text('# timestamp,channel,gain_A,raw\n'
+                    '10.0,A,128,7\n'
+                    '10.2,A,128,\n'
+                    '10.4,A,128,9\n')
+    gpio = ReplayGPIOBackend.from_csv(str(path), speed=2.0)
+    hx = HX711(dout_pin=5, pd_sck_pin=6, gpio_backend=gpio)
+    hx.set_recovery_policy(RecoveryPolicy(max_retries=0, wakeup_discard=0))
+    gpio.start()
+    start = time.perf_counter()
+    readings = [hx.read_channel()[2] for _ in range(3)]
+    elapsed = time.perf_counter() - start
+    if not hx.get_recovery_policy().violations:
+        assert readings == [7, False, 9]
+    # recorded 0.4 s are replayed at double speed
+    assert 0.19 < elapsed < 1.0
+
+
+@pytest.mark.parametrize('recording, speed', [
+    ([(0.0, 'C', 128, 1)], None),
+    ([(0.0, 'A', 32, 1)], None),
+    ([], 0),
+])
+def test_invalid_recording_raises_value_error(recording, speed):
+    with pytest.raises(ValueError):
+        ReplayGPIOBackend(recording, speed=speed)
@@ -0,0 +1,83 @@
+import time
+
+from hx711 import HX711, FakeGPIOBackend, ScaleFarm
+
+
+def create_scale():
+    # runs in the worker process
+    gpio = FakeGPIOBackend(simulate_power_down=False)
+    gpio.add_chip(5, 6, source=lambda channel, gain_A: 100000, data_rate=80)
+    hx = HX711(dout_pin=5, pd_sck_pin=6, gpio_backend=gpio, data_rate=80)
+    hx.set_scale_ratio(100.0)
+    return hx
+
+
+def create_scheduled_scale():
+    gpio = FakeGPIOBackend(simulate_power_down=False)
+    gpio.add_chip(5, 6,
+                  source=lambda channel, gain_A: 5000 if channel == 'B' else
+                  100000,
+                  data_rate=80)
+    hx = HX711(dout_pin=5, pd_sck_pin=6, gpio_backend=gpio, data_rate=80)
+    hx.set_scale_ratio(100.0, 'A', 128)
+    hx.set_scale_ratio(10.0, 'B')
+    hx.set_schedule(A_128=1, B=1)
+    return hx
+
+
+def create_broken_scale():
+    raise OSError('GPIO is not available')
+
+
+def wait_for(condition, timeout=20.0):
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        assert time.perf_counter() < deadline
+        time.sleep(0.05)
+
+
+def test_farm_before_start():
+    farm = ScaleFarm([create_scale])
+    assert farm.table is None
+    assert farm.get_status() == []
+    assert farm.check_workers() == []
+    assert farm.get_readings() == [None]
+
+
+def test_farm_readings():
+    with ScaleFarm([create_scale, create_scale]) as farm:
+        wait_for(lambda: all(reading is not None and reading[3] > 0
+                             for reading in farm.get_readings()))
+        for timestamp, raw, weight, sequence in farm.get_readings():
+            assert raw == 100000.0
+            assert weight == 1000.0
+            assert timestamp > 0
+        assert all(status['alive'] for status in farm.get_status())
+        conversions = farm.table[0, ScaleFarm.CONVERSIONS]
+        assert conversions >= 1
+    assert farm.get_status() == []
+
+
+def test_scheduled_reading_keeps_raw_data_of_its_channel():
+    with ScaleFarm([create_scheduled_scale]) as farm:
+        wait_for(lambda: farm.get_readings()[0] is not None and
+                 farm.get_readings()[0][3] > 0)
+        pairs = set()
+        for _ in range(20):
+            _, raw, weight, _ = farm.get_readings()[0]
+            pairs.add((raw, weight))
+            time.sleep(0.013)
+    # raw data and weight are of the same conversion
+    assert pairs <= {(100000.0, 1000.0), (5000.0, 500.0)}
+    assert len(pairs) == 2
+
+
+def test_failing_worker_restart_backs_off():
+    with ScaleFarm([create_broken_scale], check_interval=60.0,
+                   restart_backoff=60.0) as farm:
+        wait_for(lambda: not farm.get_status()[0]['alive'])
+        # the first failure is restarted at once
+        assert farm.check_workers() == [0]
+        wait_for(lambda: not farm.get_status()[0]['alive'])
+        assert farm.check_workers() == []
+        assert farm.get_status()[0]['restarts'] == 1
@@ -0,0 +1,47 @@
+import itertools
+
+from hx711 import FakeGPIOBackend
+
+
+def test_means_do_not_mix_channels(scheduled_hx711):
+    hx = scheduled_hx711()
+    for _ in range(2):
+        channel = hx.get_current_channel()
+        expected = 5000 if channel == 'B' else 100000
+        assert hx.get_raw_data_mean(6) == expected
+        hx._read()  # next channel of the schedule
+
+    channel = hx.get_current_channel()
+    ratio = 10.0 if channel == 'B' else 100.0
+    expected = (5000 if channel == 'B' else 100000) / ratio
+    assert hx.get_weight_mean(6) == expected
+
+
+def test_zero_and_get_weight_use_one_channel(scheduled_hx711):
+    hx = scheduled_hx711()
+    channel = hx.get_current_channel()
+    gain_A = hx.get_current_gain_A() if channel == 'A' else 0
+    assert hx.zero(6) is False
+    expected = 5000 if channel == 'B' else 100000
+    assert hx.get_current_offset(channel, gain_A) == expected
+
+    hx.set_offset(0, channel, gain_A)
+    while hx.get_current_channel() != 'B':
+        hx._read()
+    weight, uncertainty, readings = hx.get_weight(1.0, max_readings=8)
+    assert weight == 500.0
+    assert uncertainty == 0.0
+
+
+def test_stream_channels_after_timing_violation(scheduled_hx711):
+    gpio = FakeGPIOBackend()
+    hx = scheduled_hx711(gpio, A_128=2, B=1)
+    # the chip powers down and the discarded frames move the schedule on
+    gpio.inject_slow_pulses(6)
+    samples = list(itertools.islice(hx.stream_channels(), 9))
+    assert hx.get_recovery_policy().violations >= 1
+    assert hx.get_recovery_policy().discarded >= 2
+    expected = {('A', 128): 1000.0, ('B', 0): 500.0}
+    for channel, gain_A, weight in samples:
+        assert weight == expected[(channel, gain_A)]
+    assert {(channel, gain_A) for channel, gain_A, _ in samples} == set(expected)
@@ -0,0 +1,73 @@
+from hx711 import HX711, HX711Array, FakeGPIOBackend, RecoveryPolicy
+
+
+def counted(scale):
+    # a delayed clock pulse on a busy machine must not read more frames
+    scale.set_recovery_policy(RecoveryPolicy(max_retries=0, wakeup_discard=0))
+    return scale
+
+
+def conversions(hx):
+    return sum(mode['conversions'] for mode in hx.stats().values())
+
+
+def switch_conversions(data_rate):
+    gpio = FakeGPIOBackend(simulate_power_down=False)
+    gpio.add_chip(5, 6, data_rate=data_rate)
+    hx = counted(HX711(dout_pin=5, pd_sck_pin=6, gpio_backend=gpio,
+                       data_rate=data_rate))
+    before = conversions(hx)
+    hx.select_channel('B')
+    return conversions(hx) - before
+
+
+def test_four_conversions_discarded_at_both_rates():
+    # the first conversion sends the gain pulses, the rest settle
+    # 400 ms at 10 SPS and 50 ms at 80 SPS
+    assert switch_conversions(10) == 1 + 4
+    assert switch_conversions(80) == 1 + 4
+
+
+def test_settling_time_of_closest_data_rate():
+    assert HX711._settling_conversions(10) == 4
+    assert HX711._settling_conversions(80) == 4
+    # 400 ms at 12.5 SPS
+    assert HX711._settling_conversions(12.5) == 5
+    # 50 ms at 75 SPS
+    assert HX711._settling_conversions(75.0) == 4
+    # unknown data rate discards the most conversions
+    assert HX711._settling_conversions(0.0) == 4
+
+
+def test_active_channel_is_not_settled_again():
+    gpio = FakeGPIOBackend(simulate_power_down=False)
+    gpio.add_chip(5, 6, data_rate=80)
+    hx = counted(HX711(dout_pin=5, pd_sck_pin=6, gpio_backend=gpio,
+                       data_rate=80))
+    before = conversions(hx)
+    hx.select_channel('A', skip_if_active=True)
+    hx.set_gain_A(128, skip_if_active=True)
+    assert conversions(hx) == before
+
+
+def array_conversions(array):
+    return sum(mode['conversions']
+               for mode in array.get_metrics().stats().values())
+
+
+def test_array_settles_like_hx711():
+    for data_rate, settling in ((10, 4), (80, 4)):
+        gpio = FakeGPIOBackend(simulate_power_down=False)
+        gpio.add_chip(5, 6, data_rate=data_rate)
+        gpio.add_chip(7, 6, data_rate=data_rate)
+        array = HX711Array([5, 7], 6, gpio_backend=gpio, data_rate=data_rate)
+        if not array.get_recovery_policy().violations:
+            # the first frame of the constructor has no known mode
+            assert array_conversions(array) == settling
+        counted(array)
+        before = array_conversions(array)
+        array.select_channel('A', skip_if_active=True)
+        array.set_gain_A(128, skip_if_active=True)
+        assert array_conversions(array) == before
+        array.select_channel('B')
+        assert array_conversions(array) - before == 1 + settling
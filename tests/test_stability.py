@@ -0,0 +1,89 @@
+import itertools
+
+import pytest
+
+from hx711 import HX711, FakeGPIOBackend, StabilityDetector
+
+
+def feed(detector, weights, period=0.1, start=0.0):
+    return [detector.update(weight, start + i * period)
+            for i, weight in enumerate(weights)]
+
+
+def test_detector_needs_full_window_and_hold_time():
+    detector = StabilityDetector(tolerance=1.0, hold_time=0.5, window=4)
+    results = feed(detector, [100.0] * 10)
+    # the window is full at 0.3 s and steady for 0.5 s at 0.8 s
+    assert results == [False] * 8 + [True] * 2
+    assert detector.weight == 100.0
+    detector.reset()
+    assert detector.stable is False
+    assert detector.weight is False
+
+
+def test_detector_rejects_noise_and_drift():
+    noisy = StabilityDetector(tolerance=1.0, hold_time=0.0, window=4)
+    assert not any(feed(noisy, [100.0, 103.0, 97.0, 103.0, 97.0] * 4))
+    # standard deviation of the window is small, the drift is not
+    drifting = StabilityDetector(tolerance=1.0, hold_time=0.0, window=4)
+    assert not any(feed(drifting, [100.0 + 0.5 * i for i in range(20)]))
+    # a disturbance restarts the hold time
+    detector = StabilityDetector(tolerance=1.0, hold_time=0.2, window=2)
+    assert feed(detector, [5.0, 5.0, 5.0, 5.0]) == [False, False, False, True]
+    assert detector.update(50.0, 0.4) is False
+    assert feed(detector, [5.0] * 4, start=0.5) == [False] * 3 + [True]
+
+
+@pytest.mark.parametrize('kwargs', [
+    {'tolerance': 0},
+    {'tolerance': 1.0, 'hold_time': -1},
+    {'tolerance': 1.0, 'window': 1},
+])
+def test_detector_validates_arguments(kwargs):
+    with pytest.raises(ValueError):
+        StabilityDetector(**kwargs)
+
+
+def create_hx711(source):
+    gpio = FakeGPIOBackend(simulate_power_down=False)
+    gpio.add_chip(5, 6, source=source, data_rate=80)
+    return HX711(dout_pin=5, pd_sck_pin=6, gpio_backend=gpio, data_rate=80)
+
+
+def test_wait_stable_returns_mean_of_steady_window():
+    hx = create_hx711(lambda channel, gain_A: 4000)
+    hx.set_offset(1000)
+    hx.set_scale_ratio(3.0)
+    with pytest.raises(RuntimeError):
+        hx.wait_stable()
+    assert hx.is_stable is False
+    hx.set_stability_detector(
+        StabilityDetector(tolerance=0.5, hold_time=0.05, window=5))
+    assert hx.wait_stable(timeout=5.0) == 1000.0
+    assert hx.is_stable is True
+    # the detector is only set for the current channel and gain
+    assert hx.get_stability_detector('B') is None
+
+
+def test_wait_stable_times_out_while_load_moves():
+    counter = itertools.count()
+    hx = create_hx711(lambda channel, gain_A: 1000 * next(counter))
+    hx.set_stability_detector(
+        StabilityDetector(tolerance=10.0, hold_time=0.0, window=3))
+    assert hx.wait_stable(timeout=0.3) is False
+    assert hx.is_stable is False
+
+
+def test_wait_stable_forgets_old_load_while_acquiring():
+    level = {'A': 1000}
+    hx = create_hx711(lambda channel, gain_A: level['A'])
+    hx.set_stability_detector(
+        StabilityDetector(tolerance=0.5, hold_time=0.05, window=5))
+    hx.start_acquisition()
+    try:
+        assert hx.wait_stable(timeout=5.0) == 1000.0
+        level['A'] = 5000
+        # the detector is still stable with the old load until it is reset
+        assert hx.wait_stable(timeout=5.0) == 5000.0
+    finally:
+        hx.stop_acquisition()
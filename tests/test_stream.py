@@ -0,0 +1,52 @@
+import itertools
+
+import pytest
+
+from hx711 import HX711, FakeGPIOBackend
+
+
+def create_hx711(level):
+    gpio = FakeGPIOBackend(simulate_power_down=False)
+    gpio.add_chip(5, 6, source=lambda channel, gain_A: level[channel],
+                  data_rate=80)
+    hx = HX711(dout_pin=5, pd_sck_pin=6, gpio_backend=gpio, data_rate=80)
+    hx.set_offset(1000)
+    hx.set_scale_ratio(10.0)
+    # plain mean of the valid readings
+    hx.set_data_filter(lambda data: [num for num in data if num is not False])
+    return hx
+
+
+def test_stream_yields_weight_of_each_conversion():
+    hx = create_hx711({'A': 21000, 'B': 0})
+    assert list(itertools.islice(hx.stream(), 5)) == [2000.0] * 5
+    assert hx.get_last_raw_data() == 21000
+
+
+def test_stream_mean_slides_with_each_conversion():
+    level = {'A': 1000, 'B': 0}
+    hx = create_hx711(level)
+    stream = hx.stream_mean(window=4)
+    assert list(itertools.islice(stream, 4)) == [0.0] * 4
+    level['A'] = 5000
+    weights = list(itertools.islice(stream, 8))
+    # a new value after every conversion, not after every window
+    assert any(0.0 < weight < 400.0 for weight in weights)
+    assert weights == sorted(weights)
+    assert weights[-1] == 400.0
+
+
+def test_stream_mean_does_not_mix_channels():
+    hx = create_hx711({'A': 21000, 'B': 3000})
+    hx.set_offset(0, 'B')
+    hx.set_scale_ratio(2.0, 'B')
+    hx.set_schedule(A_128=1, B=1)
+    hx.get_raw_data_mean(2)  # first frames follow the schedule
+    weights = set(itertools.islice(hx.stream_mean(window=5), 8))
+    assert weights == {2000.0, 1500.0}
+
+
+def test_stream_mean_window_has_to_be_positive():
+    hx = create_hx711({'A': 1000, 'B': 0})
+    with pytest.raises(ValueError):
+        next(hx.stream_mean(window=0))
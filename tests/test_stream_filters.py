@@ -0,0 +1,80 @@
+import itertools
+import random
+import statistics
+
+import pytest
+
+from hx711 import (HX711, FakeGPIOBackend, RunningMedianFilter, HampelFilter,
+                   EMAFilter, KalmanFilter)
+
+
+def test_running_median_matches_brute_force():
+    rng = random.Random(11)
+    for window in (1, 2, 7, 16):
+        median_filter = RunningMedianFilter(window)
+        samples = []
+        for _ in range(5000):
+            # few distinct values so ties and duplicates are common
+            samples.append(rng.randint(-50, 50))
+            expected = float(statistics.median(samples[-window:]))
+            assert median_filter.update(samples[-1]) == expected
+        # lazy deletion must not let the heaps grow with the readings
+        assert len(median_filter._low) + len(median_filter._high) <= \
+            2 * window + 16
+
+
+def test_running_median_reset_and_window():
+    median_filter = RunningMedianFilter(3)
+    assert median_filter.median() == 0.0
+    for sample in (5, 1, 9):
+        median_filter.update(sample)
+    assert median_filter.median() == 5.0
+    median_filter.reset()
+    assert median_filter.median() == 0.0
+    assert median_filter.update(4) == 4.0
+    assert median_filter.get_config() == {'window': 3}
+    for window in (0, 2.5):
+        with pytest.raises(ValueError):
+            RunningMedianFilter(window)
+
+
+def test_hampel_replaces_outlier_by_median():
+    hampel = HampelFilter(window=7, n_sigmas=3.0)
+    for sample in (100, 102, 98, 101, 99, 100, 103, 97):
+        assert hampel.update(sample) == float(sample)
+    assert hampel.update(5000) == 100.0
+    assert hampel.get_config() == {'window': 7, 'n_sigmas': 3.0}
+
+
+def test_ema_and_kalman_converge_to_step():
+    ema = EMAFilter(alpha=0.5)
+    assert ema.update(0) == 0.0
+    assert [ema.update(8) for _ in range(3)] == [4.0, 6.0, 7.0]
+    with pytest.raises(ValueError):
+        EMAFilter(alpha=0)
+    kalman = KalmanFilter(process_variance=1.0, measurement_variance=100.0)
+    assert kalman.update(0) == 0.0
+    estimates = [kalman.update(1000) for _ in range(200)]
+    assert estimates == sorted(estimates)
+    assert 990.0 < estimates[-1] <= 1000.0
+    kalman.reset()
+    assert kalman.update(7) == 7.0
+
+
+def test_stream_filters_each_channel_separately():
+    gpio = FakeGPIOBackend(simulate_power_down=False)
+    level = {'A': 1000, 'B': 2000}
+    gpio.add_chip(5, 6, source=lambda channel, gain_A: level[channel],
+                  data_rate=80)
+    hx = HX711(dout_pin=5, pd_sck_pin=6, gpio_backend=gpio, data_rate=80)
+    hx.set_stream_filter(RunningMedianFilter(3), channel='A', gain_A=128)
+    assert isinstance(hx.get_stream_filter('A', 128), RunningMedianFilter)
+    assert hx.get_stream_filter('B') is None
+    with pytest.raises(TypeError):
+        hx.set_stream_filter(object())
+    assert list(itertools.islice(hx.stream(), 3)) == [1000.0] * 3
+    # one spike does not pass the running median of three
+    level['A'] = 90000
+    assert next(hx.stream()) == 1000.0
+    level['A'] = 1000
+    assert next(hx.stream()) == 1000.0
@@ -0,0 +1,84 @@
+import time
+
+import pytest
+
+from hx711 import HX711, FakeGPIOBackend, RecoveryPolicy
+
+
+def create_hx711(data_rate, edge_detection):
+    gpio = FakeGPIOBackend(simulate_power_down=False)
+    chip = gpio.add_chip(5, 6, source=lambda channel, gain_A: 1000,
+                         data_rate=data_rate)
+    hx = HX711(dout_pin=5, pd_sck_pin=6, gpio_backend=gpio,
+               data_rate=data_rate)
+    hx.set_edge_detection(edge_detection)
+    # the chip is not powered down by a preempted frame, so nothing
+    # is discarded after the broken frame is read again
+    hx.set_recovery_policy(RecoveryPolicy(wakeup_discard=0))
+    return hx, chip
+
+
+@pytest.mark.parametrize('edge_detection', [False, True])
+@pytest.mark.parametrize('data_rate, readings', [(10, 8), (80, 24)])
+def test_measured_data_rate_is_close_to_chip(data_rate, readings,
+                                             edge_detection):
+    hx, _ = create_hx711(data_rate, edge_detection)
+    policy = hx.get_recovery_policy()
+    measured = hx.measure_data_rate(readings)
+    # a frame read again takes one more conversion
+    conversions = readings + policy.violations
+    assert data_rate * readings / conversions * 0.8 < measured
+    assert measured < data_rate * 1.1
+
+
+@pytest.mark.parametrize('edge_detection', [False, True])
+def test_never_ready_chip_times_out(edge_detection):
+    hx, chip = create_hx711(80, edge_detection)
+    # the chip finished the last frame and never converts again
+    chip['next_ready'] = float('inf')
+    timeouts = hx.get_metrics().stats()['A_128']['ready_timeouts']
+    start = time.perf_counter()
+    assert hx._wait_ready() is False
+    elapsed = time.perf_counter() - start
+    assert hx._ready_timeout <= elapsed < hx._ready_timeout + 0.2
+    assert hx.measure_data_rate(2) == 0.0
+    assert hx.get_metrics().stats()['A_128']['ready_timeouts'] > timeouts
+
+
+def test_late_wake_up_is_not_repeated(monkeypatch):
+    hx, chip = create_hx711(80, False)
+    hx.measure_data_rate(4)
+    while not (hx._last_ready_known and hx._conversion_period):
+        hx._read()
+    period = hx._conversion_period
+    # a long sleep wakes up after the end of conversion
+    sleep = time.sleep
+    monkeypatch.setattr(time, 'sleep', lambda delay: sleep(delay + 0.006))
+    assert hx._wait_ready()
+    monkeypatch.setattr(time, 'sleep', sleep)
+    assert not hx._last_ready_known
+    # the data which is ready is read and the next wait polls,
+    # so it sees the end of conversion again
+    hx._read()
+    hx._read()
+    assert hx._last_ready_known
+    seen_at = chip['next_ready'] - chip['period']
+    assert seen_at <= hx._last_ready_time < seen_at + chip['period'] / 2
+    assert hx._conversion_period == period
+
+
+def test_too_long_period_is_learned_again():
+    hx, chip = create_hx711(80, False)
+    hx.measure_data_rate(4)
+    while not hx._last_ready_known:
+        hx._read()
+    # slow intervals at the start gave twice the period
+    hx._conversion_intervals.extend([2 * chip['period']] * 9)
+    hx._conversion_period = 2 * chip['period']
+    # each wait which finds the data ready forgets one interval. Waits
+    # of a busy machine do not wake up on time, so it can take longer.
+    for _ in range(80):
+        hx._read()
+        if hx._conversion_period == pytest.approx(chip['period'], rel=0.2):
+            break
+    assert hx._conversion_period == pytest.approx(chip['period'], rel=0.2)